@@ -0,0 +1,124 @@
+"""Web GUI search benchmark
+
+Compares how the web GUI used to run a search, parsing the pool and
+opening a new session per search, with the app-scoped session and
+the preloaded table of specs. All sites point at a local aiohttp
+server, so no network access is needed.
+
+Usage: python benchmarks/bench_gui.py [--sites N] [--searches N]
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+from aiohttp import ClientSession, DummyCookieJar, web
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tracer"))
+
+from models import RequestScheduler, SiteSpec, Website, WebsitePool
+
+
+POOL = Path(__file__).parent.parent / "data" / "pool.json"
+PAGE = b"<html><head><title>tracer | Profile</title></head><body>ok</body></html>"
+
+
+async def handler(request: web.Request) -> web.Response:
+    return web.Response(body=PAGE, content_type="text/html")
+
+
+def create_pool(port: int, sites: int) -> list:
+    """Rewrite the first `sites` entries of the pool to the local server"""
+
+    with open(POOL) as file:
+        data = json.load(file)[:sites]
+
+    for i, site in enumerate(data):
+        site.pop("request_method", None)
+        site["url"] = f"http://127.0.0.1:{port}/{i}/{{}}"
+        site["err_text_pattern"] = "<title>Not Found"
+        site.pop("err_url_pattern", None)
+        site.pop("display_url", None)
+
+    return data
+
+
+async def legacy(data: list, username: str) -> None:
+    """One search as it was done before: parse, build, new session"""
+
+    with open(POOL) as file:
+        json.load(file)
+
+    async with ClientSession(cookie_jar=DummyCookieJar()) as session:
+        pool = WebsitePool(*[Website.from_dict(site) for site in data])
+        pool.set_username(username)
+
+        async for _ in pool.start_requests(session):
+            pass
+
+
+async def shared(specs: tuple, session: ClientSession, scheduler, username: str) -> None:
+    """One search on the app-scoped session and specs"""
+
+    pool = WebsitePool.from_specs(specs, username)
+
+    async for _ in pool.start_requests(session, scheduler=scheduler):
+        pass
+
+
+async def main(sites: int, searches: int) -> None:
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    data = create_pool(port, sites)
+
+    try:
+        start = perf_counter()
+
+        for i in range(searches):
+            await legacy(data, f"user{i}")
+
+        old = perf_counter() - start
+
+        start = perf_counter()
+        specs = tuple(SiteSpec.from_dict(site) for site in data)
+
+        # All sites share one local host, so the per-host limit of
+        # the connector must not throttle them
+        scheduler = RequestScheduler(per_host_limit=RequestScheduler.DEFAULT_CONCURRENCY)
+
+        async with ClientSession(
+            connector=scheduler.create_connector(),
+            cookie_jar=DummyCookieJar()
+        ) as session:
+            for i in range(searches):
+                await shared(specs, session, scheduler, f"user{i}")
+
+        new = perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    print(f"sites per search:  {len(data)}")
+    print(f"searches:          {searches}")
+    print(f"per-search setup:  {searches / old:8.2f} searches/s")
+    print(f"app-scoped:        {searches / new:8.2f} searches/s")
+    print(f"speedup:           {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=175, help="sites per search")
+    parser.add_argument("--searches", type=int, default=20, help="searches per mode")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sites, args.searches))
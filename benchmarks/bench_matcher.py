@@ -0,0 +1,122 @@
+"""Matcher benchmark
+
+Compares the decode-then-regex path that was used to apply the
+`err_text_pattern` of each site with the bytes-level `Matcher`
+engine. Every pattern of the pool is applied on a synthetic
+profile page.
+
+Usage: python benchmarks/bench_matcher.py [--size KiB] [--rounds N]
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from pathlib import Path
+import json
+import sys
+import re
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tracer"))
+
+from models import Matcher
+from models.website import CHUNK_SIZE
+
+
+POOL = Path(__file__).parent.parent / "data" / "pool.json"
+
+try:
+    from charset_normalizer import detect
+except ImportError:
+    try:
+        from chardet import detect
+    except ImportError:
+        detect = None
+
+
+def create_page(size: int) -> bytes:
+    """Creates a profile page of roughly `size` bytes"""
+
+    head = (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        "<title>tracer (@tracer) | Profile</title>"
+        "<link rel=\"stylesheet\" href=\"/static/main.css\"></head><body>"
+    )
+    row = "<div class=\"post\"><p>Lorem ipsum dolor sit amet, tracer.</p></div>\n"
+    body = row * max(1, (size - len(head)) // len(row))
+
+    return (head + body + "</body></html>").encode()
+
+
+def legacy(patterns, page: bytes) -> int:
+    """Decode the whole page, then run the pattern strings"""
+
+    matches = 0
+
+    for pattern in patterns:
+        encoding = (detect(page) or {}).get("encoding") if detect else None
+        text = page.decode(encoding or "utf-8", errors="replace")
+
+        matches += bool(re.search(pattern, text, flags=re.S + re.I + re.M))
+
+    return matches
+
+
+def streamed(matchers, page: bytes) -> int:
+    """Feed the raw page in chunks into precompiled matchers"""
+
+    matches = 0
+
+    for matcher in matchers:
+        stream = matcher.stream()
+        decision = None
+
+        for i in range(0, len(page), CHUNK_SIZE):
+            decision = stream.feed(page[i:i + CHUNK_SIZE])
+
+            if decision is not None:
+                break
+
+        matches += stream.finish() if decision is None else decision
+
+    return matches
+
+
+def measure(func, *args, rounds: int) -> float:
+    start = perf_counter()
+
+    for _ in range(rounds):
+        func(*args)
+
+    return (perf_counter() - start) / rounds
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=64, help="page size in KiB")
+    parser.add_argument("--rounds", type=int, default=1, help="rounds per engine")
+    args = parser.parse_args()
+
+    with open(POOL) as file:
+        patterns = [s["err_text_pattern"] for s in json.load(file) if s.get("err_text_pattern")]
+
+    page = create_page(args.size * 1024)
+
+    start = perf_counter()
+    matchers = [Matcher(pattern) for pattern in patterns]
+    compile_time = perf_counter() - start
+
+    assert legacy(patterns, page) == streamed(matchers, page), "Engines disagree"
+
+    old = measure(legacy, patterns, page, rounds=args.rounds)
+    new = measure(streamed, matchers, page, rounds=args.rounds)
+
+    print(f"patterns:          {len(patterns)}")
+    print(f"page size:         {len(page) / 1024:.0f} KiB")
+    print(f"charset detection: {'on' if detect else 'off (no detector installed)'}")
+    print(f"compile (once):    {compile_time * 1e3:8.2f} ms")
+    print(f"decode + regex:    {old * 1e3:8.2f} ms per pool")
+    print(f"bytes matcher:     {new * 1e3:8.2f} ms per pool")
+    print(f"speedup:           {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""CLI cold-start benchmark
+
+Measures how long it takes until Tracer does useful work:
+
+- `help`: until `python tracer --help` exits
+- `only`: until the first request of a run checking a single site
+- `full`: until the first request of a run checking every site
+
+The runs are started as new processes. A small hook, installed
+before Tracer is executed, reports when aiohttp sends its first
+request and ends the process right away, so neither the cache, the
+breakers nor the DNS cache are touched. The slowest imports of
+every scenario are taken from `python -X importtime`.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+
+from argparse import ArgumentParser
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import subprocess
+import shutil
+import time
+import sys
+import re
+
+
+ROOT = Path(__file__).parent.parent
+TRACER = ROOT / "tracer"
+USERNAME = "tracer-startup-bench"
+
+SCENARIOS = {
+    "help": ["--help"],
+    "only": ["--no-cache", "--only", "github.com", USERNAME],
+    "full": ["--no-cache", USERNAME],
+}
+
+# Executed by the child process. Wraps aiohttp's request method as
+# soon as aiohttp.client is imported, then runs Tracer like
+# `python tracer ...` does
+HOOK = """
+import importlib.machinery, os, runpy, sys, time
+
+class Hook:
+    def find_spec(self, name, path, target=None):
+        if name != "aiohttp.client":
+            return None
+
+        sys.meta_path.remove(self)
+        spec = importlib.machinery.PathFinder.find_spec(name, path)
+        execute = spec.loader.exec_module
+
+        def exec_module(module):
+            execute(module)
+
+            async def _request(*args, **kwargs):
+                print(f"FIRST_REQUEST {time.time()}", file=sys.stderr, flush=True)
+                os._exit(0)
+
+            module.ClientSession._request = _request
+
+        spec.loader.exec_module = exec_module
+
+        return spec
+
+sys.meta_path.insert(0, Hook())
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+# Seconds after which a run is given up
+RUN_TIMEOUT = 300
+
+
+def run(args: List[str], importtime: bool = False) -> Tuple[Optional[float], str]:
+    """Run Tracer once
+
+    Returns
+    -------
+    Tuple[Optional[float], str]
+        Seconds until the first request (or until the process
+        exited for --help), `None` if no request was sent, and
+        the stderr of the process
+    """
+
+    command = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    command += ["-c", HOOK, str(TRACER)] + args
+
+    start = time.time()
+    try:
+        process = subprocess.run(
+            command, capture_output=True, text=True, cwd=ROOT, timeout=RUN_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        return None, ""
+
+    end = time.time()
+
+    match = re.search(r"FIRST_REQUEST (\S+)", process.stderr)
+
+    if match:
+        return float(match.group(1)) - start, process.stderr
+
+    return (end - start if "--help" in args else None), process.stderr
+
+
+def slowest_imports(stderr: str, top: int) -> List[Tuple[int, str]]:
+    """Returns the imports with the highest cumulative time in µs
+
+    Nested imports are listed as well, hence the time of a module
+    also counts towards the packages importing it.
+    """
+
+    imports: Dict[str, int] = dict()
+
+    for _, cumulative, _, name in IMPORT_LINE.findall(stderr):
+        imports[name] = max(imports.get(name, 0), int(cumulative))
+
+    return sorted(((us, name) for name, us in imports.items()), reverse=True)[:top]
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="runs per scenario")
+    parser.add_argument("--top", type=int, default=8, help="imports listed per scenario")
+    args = parser.parse_args()
+
+    try:
+        for name, arguments in SCENARIOS.items():
+            samples = [run(arguments)[0] for _ in range(args.runs)]
+            times = [sample for sample in samples if sample is not None]
+
+            if times:
+                print(f"{name:<5} median {median(times) * 1000:7.1f}ms  "
+                      f"min {min(times) * 1000:7.1f}ms  max {max(times) * 1000:7.1f}ms")
+            else:
+                print(f"{name:<5} no request was sent within {RUN_TIMEOUT}s "
+                      "(are the sites skipped by a breaker?)")
+
+            for us, module in slowest_imports(run(arguments, importtime=True)[1], args.top):
+                print(f"      {us / 1000:7.1f}ms  {module}")
+    finally:
+        # Created for the username by the runs
+        shutil.rmtree(ROOT / "results" / USERNAME, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
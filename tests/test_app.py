@@ -0,0 +1,171 @@
+from tracer import (
+    CircuitBreaker, LatencyTracker, RequestScheduler, ResultCache, SiteSpec, StubTransport
+)
+from tracer.gui.registry import SearchRegistry
+from tracer.gui.reloader import PoolReloader
+from tracer.gui.metrics import ServiceMetrics
+from aiohttp.test_utils import AioHTTPTestCase, TestClient, TestServer
+from aiohttp import ClientSession, web
+from tempfile import TemporaryDirectory
+from unittest import mock
+from pathlib import Path
+import importlib
+import unittest
+import asyncio
+import json
+
+
+# `tracer.gui.app` is shadowed by the app the package exports
+gui = importlib.import_module("tracer.gui.app")
+
+SPECS = tuple(
+    SiteSpec.from_dict({"domain": f"{i}.org", "url": f"https://{i}.org/{{}}", "category": 1})
+    for i in range(5)
+)
+
+
+class TestSearchEndpoints(AioHTTPTestCase):
+    max_searches = 4
+    latency = 0.0
+
+    async def get_application(self) -> web.Application:
+        app = web.Application()
+        app.add_routes(gui.routes)
+
+        scheduler = RequestScheduler()
+        app["searches"] = SearchRegistry(max_searches=self.max_searches)
+        app["pool"] = PoolReloader("pool.json", SPECS)
+        app["scheduler"] = scheduler
+        app["session"] = StubTransport(latency=self.latency)
+        app["cache"] = ResultCache()
+        app["breaker"] = CircuitBreaker()
+        app["latency"] = LatencyTracker()
+        app["metrics"] = ServiceMetrics(scheduler, app["searches"], app["pool"])
+
+        async def cleanup(app: web.Application) -> None:
+            await app["searches"].close()
+            await app["pool"].close()
+
+        app.on_cleanup.append(cleanup)
+
+        return app
+
+    async def start(self, username: str = "tracer") -> None:
+        response = await self.client.post("/api/start_search", data={"username": username})
+
+        self.assertEqual(response.status, 200)
+        self.assertIn("search_id", response.cookies)
+
+    async def testStream(self):
+        await self.start()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await self.client.get("/api/search_stream")
+        text = await response.text()
+
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+        self.assertLess(loop.time() - start, 1, "The stream should end with the search")
+
+        events = text.split("\n\n")[:-1]
+        results = [
+            result for event in events[:-1]
+            for result in json.loads(event[len("data: "):])
+        ]
+
+        self.assertEqual(events[-1], "event: finished\ndata: ")
+        self.assertEqual(sorted(url for _, url, _ in results),
+                         [f"https://{i}.org/tracer" for i in range(5)])
+        self.assertTrue(all(found for found, _, _ in results))
+        self.assertEqual(self.app["searches"].active_searches, 0)
+
+    async def testPolling(self):
+        await self.start()
+
+        results = []
+
+        while True:
+            response = await self.client.get("/api/start_search")
+            self.assertEqual(response.status, 200)
+
+            if response.content_type != "application/json":
+                self.assertEqual(await response.text(), "Finished")
+                break
+
+            results.append((await response.json())["result"])
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.app["searches"].active_searches, 0)
+
+        response = await self.client.get("/api/start_search")
+        self.assertEqual(response.status, 400, "The search should be gone")
+
+    async def testUnknownSearch(self):
+        for path in ("/api/search_stream", "/api/start_search"):
+            response = await self.client.get(path, cookies={"search_id": "unknown"})
+
+            self.assertEqual(response.status, 400)
+
+
+class TestFullRegistry(AioHTTPTestCase):
+    max_searches = 1
+    latency = 10.0
+
+    get_application = TestSearchEndpoints.get_application
+
+    async def testRejected(self):
+        first = await self.client.post("/api/start_search", data={"username": "a"})
+        second = await self.client.post("/api/start_search", data={"username": "b"})
+
+        self.assertEqual(first.status, 200)
+        self.assertEqual(second.status, 503)
+        self.assertEqual(self.app["metrics"].searches_rejected.value(), 1)
+        self.assertEqual(self.app["searches"].active_searches, 1)
+
+
+class TestSharedSession(unittest.TestCase):
+    def testLifecycle(self):
+        async def main() -> ClientSession:
+            app = web.Application()
+            app.add_routes(gui.routes)
+            app.on_startup.append(gui.on_startup)
+            app.on_cleanup.append(gui.on_cleanup)
+
+            async with TestClient(TestServer(app)) as client:
+                session = app["session"]
+
+                for username in ("a", "b"):
+                    response = await client.post("/api/start_search", data={"username": username})
+                    self.assertEqual(response.status, 200)
+
+                    response = await client.get("/api/start_search")
+                    self.assertEqual(await response.text(), "Finished")
+
+                    self.assertIs(app["session"], session)
+                    self.assertFalse(session.closed)
+
+            return session
+
+        with TemporaryDirectory() as directory, \
+                mock.patch.object(gui, "ClientSession", wraps=ClientSession) as factory, \
+                mock.patch.object(gui.WebsitePool, "start_requests", autospec=True,
+                                  side_effect=gui.WebsitePool.start_requests) as start_requests, \
+                mock.patch.object(gui, "load_site_specs", return_value=()), \
+                mock.patch.multiple(
+                    gui,
+                    RESULTS_DIR=directory,
+                    CACHE_FILE=str(Path(directory, "cache.sqlite3")),
+                    BREAKER_FILE=str(Path(directory, "breakers.json")),
+                    LATENCY_FILE=str(Path(directory, "latency.json")),
+                    DNS_FILE=str(Path(directory, "dns.json"))):
+            session = asyncio.run(main())
+
+        factory.assert_called_once()
+        self.assertEqual(start_requests.call_count, 2)
+        self.assertTrue(all(call.args[1] is session for call in start_requests.call_args_list),
+                        "Every search should send its requests through the shared session")
+        self.assertTrue(session.closed, "The session should be closed on cleanup")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+from bench import Reservoir, create_sites, example
+from tracer import Matcher, load_website_data
+from unittest import mock
+import unittest
+import bench
+
+
+class TestBench(unittest.TestCase):
+    def testExample(self):
+        for pattern in (r"<title>Not Found</title>", r"user (does not|doesn't) exist", r"\d{3}[^a]b?"):
+            text = example(pattern)
+
+            self.assertIsNotNone(text)
+            self.assertTrue(Matcher(pattern).search(text.encode()))
+
+        self.assertIsNone(example(r"(unclosed"))
+
+    def testSites(self):
+        rules = list(load_website_data())
+        sites = create_sites(rules, len(rules), 1024)
+
+        for site in sites:
+            spec = site.spec(8080)
+            found = site.found_body("someone")
+
+            self.assertIn(":8080/", spec.url("someone"))
+            self.assertGreaterEqual(len(found), 1024 - 64)
+
+            if site.missing_body is not None:
+                self.assertTrue(spec.text_matcher.search(site.missing_body))
+                self.assertFalse(spec.text_matcher.search(found))
+
+    def testWithoutParser(self):
+        rules = [{"err_text_pattern": r"<h1>Not Found</h1>"}, {}]
+
+        with mock.patch.object(bench, "sre_parse", None):
+            self.assertIsNone(example(r"<h1>Not Found</h1>"))
+            sites = create_sites(rules, 2, 1024)
+
+        self.assertTrue(sites[0].spec().text_matcher.search(sites[0].missing_body),
+                        "A known marker should be served instead")
+        self.assertIsNone(sites[1].missing_body)
+
+    def testReservoir(self):
+        reservoir = Reservoir(size=10)
+
+        for i in range(1000):
+            reservoir.add(float(i))
+
+        self.assertEqual(len(reservoir), 1000)
+        self.assertLessEqual(reservoir.max(), 999.0)
+        self.assertEqual(Reservoir().percentile(99), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from tracer import CircuitBreaker
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import time
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def testOpen(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+
+        breaker.record_failure("a")
+        self.assertTrue(breaker.allow("a"))
+
+        breaker.record_failure("a")
+        self.assertEqual(breaker.state("a"), CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow("a"))
+
+        breaker.record_success("a")
+        self.assertEqual(breaker.state("a"), CircuitBreaker.CLOSED)
+
+    def testHalfOpen(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+
+        breaker.record_failure("a")
+        time.sleep(0.02)
+
+        self.assertEqual(breaker.state("a"), CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow("a"), "A single probe should be let through")
+
+        # Failed probe opens the breaker again
+        breaker.record_failure("a")
+        self.assertEqual(breaker.state("a"), CircuitBreaker.OPEN)
+
+    def testSingleProbe(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+
+        breaker.record_failure("a")
+
+        self.assertTrue(breaker.allow("a"))
+        self.assertEqual(breaker.state("a"), CircuitBreaker.HALF_OPEN)
+
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.record_failure("a")
+        self.assertFalse(breaker.allow("a"))
+
+    def testPersistence(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "breakers.json"
+
+            breaker = CircuitBreaker(path, threshold=1, cooldown=60)
+            breaker.record_failure("a")
+            breaker.save()
+
+            breaker = CircuitBreaker(path, threshold=1, cooldown=60)
+            breaker.load()
+
+            self.assertEqual(breaker.state("a"), CircuitBreaker.OPEN)
+            self.assertEqual(breaker.state("b"), CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from tracer import Category, ResultCache, SiteSpec
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import sqlite3
+import time
+
+
+spec = SiteSpec("example.org", "https://example.org/{}", Category.OTHER)
+
+
+class TestResultCache(unittest.TestCase):
+    def testMemory(self):
+        cache = ResultCache(memory_size=2)
+
+        self.assertIsNone(cache.get(spec, "a"))
+
+        cache.put(spec, "a", True, 200)
+        cache.put(spec, "b", False, 404)
+
+        self.assertEqual(cache.get(spec, "a")[:2], (True, 200))
+
+        # "b" is the least recently used entry now
+        cache.put(spec, "c", True, 200)
+
+        self.assertIsNone(cache.get(spec, "b"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def testTTL(self):
+        cache = ResultCache(positive_ttl=60, negative_ttl=0.01)
+
+        cache.put(spec, "found", True, 200)
+        cache.put(spec, "missing", False, 404)
+        time.sleep(0.02)
+
+        self.assertIsNotNone(cache.get(spec, "found"))
+        self.assertIsNone(cache.get(spec, "missing"))
+
+    def testRuleVersion(self):
+        cache = ResultCache()
+        other = SiteSpec("example.org", "https://example.org/{}", Category.OTHER,
+                         err_url_pattern="/404$")
+
+        cache.put(spec, "a", True, 200)
+
+        self.assertNotEqual(spec.rule_version, other.rule_version)
+        self.assertIsNone(cache.get(other, "a"), "Changed rules should invalidate entries")
+
+    def testPersistence(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "cache.sqlite3"
+
+            cache = ResultCache(path)
+            cache.put(spec, "a", True, 200)
+            cache.close()
+
+            cache = ResultCache(path)
+            self.assertEqual(cache.get(spec, "a")[:2], (True, 200))
+            cache.close()
+
+            cache = ResultCache(path, refresh=True)
+            self.assertIsNone(cache.get(spec, "a"))
+            cache.close()
+
+    def testLoad(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "cache.sqlite3"
+
+            cache = ResultCache(path)
+            cache.put(spec, "old", True, 200)
+            time.sleep(0.01)
+            cache.put(spec, "new", False, 404)
+            cache.close()
+
+            cache = ResultCache(path, memory_size=1)
+            self.assertEqual(len(cache), 1, "Only the newest entries should be loaded")
+
+            # Lookups are answered from memory without querying the database
+            db = sqlite3.connect(str(path))
+
+            with db:
+                db.execute("DELETE FROM results")
+
+            db.close()
+
+            self.assertEqual(cache.get(spec, "new")[:2], (False, 404))
+            self.assertIsNone(cache.get(spec, "old"))
+            cache.close()
+
+    def testPurge(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "cache.sqlite3"
+
+            cache = ResultCache(path, positive_ttl=60, negative_ttl=0.01)
+            cache.put(spec, "found", True, 200)
+            cache.put(spec, "missing", False, 404)
+            cache.close()
+
+            time.sleep(0.02)
+
+            cache = ResultCache(path, positive_ttl=60, negative_ttl=0.01)
+            self.assertEqual(cache.purge(), 0, "Expired entries should be purged on open")
+            self.assertIsNotNone(cache.get(spec, "found"))
+            cache.close()
+
+            with sqlite3.connect(path) as db:
+                self.assertEqual(db.execute("SELECT COUNT(*) FROM results").fetchone(), (1,))
+
+    def testDecisive(self):
+        self.assertTrue(ResultCache.is_decisive(200))
+        self.assertTrue(ResultCache.is_decisive(404))
+        self.assertFalse(ResultCache.is_decisive(429))
+        self.assertFalse(ResultCache.is_decisive(502))
+
+
+if __name__ == "__main__":
+    unittest.main()
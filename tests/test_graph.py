@@ -0,0 +1,75 @@
+from tracer import Result, ResultGraph, Website
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import json
+import re
+
+
+def create_result(domain: str, category: int, username: str, exists: bool = True) -> Result:
+    website = Website(domain, f"https://{domain}/{{}}", category)
+    website.set_username(username)
+
+    return Result(website, 200, exists, 0.1, domain, website.url)
+
+
+class TestResultGraph(unittest.TestCase):
+    def testIncremental(self):
+        graph = ResultGraph("tracer")
+
+        self.assertTrue(graph.add(create_result("a.org", 1, "tracer")))
+        self.assertTrue(graph.add(create_result("b.org", 1, "tracer")))
+        self.assertTrue(graph.add(create_result("c.org", 5, "tracer")))
+        # Duplicates, misses and other usernames are ignored
+        self.assertFalse(graph.add(create_result("a.org", 1, "tracer")))
+        self.assertFalse(graph.add(create_result("d.org", 1, "tracer", exists=False)))
+        self.assertFalse(graph.add(create_result("e.org", 1, "other")))
+
+        self.assertEqual(len(graph), 3)
+        self.assertEqual(
+            graph.sites,
+            {
+                "Socialmedia": [("a", "https://a.org/tracer"), ("b", "https://b.org/tracer")],
+                "Programming": [("c", "https://c.org/tracer")],
+            }
+        )
+
+        data = graph.as_dict()
+
+        self.assertEqual(len(data["nodes"]), 1 + 2 + 3)
+        self.assertIn(("category:Programming", "site:c.org"), data["edges"])
+
+    def testSameName(self):
+        graph = ResultGraph("tracer")
+        graph.add(create_result("example.com", 1, "tracer"))
+        graph.add(create_result("example.org", 1, "tracer"))
+
+        sites = [node for node in graph.as_dict()["nodes"] if node["type"] == "site"]
+
+        self.assertEqual([node["id"] for node in sites], ["site:example.com", "site:example.org"])
+        self.assertEqual([node["label"] for node in sites], ["example", "example"])
+        self.assertEqual(len(set(re.findall(r'<circle cx="(.*?)" cy="(.*?)"', graph.to_html()))), 4,
+                         "Every node needs a position of its own")
+
+    def testWrite(self):
+        graph = ResultGraph("<tracer>")
+        graph.add(create_result("a.org", 1, "<tracer>"))
+
+        with TemporaryDirectory() as directory:
+            graph.write_html(Path(directory, "graph.html"))
+            graph.write_json(Path(directory, "graph.json"))
+
+            page = Path(directory, "graph.html").read_text()
+            data = json.loads(Path(directory, "graph.json").read_text())
+
+        self.assertIn("<svg", page)
+        self.assertIn("&lt;tracer&gt;", page)
+        self.assertNotIn("<script", page)
+        self.assertEqual(data["username"], "<tracer>")
+
+    def testEmpty(self):
+        self.assertIn("<svg", ResultGraph("tracer").to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
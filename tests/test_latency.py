@@ -0,0 +1,59 @@
+from tracer import LatencyTracker
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def testNearestRank(self):
+        samples = list(range(1, 101))
+
+        self.assertEqual(LatencyTracker.nearest_rank(samples, 99), 99)
+        self.assertEqual(LatencyTracker.nearest_rank(samples, 50), 50)
+        self.assertEqual(LatencyTracker.nearest_rank([3.0], 99), 3.0)
+
+    def testTimeout(self):
+        tracker = LatencyTracker(percentile=99, headroom=2, min_samples=3)
+
+        self.assertEqual(tracker.timeout("a", 10).total, 10, "No history should use the ceiling")
+
+        for delay in (1.0, 2.0, 3.0):
+            tracker.record("a", delay)
+
+        timeout = tracker.timeout("a", 10)
+
+        self.assertEqual(timeout.total, 6.0)
+        self.assertEqual(timeout.connect, 3.0)
+        self.assertEqual(timeout.sock_read, 3.0)
+        self.assertEqual(tracker.timeout("a", 4).total, 4, "The ceiling should cap the timeout")
+
+    def testMinTimeout(self):
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record("a", 0.01)
+
+        self.assertEqual(tracker.estimate("a"), LatencyTracker.MIN_TIMEOUT)
+
+    def testHistorySize(self):
+        tracker = LatencyTracker(percentile=100, headroom=1, history_size=2, min_samples=1)
+
+        for delay in (9.0, 2.0, 3.0):
+            tracker.record("a", delay)
+
+        self.assertEqual(tracker.estimate("a"), 3.0, "Old delays should be dropped")
+
+    def testPersistence(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "latency.json"
+
+            tracker = LatencyTracker(path, min_samples=1, headroom=1)
+            tracker.record("a", 2.0)
+            tracker.save()
+
+            tracker = LatencyTracker(path, min_samples=1, headroom=1)
+            tracker.load()
+
+            self.assertEqual(tracker.estimate("a"), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from tracer import ResourceRegistry, SiteSpec
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from unittest import mock
+from pathlib import Path
+import threading
+import unittest
+import json
+import os
+
+
+POOL = [{"domain": "example.com", "url": "https://example.com/{}", "category": 1}]
+
+
+class TestResourceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.data_dir = Path(self.directory.name)
+        self.data_dir.joinpath("pool.json").write_text(json.dumps(POOL))
+        self.data_dir.joinpath("user_agents.json").write_text(json.dumps(["agent"]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testDefaults(self):
+        registry = ResourceRegistry()
+
+        self.assertTrue(registry.path("pool.json").exists())
+        self.assertGreater(len(registry.specs()), 100)
+        self.assertIs(registry.specs(), registry.specs())
+
+    def testOverride(self):
+        registry = ResourceRegistry(self.data_dir)
+
+        self.assertEqual(registry.user_agents(), ("agent",))
+        self.assertEqual(registry.logo(), "<DEFAULT LOGO>")
+        self.assertEqual(registry.website_data(), tuple(POOL))
+        self.assertEqual([spec.rules for spec in registry.specs()], [SiteSpec.from_dict(POOL[0]).rules])
+
+        with mock.patch.dict(os.environ, {ResourceRegistry.ENV_VAR: str(self.data_dir)}):
+            self.assertEqual(ResourceRegistry().data_dir, self.data_dir.resolve())
+
+    def testCache(self):
+        registry = ResourceRegistry(self.data_dir)
+        user_agents = registry.user_agents()
+
+        self.data_dir.joinpath("user_agents.json").write_text(json.dumps(["other"]))
+        self.assertIs(registry.user_agents(), user_agents)
+
+        registry.clear()
+        self.assertEqual(registry.user_agents(), ("other",))
+
+        registry.set_data_dir(self.data_dir / "missing")
+        self.assertEqual(registry.user_agents(), tuple())
+
+        with self.assertRaises(FileNotFoundError):
+            registry.specs()
+
+    def testConcurrentLoad(self):
+        registry = ResourceRegistry(self.data_dir)
+        cwd = os.getcwd()
+
+        with mock.patch("json.load", wraps=json.load) as load:
+            with ThreadPoolExecutor(16) as executor:
+                results = list(executor.map(lambda _: registry.user_agents(), range(64)))
+
+        self.assertEqual(load.call_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(os.getcwd(), cwd)
+
+    def testIndependentLoads(self):
+        registry = ResourceRegistry(self.data_dir)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load(_):
+            started.set()
+            release.wait(5)
+
+            return ["agent"]
+
+        with mock.patch("json.load", side_effect=slow_load), ThreadPoolExecutor(2) as executor:
+            try:
+                agents = executor.submit(registry.user_agents)
+                started.wait(5)
+
+                # Isn't blocked by the slow load of the user agents
+                self.assertEqual(executor.submit(registry.logo).result(timeout=1), "<DEFAULT LOGO>")
+            finally:
+                release.set()
+
+            self.assertEqual(agents.result(), ("agent",))
+
+
+if __name__ == "__main__":
+    unittest.main()
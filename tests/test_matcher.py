@@ -0,0 +1,82 @@
+from tracer import Matcher
+from pathlib import Path
+import unittest
+import copy
+import json
+import re
+
+
+POOL = Path(__file__).parent.parent / "data" / "pool.json"
+
+
+class TestMatcher(unittest.TestCase):
+    def testLiteralPrefix(self):
+        self.assertEqual(Matcher.literal_prefix("<title.*?>Amino</title>"), "<title")
+        self.assertEqual(Matcher.literal_prefix('class=\\"text'), 'class="text')
+        self.assertEqual(Matcher.literal_prefix("ab?c"), "a")
+        self.assertEqual(Matcher.literal_prefix("(?:a)|(?:b)"), "")
+        self.assertEqual(Matcher.literal_prefix("\\/users"), "/users")
+        self.assertEqual(Matcher.literal_prefix("\\d{9}"), "")
+
+    def testLiteralRuns(self):
+        self.assertEqual(
+            Matcher.literal_runs("<p.*?404 Not Found</p>"),
+            [(0, "<p"), (5, "404 Not Found</p>")]
+        )
+        self.assertEqual(
+            Matcher.literal_runs("<h2 class=(?:a)[^>]*>404</h2>"),
+            [(0, "<h2 class="), (20, ">404</h2>")]
+        )
+        self.assertEqual(Matcher("<p.*?404 Not Found</p>").anchor, b"404 not found</p>")
+
+    def testSearch(self):
+        matcher = Matcher("<title.*?>Not\\sFound</title>")
+
+        self.assertTrue(matcher.search(b"<html><TITLE lang='en'>not found</title>"))
+        self.assertFalse(matcher.search(b"<html><title>tracer</title>"))
+        self.assertFalse(matcher.search(b"no title at all"))
+        self.assertEqual(matcher.terminator, b"</title")
+
+    def testStream(self):
+        matcher = Matcher("<title.*?>Not Found</title>")
+
+        stream = matcher.stream()
+        self.assertIsNone(stream.feed(b"<html><ti"))
+        self.assertTrue(stream.feed(b"tle>Not Found</title>"))
+
+        stream = matcher.stream()
+        self.assertFalse(stream.feed(b"<title>tracer</title>"))
+
+        stream = Matcher("Not Found").stream()
+        self.assertIsNone(stream.feed(b"Not Fo"))
+        self.assertIsNone(stream.feed(b"x"))
+        self.assertFalse(stream.finish())
+
+    def testNonAsciiPattern(self):
+        matcher = Matcher("<title>Seite nicht gefunden – Fehler</title>")
+
+        self.assertTrue(matcher.search("<title>Seite nicht gefunden – Fehler</title>"))
+
+    def testPoolEquivalence(self):
+        """The bytes engine must agree with the str engine on the pool"""
+
+        with open(POOL) as file:
+            data = json.load(file)
+
+        page = "<html><head><title>tracer | Profile</title></head><body>x</body></html>"
+
+        for site in data:
+            pattern = site.get("err_text_pattern")
+
+            if pattern:
+                expected = bool(re.search(pattern, page, flags=Matcher.TEXT_FLAGS))
+                self.assertEqual(Matcher(pattern).search(page.encode()), expected, pattern)
+
+    def testCopy(self):
+        matcher = Matcher("<title>")
+
+        self.assertEqual(copy.deepcopy(matcher), matcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+from tracer import Counter, Gauge, Histogram, MetricsRegistry
+import unittest
+
+
+class TestMetrics(unittest.TestCase):
+    def testCounter(self):
+        counter = Counter("checks_total", "Checks", ("site", "outcome"))
+        counter.inc("a.org", "hit")
+        counter.inc("a.org", "hit", amount=2)
+
+        self.assertEqual(counter.value("a.org", "hit"), 3)
+        self.assertEqual(counter.value("a.org", "miss"), 0)
+
+        with self.assertRaises(ValueError):
+            counter.inc("a.org")
+
+        with self.assertRaises(ValueError):
+            counter.inc("a.org", "hit", amount=-1)
+
+    def testHistogram(self):
+        histogram = Histogram("delay_seconds", "Delay", buckets=(0.1, 1))
+
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count(), 4)
+        self.assertEqual(histogram.render()[2:], [
+            'delay_seconds_bucket{le="0.1"} 2',
+            'delay_seconds_bucket{le="1"} 3',
+            'delay_seconds_bucket{le="+Inf"} 4',
+            'delay_seconds_sum 3.65',
+            'delay_seconds_count 4',
+        ])
+
+    def testRender(self):
+        registry = MetricsRegistry()
+        registry.counter("started_total", "Started searches").inc()
+        registry.gauge("in_flight", "Requests", function=lambda: 7)
+        registry.counter("checks_total", "Checks", ("site",)).inc('say "hi"\n')
+
+        text = registry.render()
+
+        self.assertIn("# TYPE started_total counter\nstarted_total 1\n", text)
+        self.assertIn("in_flight 7\n", text)
+        self.assertIn('checks_total{site="say \\"hi\\"\\n"} 1\n', text)
+        self.assertEqual(len(registry), 3)
+
+        with self.assertRaises(ValueError):
+            registry.gauge("in_flight", "Duplicate")
+
+        with self.assertRaises(ValueError):
+            Gauge("labelled", "Labelled", ("site",), function=lambda: 1)
+
+    def testHelp(self):
+        registry = MetricsRegistry()
+        registry.counter("quoted_total", 'Checks of "slow" sites\nC:\\').inc()
+
+        self.assertIn('# HELP quoted_total Checks of "slow" sites\\nC:\\\\\n', registry.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+from tracer.gui.registry import RegistryFullError, Search, SearchRegistry
+import unittest
+import asyncio
+
+
+async def forever(search: Search) -> None:
+    await asyncio.sleep(3600)
+
+
+class TestSearch(unittest.TestCase):
+    def testIdleTimeout(self):
+        search = Search("id", "a")
+
+        self.assertFalse(search.expired(ttl=60, idle_timeout=1, now=search.created + 0.5))
+        self.assertTrue(search.expired(ttl=60, idle_timeout=1, now=search.created + 2))
+        self.assertTrue(search.expired(ttl=1, idle_timeout=60, now=search.created + 2))
+
+        search.touch()
+        self.assertFalse(search.expired(ttl=60, idle_timeout=1, now=search.last_seen + 0.5))
+
+    def testWaitResult(self):
+        async def main():
+            search = Search("id", "a")
+            loop = asyncio.get_running_loop()
+
+            start = loop.time()
+            self.assertIsNone(await search.wait_result(0.05))
+            self.assertGreaterEqual(loop.time() - start, 0.04)
+
+            loop.call_later(0.01, search.finish)
+
+            start = loop.time()
+            self.assertIsNone(await search.wait_result(5))
+            self.assertLess(loop.time() - start, 1, "Finishing should end the wait")
+
+        asyncio.run(main())
+
+
+class TestSearchRegistry(unittest.TestCase):
+    def testCapacity(self):
+        async def main():
+            registry = SearchRegistry(max_searches=1)
+            search = registry.create("a", forever)
+
+            with self.assertRaises(RegistryFullError):
+                registry.create("b", forever)
+
+            registry.remove(search.search_id)
+            await asyncio.sleep(0)
+
+            self.assertTrue(search.task.cancelled())
+            self.assertEqual(registry.create("b", forever).username, "b")
+
+            await registry.close()
+
+        asyncio.run(main())
+
+        with self.assertRaises(ValueError):
+            SearchRegistry(max_searches=-1)
+
+    def testExpiry(self):
+        async def main():
+            registry = SearchRegistry(ttl=0.05, idle_timeout=60)
+            search = registry.create("a", forever)
+
+            self.assertEqual(registry.sweep(), 0)
+            await asyncio.sleep(0.1)
+            self.assertEqual(registry.sweep(), 1)
+            await asyncio.sleep(0)
+
+            self.assertNotIn(search.search_id, registry)
+            self.assertTrue(search.task.cancelled())
+            self.assertTrue(search.finished)
+
+            # Full registries evict expired searches before rejecting
+            registry = SearchRegistry(max_searches=1, ttl=0.05)
+            registry.create("a", forever)
+            await asyncio.sleep(0.1)
+            registry.create("b", forever)
+
+            self.assertEqual(len(registry), 1)
+
+            await registry.close()
+
+        asyncio.run(main())
+
+    def testSweeper(self):
+        async def main():
+            registry = SearchRegistry(idle_timeout=0.02)
+            kept = registry.create("a", forever)
+            evicted = registry.create("b", forever)
+            sweeper = registry.start_sweeper(interval=0.01)
+
+            for _ in range(10):
+                # Accessing a search keeps it alive
+                registry.get(kept.search_id)
+                await asyncio.sleep(0.01)
+
+            self.assertEqual(registry.active_searches, 1)
+            self.assertIn(kept.search_id, registry)
+            self.assertTrue(evicted.task.cancelled())
+
+            await registry.close()
+
+            self.assertTrue(sweeper.cancelled())
+            self.assertTrue(kept.task.cancelled())
+            self.assertEqual(len(registry), 0)
+
+        asyncio.run(main())
+
+    def testBoundedQueue(self):
+        async def produce(search: Search) -> None:
+            for i in range(5):
+                await search.queue.put(i)
+
+        async def main():
+            registry = SearchRegistry(queue_size=2)
+            search = registry.create("a", produce)
+            await asyncio.sleep(0.01)
+
+            self.assertFalse(search.finished, "A full queue should pause the search")
+            self.assertEqual(registry.queued_results, 2)
+            self.assertEqual(registry.active_searches, 1)
+
+            results = []
+
+            while not search.drained:
+                result = await search.wait_result(1)
+
+                if result is not None:
+                    results.append(result)
+
+            self.assertEqual(results, list(range(5)))
+            self.assertEqual(registry.queued_results, 0)
+
+            await registry.close()
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+from tracer import PoolSnapshot, RequestScheduler, WebsitePool
+from tracer.gui.registry import SearchRegistry
+from tracer.gui.reloader import PoolReloader
+from tracer.gui.metrics import ServiceMetrics
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import asyncio
+import json
+
+
+POOL = [
+    {"domain": "a.org", "url": "https://a.org/{}", "category": 1},
+    {"domain": "b.org", "url": "https://b.org/{}", "category": 2},
+]
+
+
+class TestPoolReloader(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name, "pool.json")
+        self.path.write_text(json.dumps(POOL[:1]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create(self) -> PoolReloader:
+        return PoolReloader(self.path, PoolSnapshot(self.path).specs())
+
+    def testReload(self):
+        async def main():
+            reloader = self.create()
+            self.assertFalse(reloader.changed())
+
+            # A search that is already running
+            running = WebsitePool.from_specs(reloader.specs, "tracer")
+            old = reloader.specs
+
+            self.path.write_text(json.dumps(POOL))
+            self.assertTrue(reloader.changed())
+            self.assertTrue(await reloader.reload())
+
+            self.assertFalse(reloader.changed())
+            self.assertEqual([spec.domain for spec in reloader.specs], ["a.org", "b.org"])
+            self.assertEqual(len(old), 1, "The previous specs must stay untouched")
+            self.assertEqual([site.domain for site in running], ["a.org"])
+            self.assertEqual(reloader.reloads, 1)
+            self.assertEqual(reloader.failures, 0)
+            self.assertGreaterEqual(reloader.last_duration, 0)
+            self.assertIsNone(reloader.last_error)
+
+            await reloader.close()
+
+        asyncio.run(main())
+
+    def testInvalidPool(self):
+        async def main():
+            reloader = self.create()
+            specs = reloader.specs
+
+            self.path.write_text(json.dumps([{"domain": "a.org"}]))
+            self.assertFalse(await reloader.reload())
+
+            self.assertIs(reloader.specs, specs, "The previous pool should be kept")
+            self.assertEqual(reloader.failures, 1)
+            self.assertEqual(reloader.reloads, 0)
+            self.assertIn("PoolSchemaError", reloader.last_error)
+            self.assertIsNotNone(reloader.last_duration)
+
+            # Isn't retried until the file changes again
+            self.assertFalse(reloader.changed())
+
+            await reloader.close()
+
+        asyncio.run(main())
+
+    def testWatcher(self):
+        async def main():
+            reloader = self.create()
+            metrics = ServiceMetrics(RequestScheduler(), SearchRegistry(), reloader)
+            events = []
+
+            def listener(pool, succeeded):
+                events.append(succeeded)
+                metrics.observe_reload(pool, succeeded)
+
+            watcher = reloader.start_watcher(interval=0.01, listener=listener)
+
+            for content in ("[", json.dumps(POOL)):
+                count = len(events)
+                self.path.write_text(content)
+
+                for _ in range(200):
+                    if len(events) > count:
+                        break
+
+                    await asyncio.sleep(0.01)
+
+            await reloader.close()
+
+            self.assertTrue(watcher.cancelled())
+            self.assertEqual(events, [False, True])
+            self.assertEqual(len(reloader.specs), 2)
+
+            return metrics.render()
+
+        text = asyncio.run(main())
+
+        self.assertIn('tracer_pool_reloads_total{outcome="failure"} 1\n', text)
+        self.assertIn('tracer_pool_reloads_total{outcome="success"} 1\n', text)
+        self.assertIn("tracer_pool_reload_duration_seconds_count 2\n", text)
+        self.assertIn("tracer_pool_sites 2\n", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
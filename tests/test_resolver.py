@@ -0,0 +1,116 @@
+from tracer import CachingResolver, Category, StubTransport, WebsitePool, Website
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import asyncio
+import socket
+
+
+class FakeResolver:
+    def __init__(self):
+        self.lookups = []
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.lookups.append(host)
+
+        if host.endswith(".invalid"):
+            raise OSError("Name or service not known")
+
+        return [{
+            "hostname": host, "host": "127.0.0.1", "port": port,
+            "family": socket.AF_INET, "proto": 0, "flags": 0
+        }]
+
+    async def close(self):
+        pass
+
+
+class TestCachingResolver(unittest.TestCase):
+    def testCache(self):
+        fake = FakeResolver()
+        resolver = CachingResolver(resolver=fake)
+
+        async def main():
+            first = await resolver.resolve("example.org", 443)
+            second = await resolver.resolve("example.org", 80)
+
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        self.assertEqual(fake.lookups, ["example.org"])
+        self.assertEqual(first[0]["port"], 443)
+        self.assertEqual(second[0]["port"], 80, "Cached addresses should use the requested port")
+        self.assertEqual((resolver.hits, resolver.misses), (1, 1))
+
+    def testTTL(self):
+        fake = FakeResolver()
+        resolver = CachingResolver(ttl=0, resolver=fake)
+
+        async def main():
+            await resolver.resolve("example.org")
+            await resolver.resolve("example.org")
+
+        asyncio.run(main())
+
+        self.assertEqual(len(fake.lookups), 2)
+
+    def testPrefetch(self):
+        fake = FakeResolver()
+        resolver = CachingResolver(resolver=fake)
+
+        resolved = asyncio.run(resolver.prefetch(["a.org", "b.org", "a.org", "c.invalid"]))
+
+        self.assertEqual(resolved, 2)
+        self.assertEqual(sorted(fake.lookups), ["a.org", "b.org", "c.invalid"])
+
+    def testPersistence(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "dns.json"
+
+            resolver = CachingResolver(path, resolver=FakeResolver())
+            asyncio.run(resolver.resolve("example.org", 443, socket.AF_UNSPEC))
+            resolver.save()
+
+            fake = FakeResolver()
+            resolver = CachingResolver(path, resolver=fake)
+            resolver.load()
+
+            addresses = asyncio.run(resolver.resolve("example.org", 443, socket.AF_UNSPEC))
+
+            self.assertEqual(fake.lookups, [])
+            self.assertEqual(addresses[0]["host"], "127.0.0.1")
+
+    def testWarmUp(self):
+        pool = WebsitePool(
+            Website("a.org", "https://a.org/{}", Category.OTHER),
+            Website("b.org", "https://{}.b.org/", Category.OTHER),
+        )
+        fake = FakeResolver()
+
+        self.assertEqual(pool.hosts, ("a.org",), "Hosts containing the username need it")
+
+        pool.set_username("tracer")
+        self.assertEqual(pool.hosts, ("a.org", "tracer.b.org"))
+
+        report = asyncio.run(pool.warm_up(object(), CachingResolver(resolver=fake)))
+
+        self.assertEqual(report["resolved"], 2)
+        self.assertEqual(report["connected"], 0)
+
+    def testPreconnect(self):
+        pool = WebsitePool(
+            Website("a.org", "https://a.org/{}", Category.OTHER),
+            Website("b.org", "http://b.org:8080/user/{}", Category.OTHER),
+        )
+        urls = []
+        transport = StubTransport(status=lambda url: urls.append(url) or 200)
+
+        report = asyncio.run(pool.warm_up(transport, preconnect=True))
+
+        self.assertEqual(report["connected"], 2)
+        self.assertEqual(sorted(urls), ["http://b.org:8080/", "https://a.org/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from tracer import RetryBudget, RetryPolicy
+from aiohttp import (
+    ClientConnectorCertificateError, ClientConnectorError, ClientSSLError, ServerDisconnectedError
+)
+from unittest import mock
+import unittest
+import ssl
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def testClassify(self):
+        policy = RetryPolicy()
+
+        self.assertEqual(policy.classify_exception(ServerDisconnectedError()), RetryPolicy.RESET)
+        self.assertEqual(policy.classify_exception(ConnectionResetError()), RetryPolicy.RESET)
+        self.assertIsNone(policy.classify_exception(ValueError()))
+        self.assertEqual(policy.classify_response(429), RetryPolicy.THROTTLED)
+        self.assertEqual(policy.classify_response(503), RetryPolicy.THROTTLED)
+        self.assertIsNone(policy.classify_response(404))
+
+    def testClassifyConnector(self):
+        policy = RetryPolicy()
+        key = mock.Mock()
+
+        self.assertEqual(policy.classify_exception(ClientConnectorError(key, OSError())),
+                         RetryPolicy.CONNECT)
+        self.assertIsNone(policy.classify_exception(ClientSSLError(key, ssl.SSLError())))
+        self.assertIsNone(policy.classify_exception(
+            ClientConnectorCertificateError(key, ssl.SSLCertVerificationError())
+        ))
+
+    def testMaxAttempts(self):
+        policy = RetryPolicy(max_attempts=2)
+
+        self.assertTrue(policy.should_retry(RetryPolicy.RESET, 1))
+        self.assertFalse(policy.should_retry(RetryPolicy.RESET, 2))
+        self.assertFalse(policy.should_retry(None, 1))
+
+    def testBudget(self):
+        budget = RetryBudget(ratio=0.5, minimum=1)
+        policy = RetryPolicy(max_attempts=10, budget=budget)
+
+        self.assertTrue(policy.should_retry(RetryPolicy.RESET, 1))
+        self.assertFalse(policy.should_retry(RetryPolicy.RESET, 1), "The budget should be exhausted")
+
+        for _ in range(4):
+            budget.record_request()
+
+        self.assertEqual(budget.remaining, 2)
+        self.assertEqual(budget.retries, 1)
+
+    def testDelay(self):
+        policy = RetryPolicy(backoff={RetryPolicy.CONNECT: (1.0, 3.0)})
+
+        for attempt in range(1, 6):
+            self.assertLessEqual(policy.delay(RetryPolicy.CONNECT, attempt), 3.0)
+
+        self.assertGreaterEqual(policy.delay(RetryPolicy.THROTTLED, 1, "5"), 5.0)
+        self.assertEqual(policy.delay(RetryPolicy.THROTTLED, 1, "3600"), policy.max_retry_after)
+
+    def testParseRetryAfter(self):
+        self.assertEqual(RetryPolicy.parse_retry_after("120"), 120.0)
+        self.assertEqual(RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+        self.assertIsNone(RetryPolicy.parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
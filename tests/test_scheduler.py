@@ -0,0 +1,56 @@
+from tracer import RequestScheduler
+import unittest
+import asyncio
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def testLimits(self):
+        scheduler = RequestScheduler(concurrency=3, per_host_limit=2)
+        peak = {"global": 0, "a": 0}
+        active = {"global": 0, "a": 0}
+
+        async def request(host: str) -> None:
+            async with scheduler.slot(host):
+                active["global"] += 1
+                active[host] = active.get(host, 0) + 1
+                peak["global"] = max(peak["global"], active["global"])
+                peak["a"] = max(peak["a"], active["a"])
+
+                await asyncio.sleep(0.01)
+
+                active["global"] -= 1
+                active[host] -= 1
+
+        async def main() -> None:
+            await asyncio.gather(*[request(h) for h in "aaaaabcdef"])
+
+        asyncio.run(main())
+
+        self.assertEqual(peak["global"], 3)
+        self.assertEqual(peak["a"], 2)
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def testInvalidLimit(self):
+        with self.assertRaises(ValueError):
+            RequestScheduler(concurrency=-1)
+
+        with self.assertRaises(ValueError):
+            RequestScheduler(concurrency=0)
+
+        with self.assertRaises(ValueError):
+            RequestScheduler(per_host_limit=0)
+
+    def testConnectorLimits(self):
+        async def main():
+            connector = RequestScheduler(concurrency=8, per_host_limit=2).create_connector()
+
+            self.assertEqual(connector.limit, 8)
+            self.assertEqual(connector.limit_per_host, 2)
+
+            await connector.close()
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
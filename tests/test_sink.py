@@ -0,0 +1,91 @@
+from tracer import CsvSink, JsonlSink, StubTransport, Website, WebsitePool
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import unittest
+import asyncio
+import json
+import csv
+import io
+
+
+def create_pool() -> WebsitePool:
+    pool = WebsitePool(
+        Website("a.org", "https://a.org/{}", 1),
+        Website("b.org", "https://b.org/{}", 5, err_text_pattern="Not Found"),
+    )
+    pool.set_username("tracer")
+
+    return pool
+
+
+async def write(sink, transport) -> None:
+    async with sink:
+        async for result in create_pool().start_requests(transport, 1):
+            await sink.write(result)
+
+
+class TestResultSink(unittest.TestCase):
+    def testJsonl(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory, "results.jsonl")
+
+            asyncio.run(write(JsonlSink(path), StubTransport(body=b"Not Found")))
+            # Appends to an existing file
+            asyncio.run(write(JsonlSink(path), StubTransport(latency=2)))
+
+            records = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual({r["site"] for r in records}, {"a", "b"})
+        self.assertEqual(
+            {r["site"]: r["user_exists"] for r in records[:2]}, {"a": True, "b": False}
+        )
+        self.assertTrue(all(r["timeout"] for r in records[2:]))
+        self.assertEqual(records[0]["username"], "tracer")
+        self.assertIn(records[0]["category"], ("socialmedia", "programming"))
+
+    def testCsv(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory, "results.csv")
+
+            asyncio.run(write(CsvSink(path), StubTransport()))
+            asyncio.run(write(CsvSink(path), StubTransport()))
+
+            with open(path, newline="") as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["status_code"], "200")
+        self.assertEqual(rows[0]["error"], "")
+        self.assertNotEqual(rows[0]["ttfb"], "")
+
+    def testStdout(self):
+        stream = io.StringIO()
+        sink = JsonlSink("-", flush_size=1, stream=stream)
+
+        asyncio.run(write(sink, StubTransport()))
+
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+        self.assertEqual(sink.written, 2)
+        self.assertFalse(stream.closed)
+
+    def testFlushInterval(self):
+        stream = io.StringIO()
+        sink = JsonlSink("-", flush_interval=0.05, stream=stream)
+
+        async def main():
+            async with sink:
+                async for result in create_pool().start_requests(StubTransport(), 1):
+                    await sink.write(result)
+
+                # Flushed without another record arriving
+                await asyncio.sleep(0.2)
+                lines = len(stream.getvalue().splitlines())
+
+            return lines
+
+        self.assertEqual(asyncio.run(main()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+from tracer import Category, SiteSpec, Website, WebsitePool
+import unittest
+import copy
+
+
+spec = SiteSpec.from_dict({
+    "domain": "example.com",
+    "url": "https://api.example.com/users/{}",
+    "display_url": "https://example.com/{}",
+    "category": Category.PROGRAMMING,
+    "err_text_pattern": "<title>Not Found</title>"
+})
+
+
+class TestSiteSpec(unittest.TestCase):
+    def testURLs(self):
+        self.assertEqual(spec.url("tracer"), "https://example.com/tracer")
+        self.assertEqual(spec.true_url("tracer"), "https://api.example.com/users/tracer")
+        self.assertEqual(spec.url("a/b?c"), "https://example.com/a%2Fb%3Fc")
+
+    def testReadOnly(self):
+        with self.assertRaises(AttributeError):
+            spec.domain = "example.org"
+
+        self.assertIs(copy.deepcopy(spec), spec)
+
+    def testSharedSpec(self):
+        pool = WebsitePool.from_specs([spec, spec], username="tracer")
+        first, second = pool.sites
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.spec, second.spec)
+        self.assertEqual(first.true_url, "https://api.example.com/users/tracer")
+
+        second.set_username("other")
+
+        self.assertEqual(first.username, "tracer")
+        self.assertEqual(Website.from_spec(spec).url, "https://example.com/{}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+from tracer import Matcher, PoolSchemaError, PoolSnapshot, SiteSpec
+from tempfile import TemporaryDirectory
+from unittest import mock
+from pathlib import Path
+import unittest
+import json
+import sys
+import os
+
+
+POOL = [
+    {
+        "domain": "example.com",
+        "url": "https://api.example.com/users/{}",
+        "display_url": "https://example.com/{}",
+        "category": 5,
+        "err_text_pattern": "<title>Not Found</title>",
+        "err_on_dot": True,
+    },
+    {
+        "domain": "example.org",
+        "url": "https://example.org/{}",
+        "category": 1,
+        "err_url_pattern": "/login$",
+        "request_method": "head",
+    },
+]
+
+
+class TestPoolSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.source = Path(self.directory.name, "pool.json")
+        self.source.write_text(json.dumps(POOL))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testRoundTrip(self):
+        snapshot = PoolSnapshot(self.source)
+        compiled = snapshot.compile()
+        loaded = snapshot.load()
+
+        self.assertEqual(snapshot.path, self.source.with_suffix(".snapshot"))
+        self.assertEqual(loaded, compiled)
+        self.assertEqual([spec.rule_version for spec in loaded],
+                         [spec.rule_version for spec in compiled])
+        self.assertEqual(loaded[0].url("tracer"), "https://example.com/tracer")
+        self.assertTrue(loaded[0].text_matcher.search(b"<html><title>not found</title>"))
+        self.assertFalse(loaded[0].text_matcher.search(b"<title>tracer</title>"))
+        self.assertTrue(loaded[1].url_matcher.search("https://example.org/login"))
+
+    def testInvalidation(self):
+        snapshot = PoolSnapshot(self.source)
+        snapshot.compile()
+
+        # Only the modification time changed, the digest still matches
+        os.utime(self.source, ns=(0, 0))
+        self.assertIsNotNone(snapshot.load())
+
+        # The header got updated, the pool isn't hashed again
+        with mock.patch.object(Path, "read_bytes", side_effect=AssertionError):
+            self.assertIsNotNone(snapshot.load())
+
+        self.source.write_text(json.dumps(POOL[:1]))
+        self.assertIsNone(snapshot.load())
+
+        self.assertEqual(len(snapshot.specs()), 1)
+        self.assertEqual(len(snapshot.load()), 1)
+
+    def testCodeChange(self):
+        snapshot = PoolSnapshot(self.source)
+        snapshot.compile()
+
+        module = sys.modules[PoolSnapshot.__module__]
+
+        with mock.patch.object(module, "_code_fingerprint", return_value="changed"):
+            self.assertIsNone(snapshot.load())
+
+        self.assertIsNotNone(snapshot.load())
+        self.assertEqual(sorted(path.name for path in self.source.parent.iterdir()),
+                         ["pool.json", "pool.snapshot"], "No temporary files should be left")
+
+    def testCorruptSnapshot(self):
+        snapshot = PoolSnapshot(self.source)
+        self.assertIsNone(snapshot.load())
+
+        snapshot.compile()
+        snapshot.path.write_bytes(snapshot.path.read_bytes()[:20])
+
+        self.assertIsNone(snapshot.load())
+        self.assertEqual(len(snapshot.specs()), 2)
+
+    def testValidation(self):
+        invalid = [
+            {"domain": "a.org", "url": "https://a.org/{}"},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": 99},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": "1"},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": 1, "err_on_dot": 1},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": 1, "typo": True},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": 1, "err_text_pattern": "("},
+            {"domain": "a.org", "url": "https://a.org/{}", "category": 1, "request_method": "put"},
+        ]
+
+        for entry in invalid:
+            self.source.write_text(json.dumps([entry]))
+
+            with self.assertRaises(PoolSchemaError):
+                PoolSnapshot(self.source).compile()
+
+        with self.assertRaises(PoolSchemaError):
+            PoolSnapshot.validate(POOL + POOL[:1])
+
+        self.assertFalse(PoolSnapshot(self.source).path.exists())
+
+
+class TestRecords(unittest.TestCase):
+    def testSpecRecord(self):
+        spec = SiteSpec.from_dict({**POOL[0], "url": "https://example.com/{}?q={{x}}"})
+        restored = SiteSpec.from_record(spec.as_record())
+
+        self.assertEqual(restored, spec)
+        self.assertEqual(restored.true_url("a"), "https://example.com/a?q={x}")
+
+    def testRestoredMatcher(self):
+        matcher = Matcher("<title.*?>Not Found</title>")
+        restored = Matcher.from_state(matcher.state)
+
+        self.assertEqual(restored, matcher)
+        self.assertEqual(restored.prefix, matcher.prefix)
+        self.assertEqual(restored.terminator, matcher.terminator)
+
+        stream = restored.stream()
+
+        # Compiled when restored, not by the first match
+        with mock.patch("re.compile", side_effect=AssertionError):
+            self.assertIsNone(stream.feed(b"<html><title>Not "))
+            self.assertTrue(stream.feed(b"Found</title>"))
+
+    def testRestoredSpec(self):
+        spec = SiteSpec.from_dict(POOL[0])
+        restored = SiteSpec.from_record(spec.as_record())
+
+        self.assertEqual(restored.text_matcher.regex.pattern, spec.text_matcher.regex.pattern)
+
+        with mock.patch("re.compile", side_effect=AssertionError):
+            self.assertTrue(restored.text_matcher.search(b"<title>Not Found</title>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from tracer import PhaseTimings, StubTransport, Website, create_trace_config
+from aiohttp.test_utils import TestServer
+from aiohttp import ClientSession, web
+import unittest
+import asyncio
+
+
+class TestPhaseTimings(unittest.TestCase):
+    def testAggregate(self):
+        timings = [PhaseTimings() for _ in range(4)]
+
+        for i, timing in enumerate(timings, start=1):
+            timing.ttfb = i / 10
+            timing.add("match", 0.001)
+
+        phases = PhaseTimings.aggregate(timings + [None])
+
+        self.assertEqual(set(phases), {"ttfb", "match"})
+        self.assertEqual(phases["ttfb"]["count"], 4)
+        self.assertAlmostEqual(phases["ttfb"]["mean"], 0.25)
+        self.assertEqual(phases["ttfb"]["p50"], 0.2)
+        self.assertEqual(phases["ttfb"]["max"], 0.4)
+
+    def testCheckTimings(self):
+        website = Website(
+            "example.org", "https://example.org/{}", 0,
+            err_text_pattern="<title>Not Found</title>"
+        )
+        website.set_username("tracer")
+
+        transport = StubTransport(body=b"<title>Profile</title>" + b"x" * 20_000, latency=0.02)
+        asyncio.run(website.send_request(transport))
+
+        timings = website.result.timings
+
+        self.assertGreaterEqual(timings.ttfb, 0.015)
+        self.assertIsNotNone(timings.body)
+        self.assertIsNotNone(timings.match)
+        self.assertIsNone(timings.dns)
+        self.assertIn("ttfb", website.result.verbose(False))
+        self.assertEqual(website.result.as_dict()["timings"]["ttfb"], timings.ttfb)
+
+    def testTraceConfig(self):
+        async def handler(request):
+            return web.Response(text="<title>Profile</title>")
+
+        async def main():
+            app = web.Application()
+            app.router.add_get("/{name}", handler)
+
+            async with TestServer(app, host="127.0.0.1") as server:
+                website = Website("localhost", f"http://localhost:{server.port}/{{}}", 0)
+                website.set_username("tracer")
+
+                async with ClientSession(trace_configs=[create_trace_config()]) as session:
+                    await website.send_request(session, 5)
+
+            return website.result
+
+        result = asyncio.run(main())
+
+        self.assertTrue(result.user_exists)
+        self.assertIsNotNone(result.timings.dns)
+        self.assertIsNotNone(result.timings.connect)
+        self.assertIsNotNone(result.timings.ttfb)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,6 +33,11 @@ class TestTracer(unittest.TestCase):
         self.assertEqual(len(tracer.pool), 1)
         self.assertEqual(tracer.pool.sites[0].domain, "example.org")
 
+    def testStatePath(self):
+        tracer = Tracer("example", data, create_file_output=False)
+
+        self.assertIsNone(tracer.state_path("cache.sqlite3"), "No files should be written")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,55 @@
+from tracer import Category, StubTransport, Website, WebsitePool
+from aiohttp import ClientTimeout
+import unittest
+import asyncio
+
+
+class TestStubTransport(unittest.TestCase):
+    def testScriptedResponses(self):
+        transport = StubTransport(
+            status=lambda url: 404 if url.endswith("/missing") else 200,
+            body=b"x" * 10,
+            headers={"Content-Length": "10"}
+        )
+
+        async def main():
+            found = await transport.request("GET", "https://example.org/tracer")
+            missing = await transport.request("GET", "https://example.org/missing")
+            chunks = [chunk async for chunk in found.iter_chunked(4)]
+
+            return found, missing, chunks
+
+        found, missing, chunks = asyncio.run(main())
+
+        self.assertEqual((found.status, missing.status), (200, 404))
+        self.assertEqual(found.host, "example.org")
+        self.assertEqual(chunks, [b"xxxx", b"xxxx", b"xx"])
+        self.assertEqual(transport.requests, 2)
+
+    def testTimeout(self):
+        transport = StubTransport(latency=1)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(transport.request("GET", "https://example.org", timeout=ClientTimeout(0.01)))
+
+    def testPool(self):
+        pool = WebsitePool(
+            Website("a.org", "https://a.org/{}", Category.OTHER, err_text_pattern="Not Found"),
+            Website("b.org", "https://b.org/{}", Category.OTHER, err_text_pattern="Not Found"),
+            Website("c.org", "https://c.org/{}", Category.OTHER, err_url_pattern="/login$"),
+        )
+        pool.set_username("tracer")
+
+        transport = StubTransport(
+            body=lambda url: b"<h1>Not Found</h1>" if "b.org" in url else b"<h1>tracer</h1>",
+            final_url=lambda url: "https://c.org/login" if "c.org" in url else url
+        )
+
+        async def main():
+            return {r.host: r.user_exists async for r in pool.start_requests(transport)}
+
+        self.assertEqual(asyncio.run(main()), {"a.org": True, "b.org": False, "c.org": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
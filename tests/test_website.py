@@ -1,6 +1,9 @@
-from tracer import Category, Result, Website
+from tracer import (
+    Category, CircuitBreaker, RequestScheduler, Result, ResultCache, RetryPolicy, Website
+)
 from asyncio import iscoroutine
 import unittest
+import asyncio
 
 
 site = Website("www.example.com", "https://example.com/{}", Category.PROGRAMMING)
@@ -27,6 +30,256 @@ class TestWebsite(unittest.TestCase):
     def testRequestCoro(self):
         self.assertTrue(iscoroutine(site.send_request(object)), "'send_request' should return a coro")
 
+    def testStreamingBody(self):
+        website = Website.from_dict({
+            "domain": "example.org",
+            "url": "https://example.org/{}",
+            "category": Category.OTHER,
+            "err_text_pattern": "<title.*?>Not Found</title>"
+        })
+        website.set_username("tracer")
+
+        found = FakeSession([b"<html><head><title>tracer</title>", b"x" * 1024] * 8)
+        missing = FakeSession([b"<title>Not", b" Found</title>", b"x" * 1024])
+
+        asyncio.run(website.send_request(found))
+        self.assertTrue(website.result.user_exists)
+        self.assertEqual(found.consumed, 1, "Reading should stop after the title")
+
+        asyncio.run(website.send_request(missing))
+        self.assertFalse(website.result.user_exists)
+        self.assertEqual(missing.consumed, 2, "Reading should stop after a match")
+
+    def testMaxBodyBytes(self):
+        website = Website.from_dict({
+            "domain": "example.org",
+            "url": "https://example.org/{}",
+            "category": Category.OTHER,
+            "err_text_pattern": "Not Found",
+            "max_body_bytes": 16
+        })
+        website.set_username("tracer")
+
+        session = FakeSession([b"x" * 8, b"x" * 8, b"Not Found"])
+        asyncio.run(website.send_request(session))
+
+        self.assertTrue(website.result.user_exists)
+        self.assertEqual(session.consumed, 2)
+        self.assertEqual(website.result.bytes_received, 16)
+
+    def testMaxBodyBytesSearchesTail(self):
+        website = Website.from_dict({
+            "domain": "example.org",
+            "url": "https://example.org/{}",
+            "category": Category.OTHER,
+            "err_text_pattern": "(?:<h1.*?Explore.*?</h1>)|(?:Nope)",
+            "max_body_bytes": 30000
+        })
+        website.set_username("tracer")
+
+        # The regex reruns only when the data doubled, the marker lies
+        # between the last rerun and the cap
+        session = FakeSession([
+            b"x" * 8192, b"x" * 8192, b"x" * 1000 + b"<h1>Explore</h1>" + b"x" * 8000, b"x" * 8192
+        ])
+        asyncio.run(website.send_request(session))
+
+        self.assertFalse(website.result.user_exists)
+        self.assertEqual(website.result.bytes_received, 30000)
+
+    def testRequestMethods(self):
+        data = {
+            "domain": "example.org",
+            "url": "https://example.org/{}",
+            "category": Category.OTHER,
+            "err_url_pattern": "/404$"
+        }
+
+        head = Website.from_dict({**data, "request_method": "head"})
+        head.set_username("tracer")
+
+        session = FakeSession([b"body"])
+        asyncio.run(head.send_request(session))
+
+        self.assertEqual(session.methods, ["HEAD"])
+        self.assertTrue(head.result.user_exists)
+        self.assertEqual(head.result.bytes_saved, 5000)
+
+        session = FakeSession([b"body"], head_status=405)
+        asyncio.run(head.send_request(session))
+
+        self.assertEqual(session.methods, ["HEAD", "GET"], "Rejected HEAD should fall back to GET")
+        self.assertEqual(head.result.bytes_saved, 0)
+
+        ranged = Website.from_dict({**data, "request_method": "range"})
+        ranged.set_username("tracer")
+
+        session = FakeSession([b"body"])
+        asyncio.run(ranged.send_request(session))
+
+        self.assertEqual(session.methods, ["RANGE"])
+        self.assertTrue(ranged.result.user_exists)
+        self.assertEqual(ranged.result.bytes_saved, 7999)
+
+        with self.assertRaises(ValueError):
+            Website.from_dict({**data, "err_text_pattern": "x", "request_method": "head"})
+
+    def testCache(self):
+        website = Website("example.org", "https://example.org/{}", Category.OTHER)
+        website.set_username("tracer")
+
+        cache = ResultCache()
+        session = FakeSession([b"body"])
+
+        asyncio.run(website.send_request(session, cache=cache))
+        self.assertFalse(website.result.cached)
+
+        asyncio.run(website.send_request(session, cache=cache))
+        self.assertTrue(website.result.cached)
+        self.assertTrue(website.result.user_exists)
+        self.assertEqual(session.methods, ["GET"], "A cached check shouldn't send a request")
+
+    def testServerErrorsArentCached(self):
+        website = Website("example.org", "https://example.org/{}", Category.OTHER)
+        website.set_username("tracer")
+
+        cache = ResultCache()
+        session = FakeSession([b"body"], statuses=[502, 200])
+
+        asyncio.run(website.send_request(session, cache=cache))
+        self.assertEqual(website.result.status_code, 502)
+
+        asyncio.run(website.send_request(session, cache=cache))
+        self.assertFalse(website.result.cached)
+        self.assertEqual(website.result.status_code, 200)
+
+    def testBreaker(self):
+        website = Website("example.org", "https://example.org/{}", Category.OTHER)
+        website.set_username("tracer")
+
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        session = BrokenSession()
+
+        for _ in range(3):
+            asyncio.run(website.send_request(session, breaker=breaker))
+
+        self.assertEqual(session.requests, 2, "An open breaker shouldn't send requests")
+        self.assertTrue(website.result.skipped)
+        self.assertFalse(website.result.user_exists)
+
+    def testRetry(self):
+        website = Website("example.org", "https://example.org/{}", Category.OTHER)
+        website.set_username("tracer")
+
+        retry = RetryPolicy(max_attempts=3, backoff={RetryPolicy.THROTTLED: (0, 0)})
+        session = FakeSession([b"body"], statuses=[429, 503, 200])
+
+        asyncio.run(website.send_request(session, retry=retry))
+
+        self.assertEqual(website.result.attempts, 3)
+        self.assertEqual(website.result.status_code, 200)
+        self.assertTrue(website.result.user_exists)
+
+        session = FakeSession([b"body"], statuses=[429, 429, 429, 200])
+        asyncio.run(website.send_request(session, retry=retry))
+
+        self.assertEqual(website.result.attempts, 3, "Attempts should be bounded")
+        self.assertFalse(website.result.user_exists)
+
+    def testBackoffReleasesSlot(self):
+        website = Website("example.org", "https://example.org/{}", Category.OTHER)
+        website.set_username("tracer")
+
+        scheduler = RequestScheduler(per_host_limit=1)
+        session = FakeSession([b"body"], statuses=[429, 200])
+
+        async def acquire():
+            async with scheduler.slot("example.org"):
+                pass
+
+        async def main():
+            check = asyncio.ensure_future(
+                website.send_request(session, retry=FixedRetry(), scheduler=scheduler)
+            )
+            await asyncio.sleep(0.05)
+
+            # Waits for the whole backoff if the slot is still held
+            await asyncio.wait_for(acquire(), 0.1)
+            await check
+
+        asyncio.run(main())
+
+        self.assertEqual(website.result.attempts, 2)
+        self.assertTrue(website.result.user_exists)
+
+
+class FakeContent:
+    def __init__(self, session, chunks):
+        self.session = session
+        self.chunks = chunks
+
+    async def iter_chunked(self, _):
+        for chunk in self.chunks:
+            self.session.consumed += 1
+            yield chunk
+
+
+class FakeResponse:
+    charset = "utf-8"
+    host = "example.org"
+    url = "https://example.org/tracer"
+
+    def __init__(self, session, chunks, method="GET", status=200, headers=None):
+        self.content = FakeContent(session, chunks)
+        self.method = method
+        self.status = status
+        self.headers = headers or {}
+
+    async def release(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, chunks, head_status=200, range_status=206, statuses=None):
+        self.chunks = chunks
+        self.statuses = list(statuses or [])
+        self.consumed = 0
+        self.head_status = head_status
+        self.range_status = range_status
+        self.methods = []
+
+    async def head(self, *args, **kwargs):
+        self.methods.append("HEAD")
+
+        return FakeResponse(self, [], "HEAD", self.head_status, {"Content-Length": "5000"})
+
+    async def get(self, *args, headers=None, **kwargs):
+        if headers and "Range" in headers:
+            self.methods.append("RANGE")
+
+            return FakeResponse(
+                self, [], status=self.range_status, headers={"Content-Range": "bytes 0-0/8000"}
+            )
+
+        self.methods.append("GET")
+
+        return FakeResponse(self, self.chunks, status=self.statuses.pop(0) if self.statuses else 200)
+
+
+class FixedRetry(RetryPolicy):
+    def delay(self, kind, attempt, retry_after=None):
+        return 0.3
+
+
+class BrokenSession:
+    def __init__(self):
+        self.requests = 0
+
+    async def get(self, *args, **kwargs):
+        self.requests += 1
+
+        raise asyncio.TimeoutError()
+
 
 if __name__ == "__main__":
     unittest.main()
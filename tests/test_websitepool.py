@@ -1,5 +1,6 @@
-from tracer import WebsitePool, Website
+from tracer import Result, WebsitePool, Website
 import unittest
+import asyncio
 
 
 pool = WebsitePool()
@@ -39,6 +40,74 @@ class TestWebsitePool(unittest.TestCase):
 
         pool.remove(lambda website: website.username == 'tracerino')
 
+    def testResultStream(self):
+        pool = WebsitePool(*[SlowWebsite(f"{i}.example.com", delay=i / 100) for i in range(5)])
+        pool.set_username("tracer")
+
+        async def main():
+            return [result.host async for result in pool.start_requests(None, queue_size=1)]
+
+        hosts = asyncio.run(main())
+
+        self.assertEqual(hosts, [f"{i}.example.com" for i in range(5)])
+
+    def testCancellation(self):
+        sites = [SlowWebsite(f"{i}.example.com", delay=i * 10) for i in range(3)]
+        pool = WebsitePool(*sites)
+        pool.set_username("tracer")
+
+        async def main():
+            requests = pool.start_requests(None)
+
+            await requests.__anext__()
+            await requests.aclose()
+
+        asyncio.run(main())
+
+        self.assertEqual([site.cancelled for site in sites], [False, True, True])
+
+    def testCheckMany(self):
+        sites = [SlowWebsite(f"{i}.example.com", delay=0.01) for i in range(3)]
+        pool = WebsitePool(*sites)
+
+        async def main():
+            return [
+                (result.username, result.host)
+                async for result in pool.check_many(None, ["alice", "bob"])
+            ]
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(sorted(set(results)), sorted(
+            (username, site.domain) for username in ["alice", "bob"] for site in sites
+        ))
+        self.assertTrue(all(site.username is None for site in sites), "Pool sites were modified")
+
+
+class SlowWebsite(Website):
+    def __init__(self, domain, delay):
+        super().__init__(domain, f"https://{domain}/{{}}", 0)
+
+        self.delay = delay
+        self.cancelled = False
+
+    def __copy__(self):
+        website = self.__class__(self.domain, self.delay)
+        website.set_username(self.username)
+
+        return website
+
+    async def send_request(self, session, timeout=None, cb=None, scheduler=None):
+        try:
+            async with scheduler.slot(self.domain):
+                await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+        self.set_result(Result(self, 200, True, self.delay, self.domain, self.url))
+
 
 if __name__ == '__main__':
     unittest.main()
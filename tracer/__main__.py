@@ -23,6 +23,10 @@ SOFTWARE.
 """
 
 import sys
+import os
+
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "settings.conf")
 
 
 if __name__ == "__main__":
@@ -32,6 +36,21 @@ if __name__ == "__main__":
         print("This program requires python 3.6 < 3.x")
         exit(0)
 
-    from tracer import Tracer
+    if sys.argv[1:2] == ["bench"]:
+        from bench import Benchmark
+
+        Benchmark.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["compile-pool"]:
+        from loader import compile_pool
+
+        compile_pool(sys.argv[2:])
+    else:
+        # Parsing comes first, so that --help and invalid
+        # arguments don't have to wait for aiohttp
+        from models import TracerParser
+
+        kwargs = TracerParser(CONFIG).parse()
+
+        from tracer import Tracer
 
-    Tracer.main()
+        Tracer.main(kwargs)
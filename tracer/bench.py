@@ -0,0 +1,502 @@
+"""Tracer Bench
+
+Measures the end-to-end throughput of Tracer without touching the
+internet. A local aiohttp server, running in its own process, imitates
+any amount of synthetic sites. The detection rules of the sites are
+taken from the pool, so the server answers with pages whose `<title>`
+and error markers look like the ones of the real sites.
+
+Usage: python tracer bench [--sites N] [--usernames N] [options]
+"""
+
+__all__ = ("Benchmark",)
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from argparse import ArgumentParser, Namespace
+from multiprocessing.connection import Connection
+from urllib.parse import urlsplit
+from time import perf_counter
+import multiprocessing
+import asyncio
+import random
+import socket
+import math
+import sys
+import zlib
+import re
+
+# The parser of the re module is private (and `sre_parse` deprecated),
+# so examples of the patterns are only generated while it's available
+try:
+    import re._parser as sre_parse
+except ImportError:
+    try:
+        import sre_parse
+    except ImportError:
+        sre_parse = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from aiohttp import ClientSession, DummyCookieJar, web
+from aiohttp.abc import AbstractResolver
+
+from models import *
+from loader import *
+
+
+# Synthetic sites are named site<i>.bench and resolved to this address
+HOST = "127.0.0.1"
+DOMAIN_SUFFIX = ".bench"
+
+# Amount of samples kept for the percentiles
+RESERVOIR_SIZE = 100_000
+
+# Known-positive error marker for rules without a usable example
+FALLBACK_MARKER = "<title>404 Not Found</title>"
+
+
+class LocalResolver(AbstractResolver):
+    """Resolves every host to the local server"""
+
+    async def resolve(
+        self,
+        host: str,
+        port: int = 0,
+        family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        return [{
+            "hostname": host,
+            "host": HOST,
+            "port": port,
+            "family": socket.AF_INET,
+            "proto": 0,
+            "flags": socket.AI_NUMERICHOST,
+        }]
+
+    async def close(self) -> None:
+        pass
+
+
+class Reservoir(object):
+    """Keeps a uniform sample of a stream of values"""
+
+    __slots__ = ("__size", "__seen", "__values", "__random")
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.__size = size
+        self.__seen = 0
+        self.__values: List[float] = list()
+        self.__random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.__seen
+
+    def add(self, value: float) -> None:
+        self.__seen += 1
+
+        if len(self.__values) < self.__size:
+            self.__values.append(value)
+        else:
+            i = self.__random.randrange(self.__seen)
+
+            if i < self.__size:
+                self.__values[i] = value
+
+    def percentile(self, percentile: float) -> float:
+        if not self.__values:
+            return 0.0
+
+        return LatencyTracker.nearest_rank(self.__values, percentile)
+
+    def max(self) -> float:
+        return max(self.__values, default=0.0)
+
+
+def example(pattern: str) -> Optional[str]:
+    """Create a string that is matched by the pattern
+
+    Only the constructs used by the patterns of the pool are
+    supported. Returns `None` if no example could be created,
+    e.g. because the internals of the re module changed.
+    """
+
+    if sre_parse is None:
+        return None
+
+    try:
+        parsed = sre_parse.parse(pattern, re.I | re.S | re.M)
+    except (re.error, AttributeError, TypeError):
+        return None
+
+    repeats = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+    repeats.add(getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT))
+    categories = {
+        sre_parse.CATEGORY_DIGIT: "0",
+        sre_parse.CATEGORY_SPACE: " ",
+        sre_parse.CATEGORY_WORD: "a",
+    }
+    out: List[str] = list()
+
+    def pick(items) -> str:
+        excluded = set()
+        negate = False
+
+        for op, av in items:
+            if op is sre_parse.NEGATE:
+                negate = True
+            elif op is sre_parse.LITERAL:
+                excluded.add(chr(av))
+            elif op is sre_parse.RANGE:
+                excluded.update(map(chr, range(av[0], av[1] + 1)))
+            elif op is sre_parse.CATEGORY:
+                excluded.add(categories.get(av, "a"))
+
+        if negate:
+            return next(c for c in "aZ0_ -" if c.lower() not in excluded and c not in excluded)
+
+        return sorted(excluded)[0] if excluded else "a"
+
+    def emit(items) -> None:
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                out.append(chr(av))
+            elif op is sre_parse.NOT_LITERAL:
+                out.append("b" if chr(av).lower() == "a" else "a")
+            elif op is sre_parse.ANY:
+                out.append("a")
+            elif op is sre_parse.IN:
+                out.append(pick(av))
+            elif op in repeats:
+                for _ in range(av[0]):
+                    emit(av[2])
+            elif op is sre_parse.SUBPATTERN:
+                emit(av[-1])
+            elif op is sre_parse.BRANCH:
+                emit(av[1][0])
+            elif op is sre_parse.CATEGORY:
+                out.append(categories.get(av, "a"))
+            elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                continue
+            else:
+                raise ValueError(op)
+
+    try:
+        emit(parsed)
+    except (AttributeError, IndexError, TypeError, ValueError, StopIteration):
+        return None
+
+    text = "".join(out)
+
+    return text if Matcher(pattern).search(text.encode()) else None
+
+
+class SyntheticSite(object):
+    """A site imitated by the benchmark server"""
+
+    __slots__ = ("index", "data", "body_size", "missing_body")
+
+    def __init__(self, index: int, rule: Dict[str, Any], body_size: int):
+        self.index = index
+        self.data = {
+            "domain": f"site{index}{DOMAIN_SUFFIX}",
+            "url": f"http://site{index}{DOMAIN_SUFFIX}{{port}}/{index}/{{{{}}}}",
+            "category": rule.get("category", Category.OTHER),
+            "err_ignore_code": rule.get("err_ignore_code", False),
+            "request_method": rule.get("request_method", "get"),
+        }
+        self.body_size = body_size
+        self.missing_body = None
+
+        marker = example(rule["err_text_pattern"]) if rule.get("err_text_pattern") else None
+
+        if marker is not None:
+            self.data["err_text_pattern"] = rule["err_text_pattern"]
+            self.missing_body = self.page(marker, body_size)
+        elif rule.get("err_text_pattern"):
+            # Still match a text rule, just not the one of the pool
+            self.data["err_text_pattern"] = re.escape(FALLBACK_MARKER)
+            self.missing_body = self.page(FALLBACK_MARKER, body_size)
+        else:
+            # Without a text rule, a missing user is answered with 404
+            self.data["err_ignore_code"] = False
+
+    @staticmethod
+    def page(head: str, size: int) -> bytes:
+        start = f"<!DOCTYPE html><html><head>{head}</head><body>"
+        row = "<div class=\"post\"><p>Lorem ipsum dolor sit amet.</p></div>\n"
+        rows = row * max(0, (size - len(start)) // len(row))
+
+        return (start + rows + "</body></html>").encode()
+
+    def spec(self, port: Optional[int] = None) -> SiteSpec:
+        """The spec of the site, served on the given port"""
+
+        url = self.data["url"].format(port=f":{port}" if port else "")
+
+        return SiteSpec.from_dict({**self.data, "url": url})
+
+    def found_body(self, username: str) -> bytes:
+        return self.page(f"<title>{username} | Profile</title>", self.body_size)
+
+
+def create_sites(rules: Sequence[Dict[str, Any]], amount: int, body_size: int) -> List[SyntheticSite]:
+    """Create `amount` sites which reuse the rules of the pool in turn"""
+
+    return [SyntheticSite(i, rules[i % len(rules)], body_size) for i in range(amount)]
+
+
+def chance(*values: Any) -> float:
+    """Deterministic number in [0, 1) derived from the values"""
+
+    return zlib.crc32("/".join(map(str, values)).encode()) / 2 ** 32
+
+
+class Benchmark(object):
+    """Run Tracer against synthetic sites and report its throughput
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    @classmethod
+    def main(cls, argv: Optional[Sequence[str]] = None) -> None:
+        """Parse the arguments and run the benchmark"""
+
+        parser = ArgumentParser(
+            prog="tracer bench",
+            description="Measure the throughput of Tracer against a local mock server",
+        )
+        parser.add_argument("--sites", type=int, default=1_000, help="amount of synthetic sites")
+        parser.add_argument("--usernames", type=int, default=1, help="amount of usernames to check")
+        parser.add_argument("--latency-ms", type=float, default=50.0,
+                            help="median latency of the server in ms")
+        parser.add_argument("--latency-sigma", type=float, default=0.5,
+                            help="sigma of the log-normal latency distribution, 0 for a fixed latency")
+        parser.add_argument("--body-kib", type=float, default=32.0, help="size of the pages in KiB")
+        parser.add_argument("--found-ratio", type=float, default=0.2,
+                            help="share of checks for which the username exists")
+        parser.add_argument("--error-ratio", type=float, default=0.0,
+                            help="share of requests answered with status 500")
+        parser.add_argument("-c", "--concurrency", type=int, help="requests in flight at the same time")
+        parser.add_argument("--per-host-limit", type=int, help="requests in flight per host")
+        parser.add_argument("-t", "--timeout", type=float, default=10.0, help="timeout of each request")
+        parser.add_argument("--stub", action="store_true",
+                            help="use the in-memory transport instead of the local server")
+        parser.add_argument("--seed", type=int, default=0, help="seed of the latency distribution")
+
+        args = parser.parse_args(argv)
+
+        try:
+            asyncio.run(cls(args).run())
+        except KeyboardInterrupt:
+            print("👋 Bye")
+
+    def __init__(self, args: Namespace):
+        self.args = args
+        self.sites = create_sites(
+            [rule for rule in load_website_data()], args.sites, int(args.body_kib * 1024)
+        )
+        self.usernames = [f"user{i}" for i in range(args.usernames)]
+        self.random = random.Random(args.seed)
+
+    def latency(self) -> float:
+        """Draw a latency in seconds"""
+
+        median = self.args.latency_ms / 1000
+
+        if self.args.latency_sigma <= 0:
+            return median
+
+        return self.random.lognormvariate(math.log(median), self.args.latency_sigma)
+
+    def respond(self, path: str) -> Tuple[int, bytes]:
+        """Returns status and body for the path `/<site>/<username>`"""
+
+        index, _, username = path.lstrip("/").partition("/")
+        site = self.sites[int(index)]
+
+        if chance("error", index, username) < self.args.error_ratio:
+            return 500, b"Internal Server Error"
+
+        if chance(index, username) < self.args.found_ratio:
+            return 200, site.found_body(username)
+
+        if site.missing_body is not None:
+            return 200, site.missing_body
+
+        return 404, b"Not Found"
+
+    def expected(self, site: int, username: str) -> bool:
+        """Whether Tracer should report the username as found"""
+
+        if chance("error", site, username) < self.args.error_ratio:
+            return False
+
+        return chance(site, username) < self.args.found_ratio
+
+    async def run(self) -> None:
+        args = self.args
+        scheduler = RequestScheduler(concurrency=args.concurrency, per_host_limit=args.per_host_limit)
+        server = None
+        session = None
+
+        if args.stub:
+            port = None
+            transport: AbstractTransport = StubTransport(
+                status=lambda url: self.respond(urlsplit(url).path)[0],
+                body=lambda url: self.respond(urlsplit(url).path)[1],
+                latency=lambda _: self.latency()
+            )
+        else:
+            server, port = self.start_server()
+            session = ClientSession(
+                connector=scheduler.create_connector(resolver=LocalResolver()),
+                cookie_jar=DummyCookieJar(),
+                trace_configs=[create_trace_config()]
+            )
+            transport = AiohttpTransport(session)
+
+        start = perf_counter()
+        pool = WebsitePool.from_specs([site.spec(port) for site in self.sites])
+        setup = perf_counter() - start
+
+        print(f"[*] {len(self.sites)} synthetic sites, {len(self.usernames)} username(s), "
+              f"{len(self.sites) * len(self.usernames)} checks "
+              f"({'in-memory stub' if args.stub else f'local server on port {port}'})")
+        print(f"[*] Built the pool in {setup:.2f}s")
+
+        try:
+            await self.measure(pool, transport, scheduler)
+        finally:
+            if session is not None:
+                await session.close()
+
+            if server is not None:
+                server.terminate()
+                server.join()
+
+    async def measure(
+        self,
+        pool: WebsitePool,
+        transport: AbstractTransport,
+        scheduler: RequestScheduler
+    ) -> None:
+        """Run all checks and print the report"""
+
+        delays = Reservoir()
+        lags = Reservoir()
+        phases = {phase: Reservoir() for phase in PhaseTimings.PHASES}
+        monitor = asyncio.ensure_future(self.monitor_loop(lags))
+        wrong = errors = timeouts = 0
+
+        start = perf_counter()
+
+        async for result in pool.check_many(
+            transport, self.usernames, self.args.timeout, scheduler
+        ):
+            delays.add(result.delay)
+
+            if result.timings is not None:
+                for phase, value in result.timings.as_dict().items():
+                    if value is not None:
+                        phases[phase].add(value)
+
+            if result.timeout:
+                timeouts += 1
+            elif result.error:
+                errors += 1
+
+            site = int(result.website.domain[4:-len(DOMAIN_SUFFIX)])
+
+            if result.user_exists != self.expected(site, result.username):
+                wrong += 1
+
+        elapsed = perf_counter() - start
+        monitor.cancel()
+
+        checks = len(delays)
+
+        print(f"[=] {checks} checks in {elapsed:.2f}s")
+        print(f"    checks/sec:      {checks / elapsed:10.1f}")
+        print(f"    latency p50:     {delays.percentile(50) * 1000:10.1f} ms")
+        print(f"    latency p99:     {delays.percentile(99) * 1000:10.1f} ms")
+        print(f"    loop lag p99:    {lags.percentile(99) * 1000:10.1f} ms")
+        print(f"    loop lag max:    {lags.max() * 1000:10.1f} ms")
+        print(f"    peak RSS:        {self.peak_rss()}")
+        print(f"    timeouts:        {timeouts:10d}")
+        print(f"    errors:          {errors:10d}")
+        print(f"    wrong results:   {wrong:10d}")
+
+        for phase, samples in phases.items():
+            if len(samples):
+                print(f"    {phase + ' p50/p99:':<17}{samples.percentile(50) * 1000:10.2f} / "
+                      f"{samples.percentile(99) * 1000:.2f} ms")
+
+    @staticmethod
+    async def monitor_loop(lags: Reservoir, interval: float = 0.01) -> None:
+        """Record how late the event loop wakes up a sleeping task"""
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lags.add(max(0.0, loop.time() - start - interval))
+
+    @staticmethod
+    def peak_rss() -> str:
+        if resource is None:
+            return "n/a"
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # Linux reports KiB, macOS bytes
+        if sys.platform != "darwin":
+            peak *= 1024
+
+        return f"{peak / 2 ** 20:10.1f} MiB"
+
+    def start_server(self) -> Tuple[multiprocessing.Process, int]:
+        """Start the mock server in its own process
+
+        Returns
+        -------
+        Tuple[multiprocessing.Process, int]
+            The server process and the port it listens on
+        """
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=self.serve, args=(sender,), daemon=True)
+        process.start()
+
+        return process, receiver.recv()
+
+    def serve(self, connection: Connection) -> None:
+        """Entry point of the server process"""
+
+        async def handler(request: web.Request) -> web.Response:
+            await asyncio.sleep(self.latency())
+
+            status, body = self.respond(request.path)
+
+            return web.Response(status=status, body=body, content_type="text/html")
+
+        async def main() -> None:
+            app = web.Application()
+            app.router.add_get("/{tail:.*}", handler)
+
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+
+            site = web.TCPSite(runner, HOST, 0, backlog=4096)
+            await site.start()
+
+            connection.send(site._server.sockets[0].getsockname()[1])
+
+            await asyncio.Event().wait()
+
+        asyncio.run(main())
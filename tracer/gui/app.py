@@ -22,36 +22,143 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import secrets
+from typing import List
 import asyncio
+import json
 import os
 
 from aiohttp import ClientSession, DummyCookieJar, web
 from aiohttp.web import Request, RouteTableDef
 from jinja2 import FileSystemLoader
+from colorama import Fore
 import aiohttp_jinja2
 
 from tracer import (
-    load_website_data,
+    load_site_specs,
+    resources,
     load_user_agent,
+    RequestScheduler,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryPolicy,
+    CachingResolver,
+    ResultCache,
+    RESULTS_DIR,
+    create_trace_config,
+    MetricsRegistry,
     WebsitePool,
-    Website,
 )
+from .registry import RegistryFullError, SearchRegistry, Search
+from .reloader import PoolReloader
+from .metrics import ServiceMetrics
 
 
-os.chdir(os.path.realpath(os.path.dirname(__file__)))
+GUI_DIR = os.path.dirname(os.path.realpath(__file__))
+TEMPLATES_DIR = os.path.join(GUI_DIR, "templates")
+STATIC_DIR = os.path.join(GUI_DIR, "static")
+FAVICON = os.path.join(STATIC_DIR, "assets", "favicon.ico")
+
+# Results that arrive within this window (in seconds) are
+# sent to the client as one batch by the streaming endpoint
+FLUSH_INTERVAL = 0.05
+MAX_BATCH_SIZE = 64
+
+CACHE_FILE = os.path.join(RESULTS_DIR, "cache.sqlite3")
+BREAKER_FILE = os.path.join(RESULTS_DIR, "breakers.json")
+LATENCY_FILE = os.path.join(RESULTS_DIR, "latency.json")
+DNS_FILE = os.path.join(RESULTS_DIR, "dns.json")
 
 app = web.Application()
-cookies = {}
 routes = RouteTableDef()
 
 aiohttp_jinja2.setup(
     app=app,
     enable_async=True,
-    loader=FileSystemLoader("./templates")
+    loader=FileSystemLoader(TEMPLATES_DIR)
 )
 
 
+async def on_startup(app: web.Application) -> None:
+    """Create the resources that are shared by all searches
+
+    The pool gets parsed once into a table of read-only specs and
+    all searches send their requests through one session, hence
+    connections, TLS sessions and DNS results are reused. The
+    hosts of all sites are resolved in the background right away.
+    Changes of the pool file are picked up while the app runs.
+    """
+
+    try:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        app["cache"] = ResultCache(CACHE_FILE)
+        app["breaker"] = CircuitBreaker(BREAKER_FILE)
+        app["latency"] = LatencyTracker(LATENCY_FILE)
+        app["resolver"] = CachingResolver(DNS_FILE)
+    except OSError:
+        app["cache"] = ResultCache()
+        app["breaker"] = CircuitBreaker()
+        app["latency"] = LatencyTracker()
+        app["resolver"] = CachingResolver()
+
+    app["breaker"].load()
+    app["latency"].load()
+    app["resolver"].load()
+
+    app["pool"] = PoolReloader(resources.path("pool.json"), load_site_specs())
+    app["scheduler"] = RequestScheduler()
+    app["session"] = ClientSession(
+        connector=app["scheduler"].create_connector(resolver=app["resolver"]),
+        headers={"User-Agent": load_user_agent()},
+        cookie_jar=DummyCookieJar(),
+        trace_configs=[create_trace_config()]
+    )
+    app["searches"] = SearchRegistry()
+    app["searches"].start_sweeper()
+    app["metrics"] = ServiceMetrics(app["scheduler"], app["searches"], app["pool"])
+    app["lag_monitor"] = asyncio.create_task(app["metrics"].monitor_loop())
+    app["pool"].start_watcher(
+        listener=lambda pool, succeeded: report_reload(app, pool, succeeded)
+    )
+    app["warm_up"] = asyncio.create_task(
+        WebsitePool.from_specs(app["pool"].specs).warm_up(
+            app["session"], resolver=app["resolver"], scheduler=app["scheduler"]
+        )
+    )
+
+
+async def on_cleanup(app: web.Application) -> None:
+    """Close the resources created by `on_startup`"""
+
+    app["warm_up"].cancel()
+    app["lag_monitor"].cancel()
+
+    await app["pool"].close()
+    await app["searches"].close()
+    await app["session"].close()
+    await app["resolver"].close()
+    app["cache"].close()
+    app["breaker"].save()
+    app["latency"].save()
+    app["resolver"].save()
+
+
+def report_reload(app: web.Application, pool: PoolReloader, succeeded: bool) -> None:
+    """Report a reload of the pool in the metrics and the console"""
+
+    app["metrics"].observe_reload(pool, succeeded)
+
+    if succeeded:
+        print(f"[{Fore.CYAN}*{Fore.RESET}] Reloaded {Fore.CYAN}{len(pool.specs)}"
+              f"{Fore.RESET} sites in {Fore.CYAN}{pool.last_duration:.2f}s{Fore.RESET}")
+    else:
+        print(f"{Fore.RED}[ISSUE] Couldn't reload the pool, the previous one "
+              f"is kept. {pool.last_error}{Fore.RESET}")
+
+
+app.on_startup.append(on_startup)
+app.on_cleanup.append(on_cleanup)
+
+
 @routes.get("/")
 async def index(request: Request):
     """Represents the index page
@@ -63,7 +170,7 @@ async def index(request: Request):
         context={
             "host": request.host,
             "scheme": request.scheme,
-            "pool": load_website_data()
+            "pool": request.app["pool"].specs
         }
     )
 
@@ -78,18 +185,22 @@ async def start_search(request: Request):
     """
 
     username = (await request.post()).get("username", "")
-    search_id = secrets.token_urlsafe(20)
-    queue = asyncio.Queue()
+    registry: SearchRegistry = request.app["searches"]
 
-    response = web.Response()
-    response.set_cookie("search_id", search_id, max_age=300)
+    try:
+        # Spawns the background task
+        search = registry.create(
+            username, lambda search: start_requests(request.app, search)
+        )
+    except RegistryFullError:
+        request.app["metrics"].searches_rejected.inc()
 
-    cookies[search_id] = [queue, False]
+        return web.Response(status=503, text="Too Many Searches")
 
-    # Spawn background task
-    asyncio.create_task(
-        start_requests(username, queue, cookies[search_id])
-    )
+    request.app["metrics"].searches_started.inc()
+
+    response = web.Response()
+    response.set_cookie("search_id", search.search_id, max_age=int(registry.ttl))
 
     return response
 
@@ -102,77 +213,210 @@ async def get_results(request: Request):
     results.
     """
 
-    search_id = request.cookies.get("search_id", "")
+    registry: SearchRegistry = request.app["searches"]
+    search = registry.get(request.cookies.get("search_id", ""))
 
-    if search_id not in cookies:
+    if search is None:
         return web.Response(status=400, text="Bad Request")
 
     while True:
-        try:
-            result = await asyncio.wait_for(cookies[search_id][0].get(), 1)
+        result = await search.wait_result(1)
 
+        if result is not None:
             return web.json_response({"result": result})
-        except asyncio.TimeoutError:
-            if cookies[search_id][0].empty() and cookies[search_id][1]:
-                del cookies[search_id]
 
-                response = web.Response(text="Finished")
-                response.del_cookie("search_id")
+        if search.drained:
+            registry.remove(search.search_id)
+
+            response = web.Response(text="Finished")
+            response.del_cookie("search_id")
+
+            return response
+
+        search.touch()
+
+
+@routes.get("/api/search_stream")
+async def stream_results(request: Request) -> web.StreamResponse:
+    """Endpoint for streaming the results of a search
+
+    Push the results as Server-Sent Events as soon as they
+    arrive. Results are coalesced over `FLUSH_INTERVAL` and
+    each event carries a JSON list of results. A `finished`
+    event is sent after the last result.
+    """
+
+    registry: SearchRegistry = request.app["searches"]
+    search = registry.get(request.cookies.get("search_id", ""))
+
+    if search is None:
+        return web.Response(status=400, text="Bad Request")
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+    })
+    response.del_cookie("search_id")
+
+    await response.prepare(request)
+
+    try:
+        while not search.drained:
+            batch = await collect_batch(search)
+            search.touch()
+
+            if batch:
+                data = json.dumps(batch, separators=(",", ":"))
+                await response.write(f"data: {data}\n\n".encode())
+
+        await response.write(b"event: finished\ndata: \n\n")
+    except ConnectionResetError:
+        return response
+    finally:
+        registry.remove(search.search_id)
 
-                return response
+    await response.write_eof()
 
+    return response
+
+
+async def collect_batch(search: Search) -> List[list]:
+    """Wait for results and collect them into a batch
+
+    Block until the first result arrives, then keep collecting
+    until `FLUSH_INTERVAL` elapsed or `MAX_BATCH_SIZE` is reached.
+    Returns right away once the search finished.
+
+    Parameters
+    ----------
+    search : Search
+        The search whose results are collected
+
+    Returns
+    -------
+    List[list]
+        The collected results, empty if the search finished or
+        no result arrived within a second
+    """
 
-async def start_requests(
-    username: str,
-    queue: asyncio.Queue,
-    cookie: list
-) -> None:
+    result = await search.wait_result(1)
+
+    if result is None:
+        return []
+
+    batch = [result]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + FLUSH_INTERVAL
+
+    while len(batch) < MAX_BATCH_SIZE:
+        timeout = deadline - loop.time()
+
+        if timeout <= 0:
+            break
+
+        result = await search.wait_result(timeout)
+
+        if result is None:
+            break
+
+        batch.append(result)
+
+    return batch
+
+
+async def start_requests(app: web.Application, search: Search) -> None:
     """Send the necessary requests
 
-    Put the incoming responses into the given queue. This
-    coro is intended to be spawned as a background task.
+    Put the incoming responses into the queue of the search.
+    This coro is intended to be run as the background task
+    of the search, which is marked as finished as soon as
+    this coro returns.
+
+    Results are given as a list which follow this structure:
+    `[username_exists : bool, url : str, delay : float]`. If
+    the queue is full, sending requests pauses until the
+    client fetched results.
 
     Parameters
     ----------
-    username : str
-        Check if this username is taken
-    queue : asyncio.Queue
-        A queue to put the results into. Results are
-        given as a list which follow this structure:
-        `[username_exists : bool, url : str, delay : float]`
-    cookie : list
-        Cookie data assigned by `start_search` where the
-        second element represents the state of this coro.
-        As soon as this coro finishes, the coro changes
-        the second element to `True`
+    app : aiohttp.web.Application
+        The app holding the shared session and specs
+    search : Search
+        The search to run
     """
 
-    headers = {"User-Agent": load_user_agent()}
-    cookie_jar = DummyCookieJar()
+    # Running searches keep the specs they started with,
+    # even if the pool gets reloaded meanwhile
+    pool = WebsitePool.from_specs(app["pool"].specs, search.username)
+    requests = pool.start_requests(
+        app["session"],
+        scheduler=app["scheduler"],
+        cache=app["cache"],
+        breaker=app["breaker"],
+        latency=app["latency"],
+        # Every search has its own retry budget
+        retry=RetryPolicy()
+    )
 
-    async with ClientSession(headers=headers, cookie_jar=cookie_jar) as session:
-        pool = WebsitePool(*[
-            Website.from_dict(data) for data in load_website_data()
-        ])
-        pool.set_username(username)
+    metrics: ServiceMetrics = app["metrics"]
 
-        requests = pool.start_requests(session)
+    async for response in requests:
+        metrics.observe(response)
 
-        async for response in requests:
-            await queue.put([
-                response.successfully,
-                response.url,
-                response.ms
-            ])
+        await search.queue.put([
+            response.successfully,
+            response.url,
+            response.ms
+        ])
 
-        # Finished
-        cookie[1] = True
+    metrics.searches_finished.inc()
+
+    # Persist the state, so that a crash doesn't lose it
+    app["breaker"].save()
+    app["latency"].save()
+
+
+@routes.get("/api/stats")
+async def stats(request: Request) -> web.Response:
+    """Endpoint exposing gauges of the search registry"""
+
+    registry: SearchRegistry = request.app["searches"]
+    warm_up: asyncio.Task = request.app["warm_up"]
+    pool: PoolReloader = request.app["pool"]
+
+    return web.json_response({
+        "active_searches": registry.active_searches,
+        "queued_results": registry.queued_results,
+        "max_searches": registry.max_searches,
+        "warm_up": (
+            warm_up.result()
+            if warm_up.done() and not warm_up.cancelled() and not warm_up.exception()
+            else None
+        ),
+        "pool": {
+            "sites": len(pool.specs),
+            "reloads": pool.reloads,
+            "failures": pool.failures,
+            "last_reload_seconds": pool.last_duration,
+            "last_error": pool.last_error,
+        },
+    })
+
+
+@routes.get("/metrics")
+async def metrics(request: Request) -> web.Response:
+    """Endpoint exposing the metrics in the Prometheus text format"""
+
+    return web.Response(
+        body=request.app["metrics"].render().encode(),
+        headers={"Content-Type": MetricsRegistry.CONTENT_TYPE}
+    )
 
 
 @routes.get("/favicon.ico")
 async def icon(request: Request) -> web.FileResponse:
-    return web.FileResponse(path="./static/assets/favicon.ico")
+    return web.FileResponse(path=FAVICON)
 
 
-routes.static("/static", "./static")
+routes.static("/static", STATIC_DIR)
 app.router.add_routes(routes)
@@ -0,0 +1,201 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+__all__ = ("ServiceMetrics",)
+
+from typing import Optional
+import asyncio
+
+from tracer import MetricsRegistry, RequestScheduler, Result
+from .registry import SearchRegistry
+from .reloader import PoolReloader
+
+
+class ServiceMetrics(object):
+    """The metrics of the web GUI, exposed on `/metrics`
+
+    Counters and histograms are updated by the handlers and the
+    searches, gauges are read from the scheduler and the search
+    registry when the metrics are scraped.
+
+    Metrics
+    -------
+    tracer_searches_started_total
+        Searches created by clients
+    tracer_searches_rejected_total
+        Searches rejected because too many were active
+    tracer_searches_finished_total
+        Searches whose checks are all done
+    tracer_checks_total{site, outcome}
+        Checks by outcome: hit, miss, timeout, error or skipped
+    tracer_checks_cached_total
+        Checks answered by the result cache
+    tracer_check_duration_seconds{site}
+        Delay of the checks that sent a request
+    tracer_bytes_downloaded_total
+        Bytes read from response bodies
+    tracer_requests_in_flight
+        Requests currently sent by the scheduler
+    tracer_active_searches
+        Searches in the registry
+    tracer_queued_results
+        Results waiting in the queues of the searches
+    tracer_event_loop_lag_seconds
+        How late the event loop wakes up a sleeping task
+    tracer_pool_reloads_total{outcome}
+        Reloads of the site pool: success or failure
+    tracer_pool_reload_duration_seconds
+        Time spent compiling a changed pool
+    tracer_pool_sites
+        Sites in the current pool
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    # Interval in seconds of the event loop lag probe
+    LAG_INTERVAL = 0.5
+    LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    RELOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    __slots__ = (
+        "__registry",
+        "searches_started",
+        "searches_rejected",
+        "searches_finished",
+        "checks",
+        "checks_cached",
+        "check_duration",
+        "bytes_downloaded",
+        "loop_lag",
+        "pool_reloads",
+        "pool_reload_duration",
+    )
+
+    def __init__(self, scheduler: RequestScheduler, searches: SearchRegistry, pool: PoolReloader):
+        registry = self.__registry = MetricsRegistry()
+
+        self.searches_started = registry.counter(
+            "tracer_searches_started_total", "Searches created by clients"
+        )
+        self.searches_rejected = registry.counter(
+            "tracer_searches_rejected_total", "Searches rejected because too many were active"
+        )
+        self.searches_finished = registry.counter(
+            "tracer_searches_finished_total", "Searches whose checks are all done"
+        )
+        self.checks = registry.counter(
+            "tracer_checks_total", "Checks by site and outcome", ("site", "outcome")
+        )
+        self.checks_cached = registry.counter(
+            "tracer_checks_cached_total", "Checks answered by the result cache"
+        )
+        self.check_duration = registry.histogram(
+            "tracer_check_duration_seconds", "Delay of the checks that sent a request", ("site",)
+        )
+        self.bytes_downloaded = registry.counter(
+            "tracer_bytes_downloaded_total", "Bytes read from response bodies"
+        )
+        registry.gauge(
+            "tracer_requests_in_flight", "Requests currently sent",
+            function=lambda: scheduler.in_flight
+        )
+        registry.gauge(
+            "tracer_active_searches", "Searches in the registry",
+            function=lambda: searches.active_searches
+        )
+        registry.gauge(
+            "tracer_queued_results", "Results waiting to be fetched by clients",
+            function=lambda: searches.queued_results
+        )
+        self.loop_lag = registry.histogram(
+            "tracer_event_loop_lag_seconds", "How late the event loop wakes up a sleeping task",
+            buckets=self.LAG_BUCKETS
+        )
+        self.pool_reloads = registry.counter(
+            "tracer_pool_reloads_total", "Reloads of the site pool by outcome", ("outcome",)
+        )
+        self.pool_reload_duration = registry.histogram(
+            "tracer_pool_reload_duration_seconds", "Time spent compiling a changed pool",
+            buckets=self.RELOAD_BUCKETS
+        )
+        registry.gauge(
+            "tracer_pool_sites", "Sites in the current pool",
+            function=lambda: len(pool.specs)
+        )
+
+    @property
+    def registry(self) -> MetricsRegistry:
+        return self.__registry
+
+    @staticmethod
+    def outcome(result: Result) -> str:
+        if result.skipped:
+            return "skipped"
+
+        if result.timeout:
+            return "timeout"
+
+        if result.error:
+            return "error"
+
+        return "hit" if result.user_exists else "miss"
+
+    def observe(self, result: Result) -> None:
+        """Records a check"""
+
+        site = result.website.domain
+
+        self.checks.inc(site, self.outcome(result))
+
+        if result.cached:
+            self.checks_cached.inc()
+        elif not result.skipped:
+            self.check_duration.observe(result.delay, site)
+
+        if result.bytes_received:
+            self.bytes_downloaded.inc(amount=result.bytes_received)
+
+    def observe_reload(self, pool: PoolReloader, succeeded: bool) -> None:
+        """Records a reload of the pool"""
+
+        self.pool_reloads.inc("success" if succeeded else "failure")
+
+        if pool.last_duration is not None:
+            self.pool_reload_duration.observe(pool.last_duration)
+
+    async def monitor_loop(self, interval: Optional[float] = None) -> None:
+        """Measures the lag of the event loop until cancelled"""
+
+        interval = interval or self.LAG_INTERVAL
+        loop = asyncio.get_running_loop()
+
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(0.0, loop.time() - start - interval))
+
+    def render(self) -> str:
+        return self.__registry.render()
@@ -0,0 +1,437 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+__all__ = ("Search", "SearchRegistry", "RegistryFullError")
+
+from typing import Any, Callable, Coroutine, Dict, Optional
+from time import monotonic
+import secrets
+import asyncio
+
+
+class RegistryFullError(Exception):
+    """Raised if the maximum amount of active searches is reached"""
+
+
+class Search(object):
+    """Represent a running username search of the web GUI
+
+    A search owns the queue into which its background task
+    puts the results and remembers when a client accessed it
+    the last time.
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = (
+        "__search_id",
+        "__username",
+        "__queue",
+        "__task",
+        "__created",
+        "__last_seen",
+        "__finished",
+        "__done",
+    )
+
+    def __init__(self, search_id: str, username: str, queue_size: int = 0):
+        """Create a search
+
+        Parameters
+        ----------
+        search_id : str
+            Identifies the search, handed to the client as a cookie
+        username : str
+            The username that is searched for
+        queue_size : int, optional
+            How many results may wait for the client before the
+            background task is paused, by default 0 (unbounded)
+        """
+
+        self.__search_id = search_id
+        self.__username = username
+        self.__queue = asyncio.Queue(maxsize=queue_size)
+        self.__task: Optional[asyncio.Task] = None
+        self.__created = monotonic()
+        self.__last_seen = self.__created
+        self.__finished = False
+        self.__done = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__qualname__}(username={self.username!r}, "
+            f"queued={self.queue.qsize()}, finished={self.finished})>"
+        )
+
+    @property
+    def search_id(self) -> str:
+        return self.__search_id
+
+    @property
+    def username(self) -> str:
+        return self.__username
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        return self.__queue
+
+    @property
+    def task(self) -> Optional[asyncio.Task]:
+        return self.__task
+
+    @property
+    def created(self) -> float:
+        return self.__created
+
+    @property
+    def last_seen(self) -> float:
+        return self.__last_seen
+
+    @property
+    def finished(self) -> bool:
+        """`True` if the background task is done"""
+
+        return self.__finished
+
+    @property
+    def drained(self) -> bool:
+        """`True` if the search finished and all results were fetched"""
+
+        return self.__finished and self.__queue.empty()
+
+    def start(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        """Run the given coro as the background task of this search
+
+        The search is marked as finished as soon as the task
+        is done, no matter whether it failed or got cancelled.
+        """
+
+        self.__task = asyncio.create_task(coro)
+        self.__task.add_done_callback(lambda _: self.finish())
+
+        return self.__task
+
+    def finish(self) -> None:
+        self.__finished = True
+        self.__done.set()
+
+    async def wait_result(self, timeout: float) -> Optional[Any]:
+        """Wait for the next result
+
+        Returns as soon as a result arrives or the search finishes,
+        so that clients don't have to wait for the timeout after
+        the last result.
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum seconds to wait
+
+        Returns
+        -------
+        Optional[Any]
+            The next result, `None` if the search finished without
+            further results or the timeout expired
+        """
+
+        if not self.__queue.empty():
+            return self.__queue.get_nowait()
+
+        if self.__finished:
+            return None
+
+        getter = asyncio.ensure_future(self.__queue.get())
+        done = asyncio.ensure_future(self.__done.wait())
+
+        try:
+            await asyncio.wait((getter, done), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            done.cancel()
+
+            if not getter.done():
+                getter.cancel()
+
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+
+        return None
+
+    def touch(self) -> None:
+        """Mark the search as accessed by the client"""
+
+        self.__last_seen = monotonic()
+
+    def cancel(self) -> None:
+        """Cancel the background task and drop queued results"""
+
+        if self.__task is not None and not self.__task.done():
+            self.__task.cancel()
+
+        while not self.__queue.empty():
+            self.__queue.get_nowait()
+
+        self.finish()
+
+    def expired(self, ttl: float, idle_timeout: float, now: Optional[float] = None) -> bool:
+        """Check if the search outlived its ttl or was idle for too long
+
+        Parameters
+        ----------
+        ttl : float
+            Maximum lifetime of a search in seconds
+        idle_timeout : float
+            Maximum time in seconds without client access
+        now : float, optional
+            Point in time to check against, by default now
+
+        Returns
+        -------
+        bool
+            `True` if the search should be evicted
+        """
+
+        now = monotonic() if now is None else now
+
+        return (now - self.__created > ttl) or (now - self.__last_seen > idle_timeout)
+
+
+class SearchRegistry(object):
+    """Keep track of the searches of the web GUI
+
+    Searches are evicted, and their background task cancelled,
+    as soon as they expire, so that searches which are abandoned
+    by their client do not leak.
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_MAX_SEARCHES = 64
+    DEFAULT_TTL = 300.0
+    DEFAULT_IDLE_TIMEOUT = 30.0
+    DEFAULT_QUEUE_SIZE = 256
+    DEFAULT_SWEEP_INTERVAL = 5.0
+
+    __slots__ = (
+        "__searches",
+        "__max_searches",
+        "__ttl",
+        "__idle_timeout",
+        "__queue_size",
+        "__sweeper",
+    )
+
+    def __init__(
+        self,
+        max_searches: Optional[int] = None,
+        ttl: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        queue_size: Optional[int] = None
+    ):
+        """Create a registry
+
+        Parameters
+        ----------
+        max_searches : int, optional
+            How many searches may be active at the same time, by
+            default `DEFAULT_MAX_SEARCHES`
+        ttl : float, optional
+            Maximum lifetime of a search in seconds, by default
+            `DEFAULT_TTL`
+        idle_timeout : float, optional
+            After how many seconds without client access a search
+            gets evicted, by default `DEFAULT_IDLE_TIMEOUT`
+        queue_size : int, optional
+            Capacity of the result queue of each search, by default
+            `DEFAULT_QUEUE_SIZE`
+
+        Raises
+        ------
+        ValueError
+            Raised if `max_searches` or `queue_size` is smaller than 1
+        """
+
+        max_searches = int(max_searches or self.DEFAULT_MAX_SEARCHES)
+        queue_size = int(queue_size or self.DEFAULT_QUEUE_SIZE)
+
+        if max_searches < 1 or queue_size < 1:
+            raise ValueError("max_searches and queue_size must be at least 1")
+
+        self.__searches: Dict[str, Search] = dict()
+        self.__max_searches = max_searches
+        self.__ttl = float(ttl or self.DEFAULT_TTL)
+        self.__idle_timeout = float(idle_timeout or self.DEFAULT_IDLE_TIMEOUT)
+        self.__queue_size = queue_size
+        self.__sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.__searches)
+
+    def __contains__(self, search_id: str) -> bool:
+        return search_id in self.__searches
+
+    @property
+    def max_searches(self) -> int:
+        return self.__max_searches
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    @property
+    def idle_timeout(self) -> float:
+        return self.__idle_timeout
+
+    @property
+    def active_searches(self) -> int:
+        """Gauge of the searches that are currently kept"""
+
+        return len(self.__searches)
+
+    @property
+    def queued_results(self) -> int:
+        """Gauge of the results waiting to be fetched by clients"""
+
+        return sum(search.queue.qsize() for search in self.__searches.values())
+
+    def create(
+        self,
+        username: str,
+        coro_func: Callable[[Search], Coroutine[Any, Any, None]]
+    ) -> Search:
+        """Create a search and start its background task
+
+        Parameters
+        ----------
+        username : str
+            The username that is searched for
+        coro_func : Callable[[Search], Coroutine]
+            Called with the new search, the returned coro is run
+            as the background task of the search
+
+        Returns
+        -------
+        Search
+            The created search
+
+        Raises
+        ------
+        RegistryFullError
+            Raised if `max_searches` searches are still active
+            after expired ones got evicted
+        """
+
+        if len(self.__searches) >= self.__max_searches:
+            self.sweep()
+
+        if len(self.__searches) >= self.__max_searches:
+            raise RegistryFullError(f"{self.__max_searches} searches are active")
+
+        search = Search(secrets.token_urlsafe(20), username, self.__queue_size)
+        self.__searches[search.search_id] = search
+
+        search.start(coro_func(search))
+
+        return search
+
+    def get(self, search_id: str) -> Optional[Search]:
+        """Return the search with the given id and mark it as accessed"""
+
+        search = self.__searches.get(search_id)
+
+        if search is not None:
+            search.touch()
+
+        return search
+
+    def remove(self, search_id: str) -> None:
+        """Remove a search and cancel its background task"""
+
+        search = self.__searches.pop(search_id, None)
+
+        if search is not None:
+            search.cancel()
+
+    def sweep(self) -> int:
+        """Evict all expired searches
+
+        Returns
+        -------
+        int
+            How many searches got evicted
+        """
+
+        now = monotonic()
+        expired = [
+            search_id for search_id, search in self.__searches.items()
+            if search.expired(self.__ttl, self.__idle_timeout, now)
+        ]
+
+        for search_id in expired:
+            self.remove(search_id)
+
+        return len(expired)
+
+    def start_sweeper(self, interval: Optional[float] = None) -> asyncio.Task:
+        """Periodically evict expired searches in the background
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between two sweeps, by default
+            `DEFAULT_SWEEP_INTERVAL`
+        """
+
+        interval = interval or self.DEFAULT_SWEEP_INTERVAL
+
+        async def sweeper() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                self.sweep()
+
+        if self.__sweeper is None or self.__sweeper.done():
+            self.__sweeper = asyncio.create_task(sweeper())
+
+        return self.__sweeper
+
+    async def close(self) -> None:
+        """Stop the sweeper and cancel all searches"""
+
+        if self.__sweeper is not None:
+            self.__sweeper.cancel()
+
+            try:
+                await self.__sweeper
+            except asyncio.CancelledError:
+                pass
+
+        tasks = [s.task for s in self.__searches.values() if s.task is not None]
+
+        for search_id in list(self.__searches):
+            self.remove(search_id)
+
+        await asyncio.gather(*tasks, return_exceptions=True)
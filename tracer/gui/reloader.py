@@ -0,0 +1,228 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("PoolReloader",)
+
+from typing import Callable, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import time
+import os
+
+from tracer import PoolSnapshot, SiteSpec
+
+
+class PoolReloader(object):
+    """Keep the site pool of the web GUI up to date
+
+    A watcher polls the modification time, size and inode of the
+    pool file. As soon as they change, the pool is compiled (and
+    its snapshot rewritten) in a thread of its own, so the event
+    loop keeps handling requests meanwhile and the reload doesn't
+    queue up behind DNS lookups in the default executor. A valid
+    pool replaces the previous one at once by swapping a
+    reference, hence searches that are already running finish
+    with the specs they started with and new searches use the
+    new ones. An invalid pool is reported and the previous one
+    is kept.
+
+    Attributes
+    ----------
+    path : Path
+        The JSON file of the pool
+    specs : Tuple[tracer.SiteSpec, ...]
+        The specs of the current pool
+    reloads : int
+        Successful reloads so far
+    failures : int
+        Failed reloads so far
+    last_duration : float, optional
+        Seconds the last reload took
+    last_error : str, optional
+        Why the last reload failed. `None` if it succeeded
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_INTERVAL = 2.0
+
+    __slots__ = (
+        "__path",
+        "__specs",
+        "__signature",
+        "__lock",
+        "__executor",
+        "__watcher",
+        "__reloads",
+        "__failures",
+        "__last_duration",
+        "__last_error",
+    )
+
+    def __init__(self, path: Union[str, Path], specs: Tuple[SiteSpec, ...]):
+        """Create a reloader
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The JSON file of the pool
+        specs : Tuple[tracer.SiteSpec, ...]
+            The specs of the pool as it is now
+        """
+
+        self.__path = Path(path)
+        self.__specs = specs
+        self.__signature = self.__stat()
+        self.__lock = asyncio.Lock()
+        self.__executor = ThreadPoolExecutor(1, thread_name_prefix="pool-reloader")
+        self.__watcher: Optional[asyncio.Task] = None
+        self.__reloads = 0
+        self.__failures = 0
+        self.__last_duration: Optional[float] = None
+        self.__last_error: Optional[str] = None
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @property
+    def specs(self) -> Tuple[SiteSpec, ...]:
+        return self.__specs
+
+    @property
+    def reloads(self) -> int:
+        return self.__reloads
+
+    @property
+    def failures(self) -> int:
+        return self.__failures
+
+    @property
+    def last_duration(self) -> Optional[float]:
+        return self.__last_duration
+
+    @property
+    def last_error(self) -> Optional[str]:
+        return self.__last_error
+
+    def __stat(self) -> Optional[Tuple[int, int, int]]:
+        """Returns what identifies the current version of the file"""
+
+        try:
+            stat = os.stat(self.__path)
+        except OSError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def changed(self) -> bool:
+        """Check if the file changed since it was loaded the last time"""
+
+        return self.__stat() != self.__signature
+
+    async def reload(self) -> bool:
+        """Compile the pool and swap it in
+
+        Returns
+        -------
+        bool
+            `True` if the new pool is in use, `False` if the
+            pool is invalid and the previous one is kept
+        """
+
+        async with self.__lock:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+
+            # Taken before reading, so that a change made while
+            # compiling triggers another reload
+            self.__signature = self.__stat()
+
+            try:
+                specs = await loop.run_in_executor(self.__executor, PoolSnapshot(self.__path).specs)
+            except Exception as error:
+                self.__failures += 1
+                self.__last_error = f"{error.__class__.__name__}: {error}"
+
+                return False
+            else:
+                self.__specs = specs
+                self.__reloads += 1
+                self.__last_error = None
+
+                return True
+            finally:
+                self.__last_duration = time.perf_counter() - start
+
+    def start_watcher(
+        self,
+        interval: Optional[float] = None,
+        listener: Optional[Callable[[PoolReloader, bool], None]] = None
+    ) -> asyncio.Task:
+        """Reload the pool in the background whenever it changes
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between two checks of the file, by default
+            `DEFAULT_INTERVAL`
+        listener : Callable[[PoolReloader, bool], None], optional
+            Called after every reload with the reloader and
+            whether the reload succeeded, by default None
+        """
+
+        interval = interval or self.DEFAULT_INTERVAL
+
+        async def watcher() -> None:
+            while True:
+                await asyncio.sleep(interval)
+
+                if self.changed():
+                    succeeded = await self.reload()
+
+                    if listener is not None:
+                        listener(self, succeeded)
+
+        if self.__watcher is None or self.__watcher.done():
+            self.__watcher = asyncio.create_task(watcher())
+
+        return self.__watcher
+
+    async def close(self) -> None:
+        """Stop the watcher and its thread"""
+
+        if self.__watcher is not None:
+            self.__watcher.cancel()
+
+            try:
+                await self.__watcher
+            except asyncio.CancelledError:
+                pass
+
+        self.__executor.shutdown(wait=False)
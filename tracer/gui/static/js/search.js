@@ -1,4 +1,5 @@
 const searchEndpoint = '/api/start_search';
+const streamEndpoint = '/api/search_stream';
 const domainPattern = 'https:\/\/(?:.*?\\.)*(\\w+?)\\.[a-z]{2,}\/?';
 
 
@@ -77,18 +78,62 @@ const startSearch = username => {
   request.onreadystatechange = () => {
     if (request.readyState == 4 && request.status == 200) {
       prepareResultsPage(username);
-      getResults();
+
+      if (window.EventSource) {
+        streamResults();
+      } else {
+        getResults();
+      }
     }
   }
 
   request.send(`username=${username}`);
 }
 
+/**
+ * Mark the box of a result as found or not found
+ *
+ * A result is given as `[usernameExists, url, delay]`
+ */
+const showResult = result => {
+  let box = document.getElementById(result[1].match(domainPattern)[1]);
+
+  box.style.color = (result[0] ? "#50fa7b" : "#ff5555");
+  box.style.borderColor = box.style.color;
+
+  // Avoid too many boxes on small devices by removing failed ones
+  if (!result[0] && window.innerWidth < 992) {
+    document.getElementById('results').removeChild(box);
+  }
+}
+
+/**
+ * Receive the results from the server as they arrive
+ *
+ * The server pushes batches of results as Server-Sent
+ * Events and closes the stream with a `finished` event
+ */
+const streamResults = () => {
+  let source = new EventSource(streamEndpoint);
+
+  source.onmessage = event => {
+    for (let result of JSON.parse(event.data)) {
+      showResult(result);
+    }
+  }
+
+  source.addEventListener('finished', () => source.close());
+
+  // Do not reconnect, the search is bound to this stream
+  source.onerror = () => source.close();
+}
+
 /**
  * Retrieve the results from the server
  *
  * This is done by recursively sending GET
- * requests to the server
+ * requests to the server. Used if the browser
+ * does not support Server-Sent Events
  */
 const getResults = () => {
   let request = new XMLHttpRequest();
@@ -105,15 +150,7 @@ const getResults = () => {
           return getResults();
         }
 
-        let box = document.getElementById(response[1].match(domainPattern)[1]);
-
-        box.style.color = (response[0] ? "#50fa7b" : "#ff5555");
-        box.style.borderColor = box.style.color;
-
-        // Avoid too many boxes on small devices by removing failed ones
-        if (!response[0] && window.innerWidth < 992) {
-          document.getElementById('results').removeChild(box);
-        }
+        showResult(response);
 
         return getResults();
       } else {
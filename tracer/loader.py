@@ -22,69 +22,318 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-__all__ = ("load_logo", "load_user_agent", "load_website_data")
+__all__ = (
+    "ResourceRegistry",
+    "resources",
+    "set_data_dir",
+    "load_logo",
+    "load_user_agent",
+    "load_website_data",
+    "load_site_specs",
+    "compile_pool",
+)
 
-from typing import Any, Callable, Dict, List
-from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from argparse import ArgumentParser
+from pathlib import Path
+import threading
 import secrets
+import time
 import json
 import os
 
 from colorama import Fore
 
+from models import PoolSchemaError, PoolSnapshot, SiteSpec
 
-DATA_FOLDER = "../data/"
 
+DEFAULT_LOGO = "<DEFAULT LOGO>"
+DEFAULT_USER_AGENT = "Tracer/1.0 (+https://github.com/chr3st5an/tracer)"
 
-def dir_switcher(__func: Callable[..., Any], /) -> Callable[..., Any]:
-    """Helper for switching working dirs
 
-    Switch the working directory to the directory
-    that contains this file and execute the given
-    function. After execution, switch back to the
-    original working directory.
+class ResourceRegistry(object):
+    """Loads and caches the files of the data folder
 
-    This is necessary for relative paths to work.
+    Every resource is read and parsed once, the result is kept in
+    memory. Paths are resolved from the location of the package,
+    hence the working directory is neither used nor changed. The
+    registry may be used by any amount of tasks and threads at once.
+    A resource that is requested concurrently for the first time is
+    loaded only once.
+
+    The data folder is, in this order, the folder passed to the
+    constructor or `set_data_dir`, the folder in the environment
+    variable `TRACER_DATA_DIR` or the `data` folder of the project.
+
+    Attributes
+    ----------
+    data_dir : Path
+        The folder the resources are loaded from
+
+    Methods
+    -------
+    obj.set_data_dir(Optional[Union[str, Path]]) -> None
+        Changes the data folder and drops the cached resources
+    obj.path(str) -> Path
+        Returns the path of a file in the data folder
+    obj.logo() -> str
+        Returns the logo
+    obj.user_agents() -> Tuple[str, ...]
+        Returns the user agents
+    obj.website_data() -> Tuple[Dict[str, Any], ...]
+        Returns the parsed pool
+    obj.specs() -> Tuple[tracer.SiteSpec, ...]
+        Returns the specs of the pool
+    obj.clear() -> None
+        Drops the cached resources
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the registry
+
+    Author
+    ------
+    chr3st5an
     """
 
-    @wraps(__func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        origin = os.getcwd()
-        os.chdir(os.path.dirname(__file__))
+    ENV_VAR = "TRACER_DATA_DIR"
+    DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+    __slots__ = ("__data_dir", "__cache", "__lock", "__locks", "__generation")
+
+    def __init__(self, data_dir: Optional[Union[str, Path]] = None):
+        """Creates a registry
+
+        Parameters
+        ----------
+        data_dir : Union[str, Path], optional
+            The folder the resources are loaded from. If `None`,
+            `TRACER_DATA_DIR` or the `data` folder of the project
+            is used, by default None
+        """
+
+        self.__cache: Dict[str, Any] = dict()
+        self.__lock = threading.Lock()
+        # One lock per resource, so that a slow load doesn't block the others
+        self.__locks: Dict[str, threading.Lock] = dict()
+        # Increased whenever the cache is dropped
+        self.__generation = 0
+        self.__data_dir = self.__resolve(data_dir)
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(data_dir={str(self.data_dir)!r}, "
+                f"cached={sorted(self.__cache)})>")
+
+    @property
+    def data_dir(self) -> Path:
+        return self.__data_dir
+
+    @classmethod
+    def __resolve(cls, data_dir: Optional[Union[str, Path]]) -> Path:
+        data_dir = data_dir or os.environ.get(cls.ENV_VAR) or cls.DEFAULT_DATA_DIR
+
+        return Path(data_dir).expanduser().resolve()
+
+    def set_data_dir(self, data_dir: Optional[Union[str, Path]]) -> None:
+        """Changes the data folder and drops the cached resources
+
+        Parameters
+        ----------
+        data_dir : Union[str, Path], optional
+            The new data folder. If `None`, `TRACER_DATA_DIR` or
+            the `data` folder of the project is used
+        """
+
+        with self.__lock:
+            self.__data_dir = self.__resolve(data_dir)
+            self.__cache.clear()
+            self.__generation += 1
+
+    def path(self, name: str) -> Path:
+        """Returns the path of a file in the data folder"""
+
+        return self.__data_dir / name
+
+    def clear(self) -> None:
+        """Drops the cached resources, they are loaded again on next use"""
+
+        with self.__lock:
+            self.__cache.clear()
+            self.__generation += 1
+
+    def logo(self) -> str:
+        """Returns the logo, `DEFAULT_LOGO` if there is none"""
+
+        def load() -> str:
+            try:
+                return self.path("logo.txt").read_text()
+            except FileNotFoundError:
+                return DEFAULT_LOGO
+
+        return self.__get("logo", load)
+
+    def user_agents(self) -> Tuple[str, ...]:
+        """Returns the user agents, an empty tuple if there are none"""
+
+        def load() -> Tuple[str, ...]:
+            try:
+                with open(self.path("user_agents.json")) as file:
+                    return tuple(json.load(file))
+            except FileNotFoundError:
+                return tuple()
+
+        return self.__get("user_agents", load)
+
+    def website_data(self) -> Tuple[Dict[str, Any], ...]:
+        """Returns the parsed pool
+
+        The dicts are shared by all callers and must not be changed.
+
+        Raises
+        ------
+        FileNotFoundError
+            The pool doesn't exist
+        """
+
+        def load() -> Tuple[Dict[str, Any], ...]:
+            with open(self.path("pool.json")) as file:
+                return tuple(json.load(file))
+
+        return self.__get("website_data", load)
+
+    def specs(self) -> Tuple[SiteSpec, ...]:
+        """Returns the specs of the pool
+
+        The specs are restored from the snapshot of the pool if it is
+        up to date. Otherwise the pool is compiled and the snapshot
+        gets rewritten.
+
+        Raises
+        ------
+        FileNotFoundError
+            The pool doesn't exist
+        tracer.PoolSchemaError
+            The pool is invalid
+        """
+
+        return self.__get("specs", lambda: PoolSnapshot(self.path("pool.json")).specs())
+
+    def __get(self, key: str, load: Callable[[], Any]) -> Any:
+        """Returns the cached resource, loads it if necessary
+
+        Errors aren't cached, the next call tries again. A resource
+        loaded while the cache got dropped isn't cached either.
+        """
+
+        try:
+            return self.__cache[key]
+        except KeyError:
+            pass
 
-        result = __func(*args, **kwargs)
+        with self.__lock:
+            lock = self.__locks.setdefault(key, threading.Lock())
 
-        return os.chdir(origin) or result
+        with lock:
+            with self.__lock:
+                if key in self.__cache:
+                    return self.__cache[key]
 
-    return wrapper
+                generation = self.__generation
+
+            value = load()
+
+            with self.__lock:
+                if generation == self.__generation:
+                    self.__cache[key] = value
+
+            return value
+
+
+# The registry used by the functions of this module
+resources = ResourceRegistry()
+
+
+def set_data_dir(data_dir: Optional[Union[str, Path]]) -> None:
+    """Loads the resources from another data folder
+
+    Parameters
+    ----------
+    data_dir : Union[str, Path], optional
+        The new data folder. If `None`, `TRACER_DATA_DIR` or the
+        `data` folder of the project is used
+    """
+
+    resources.set_data_dir(data_dir)
 
 
-@dir_switcher
 def load_logo() -> str:
-    try:
-        with open(f"{DATA_FOLDER}logo.txt") as file:
-            return file.read()
-    except FileNotFoundError:
-        return "<DEFAULT LOGO>"
+    return resources.logo()
 
 
-@dir_switcher
 def load_user_agent() -> str:
-    try:
-        with open(f"{DATA_FOLDER}user_agents.json") as file:
-            user_agents: List[str] = json.load(file)
+    """Returns a random user agent"""
+
+    user_agents = resources.user_agents()
+
+    return secrets.choice(user_agents) if user_agents else DEFAULT_USER_AGENT
+
+
+def load_website_data() -> List[Dict[str, Any]]:
+    """Returns the parsed pool
+
+    Every call returns new dicts, hence they may be changed.
+    """
 
-            return secrets.choice(user_agents)
+    try:
+        return [dict(entry) for entry in resources.website_data()]
     except FileNotFoundError:
-        return "Tracer/1.0 (+https://github.com/chr3st5an/tracer)"
+        print(f"{Fore.RED}[ISSUE] Couldn't find the website data "
+              f"file!{Fore.RESET}")
+        exit(1)
+
 
+def load_site_specs() -> Tuple[SiteSpec, ...]:
+    """Returns the specs of all sites of the pool
+
+    See `ResourceRegistry.specs`.
+    """
 
-@dir_switcher
-def load_website_data() -> Dict[str, str]:
     try:
-        with open(f"{DATA_FOLDER}pool.json") as file:
-            return json.load(file)
+        return resources.specs()
     except FileNotFoundError:
         print(f"{Fore.RED}[ISSUE] Couldn't find the website data "
               f"file!{Fore.RESET}")
         exit(1)
+    except PoolSchemaError as error:
+        print(f"{Fore.RED}[ISSUE] Invalid website data: {error}{Fore.RESET}")
+        exit(1)
+
+
+def compile_pool(argv: Optional[Sequence[str]] = None) -> None:
+    """Validate the pool and write its snapshot
+
+    Entry point of `python tracer compile-pool`.
+    """
+
+    parser = ArgumentParser(
+        prog="tracer compile-pool",
+        description="Validate the site pool and write its compiled snapshot",
+    )
+    parser.add_argument("pool", nargs="?", default=resources.path("pool.json"),
+                        help="the JSON file of the pool")
+    parser.add_argument("-o", "--output", help="the snapshot file, by default next to the pool")
+
+    args = parser.parse_args(argv)
+    snapshot = PoolSnapshot(args.pool, args.output)
+    start = time.perf_counter()
+
+    try:
+        specs = snapshot.compile()
+    except (PoolSchemaError, OSError) as error:
+        print(f"{Fore.RED}[ISSUE] {error}{Fore.RESET}")
+        exit(1)
+
+    print(f"[{Fore.CYAN}*{Fore.RESET}] Compiled {Fore.CYAN}{len(specs)}{Fore.RESET} sites "
+          f"into {snapshot.path.resolve()} in {Fore.CYAN}"
+          f"{time.perf_counter() - start:.2f}s{Fore.RESET}")
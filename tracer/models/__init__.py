@@ -22,9 +22,64 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from .textanimation import *
-from .websitepool import *
-from .category import *
-from .website import *
-from .result import *
-from .parser import *
+from importlib import import_module
+from typing import Any, List
+
+
+# Maps the public names to the submodules defining them. The
+# submodules are imported on first access (PEP 562), hence
+# importing a lightweight part, e.g. the parser, doesn't pull in
+# aiohttp. A star import still imports everything.
+_EXPORTS = {
+    "AsyncTextAnimation": "textanimation",
+    "WebsitePool": "websitepool",
+    "Matcher": "matcher",
+    "MatchStream": "matcher",
+    "RequestScheduler": "scheduler",
+    "ResultCache": "cache",
+    "CircuitBreaker": "breaker",
+    "LatencyTracker": "latency",
+    "RetryBudget": "retry",
+    "RetryPolicy": "retry",
+    "CachingResolver": "resolver",
+    "AbstractTransport": "transport",
+    "TransportResponse": "transport",
+    "AiohttpTransport": "transport",
+    "StubTransport": "transport",
+    "as_transport": "transport",
+    "PhaseTimings": "timing",
+    "create_trace_config": "timing",
+    "Counter": "metrics",
+    "Gauge": "metrics",
+    "Histogram": "metrics",
+    "MetricsRegistry": "metrics",
+    "ResultSink": "sink",
+    "JsonlSink": "sink",
+    "CsvSink": "sink",
+    "ResultGraph": "graph",
+    "SiteSpec": "sitespec",
+    "PoolSnapshot": "snapshot",
+    "PoolSchemaError": "snapshot",
+    "Category": "category",
+    "Website": "website",
+    "Result": "result",
+    "TracerParser": "parser",
+}
+
+__all__ = tuple(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
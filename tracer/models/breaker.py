@@ -0,0 +1,283 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("CircuitBreaker",)
+
+from typing import Dict, Optional, Union
+from abc import ABC, abstractmethod
+from pathlib import Path
+import json
+import time
+import os
+
+
+class AbstractCircuitBreaker(ABC):
+    @abstractmethod
+    def allow(self, domain):
+        pass
+
+    @abstractmethod
+    def record_success(self, domain):
+        pass
+
+    @abstractmethod
+    def record_failure(self, domain):
+        pass
+
+
+class CircuitBreaker(AbstractCircuitBreaker):
+    """Stops checking sites that keep failing
+
+    The breaker tracks the consecutive timeouts and errors of
+    every domain. A domain is
+
+    - `closed` while it works, checks are sent as usual
+    - `open` after `threshold` consecutive failures, checks are
+      skipped
+    - `half-open` once `cooldown` seconds passed since it opened.
+      A single check is let through as a probe. If it succeeds
+      the domain closes, otherwise it opens again
+
+    The state can be saved to and loaded from a JSON file, so
+    that it survives restarts.
+
+    Attributes
+    ----------
+    path : Path, optional
+        The file the state is persisted in
+    threshold : int
+        Consecutive failures after which a domain opens
+    cooldown : float
+        Seconds after which an open domain gets probed
+
+    Methods
+    -------
+    obj.state(str) -> str
+        Returns the state of a domain
+    obj.allow(str) -> bool
+        Checks if a check of the domain may be sent
+    obj.record_success(str) -> None
+        Closes the domain
+    obj.record_failure(str) -> None
+        Counts a failure of the domain
+    obj.load() -> None
+        Loads the state from `path`
+    obj.save() -> None
+        Writes the state to `path`
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the breaker
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    DEFAULT_THRESHOLD = 3
+    DEFAULT_COOLDOWN = 600.0
+
+    __slots__ = ("__path", "__threshold", "__cooldown", "__failures", "__opened", "__probes")
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        threshold: Optional[int] = None,
+        cooldown: Optional[float] = None
+    ):
+        """Creates a breaker
+
+        Parameters
+        ----------
+        path : Union[str, Path], optional
+            JSON file used by `load` and `save`. If `None`, the
+            state isn't persisted, by default None
+        threshold : int, optional
+            Consecutive failures after which a domain opens, by
+            default `DEFAULT_THRESHOLD`
+        cooldown : float, optional
+            Seconds after which an open domain gets probed, by
+            default `DEFAULT_COOLDOWN`
+
+        Raises
+        ------
+        ValueError
+            Raised if `threshold` is smaller than 1
+        """
+
+        threshold = int(threshold or self.DEFAULT_THRESHOLD)
+
+        if threshold < 1:
+            raise ValueError("threshold must be at least 1")
+
+        self.__path = Path(path) if path is not None else None
+        self.__threshold = threshold
+        self.__cooldown = float(self.DEFAULT_COOLDOWN if cooldown is None else cooldown)
+
+        # domain -> consecutive failures
+        self.__failures: Dict[str, int] = dict()
+        # domain -> unix time at which it opened
+        self.__opened: Dict[str, float] = dict()
+        # domain -> unix time at which the last probe was let through
+        self.__probes: Dict[str, float] = dict()
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(threshold={self.threshold}, "
+                f"cooldown={self.cooldown}, open={len(self.__opened)})>")
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.__path
+
+    @property
+    def threshold(self) -> int:
+        return self.__threshold
+
+    @property
+    def cooldown(self) -> float:
+        return self.__cooldown
+
+    def state(self, domain: str) -> str:
+        """Returns the state of the domain
+
+        Returns
+        -------
+        str
+            `CLOSED`, `OPEN` or `HALF_OPEN`
+        """
+
+        opened = self.__opened.get(domain)
+
+        if opened is None:
+            return self.CLOSED
+
+        if time.time() - opened >= self.__cooldown:
+            return self.HALF_OPEN
+
+        return self.OPEN
+
+    def allow(self, domain: str) -> bool:
+        """Checks if a check of the domain may be sent
+
+        While a domain is half-open, only one probe is let through
+        per `cooldown`. If the probe never reports back, e.g. because
+        it got cancelled, the next probe is allowed after another
+        `cooldown`.
+
+        Parameters
+        ----------
+        domain : str
+            The domain of the website
+
+        Returns
+        -------
+        bool
+            `True` if the check should be sent
+        """
+
+        state = self.state(domain)
+
+        if state == self.CLOSED:
+            return True
+
+        if state == self.OPEN:
+            return False
+
+        now = time.time()
+        probe = self.__probes.get(domain)
+
+        if probe is not None and now - probe < self.__cooldown:
+            return False
+
+        self.__probes[domain] = now
+
+        return True
+
+    def record_success(self, domain: str) -> None:
+        """Resets the failures of the domain and closes it"""
+
+        self.__failures.pop(domain, None)
+        self.__opened.pop(domain, None)
+        self.__probes.pop(domain, None)
+
+    def record_failure(self, domain: str) -> None:
+        """Counts a timeout or error of the domain
+
+        Opens the domain once `threshold` consecutive failures
+        are reached. A failed probe opens it again right away.
+        """
+
+        failures = self.__failures.get(domain, 0) + 1
+        self.__failures[domain] = failures
+        self.__probes.pop(domain, None)
+
+        if failures >= self.__threshold or domain in self.__opened:
+            self.__opened[domain] = time.time()
+
+    def load(self) -> None:
+        """Loads the state from `path`
+
+        A missing or malformed file is ignored.
+        """
+
+        if self.__path is None or not self.__path.exists():
+            return None
+
+        try:
+            with open(self.__path) as file:
+                data = json.load(file)
+
+            for domain, state in data.items():
+                self.__failures[domain] = int(state["failures"])
+
+                if state.get("opened") is not None:
+                    self.__opened[domain] = float(state["opened"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self) -> None:
+        """Writes the state of every failing domain to `path`"""
+
+        if self.__path is None:
+            return None
+
+        data = {
+            domain: {"failures": failures, "opened": self.__opened.get(domain)}
+            for domain, failures in self.__failures.items()
+        }
+
+        temp = self.__path.with_name(self.__path.name + ".tmp")
+
+        with open(temp, "w") as file:
+            json.dump(data, file, indent=2)
+
+        # Replaces the file at once, so readers never see a partial state
+        os.replace(temp, self.__path)
@@ -0,0 +1,395 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("ResultCache",)
+
+from typing import List, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+import sqlite3
+import time
+
+from .sitespec import SiteSpec
+
+
+# (user_exists, status_code, stored_at)
+Entry = Tuple[bool, int, float]
+
+
+class AbstractResultCache(ABC):
+    @abstractmethod
+    def get(self, spec, username):
+        pass
+
+    @abstractmethod
+    def put(self, spec, username, user_exists, status_code):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class ResultCache(AbstractResultCache):
+    """Remembers the outcome of checks for a while
+
+    The cache consists of two tiers: a LRU dict in memory in
+    front of a SQLite database on disk. The database is read once
+    when the cache gets opened, the newest `memory_size` entries
+    are loaded into memory and lookups never touch the disk, so
+    they don't block the event loop. Entries are keyed by the
+    domain of the site, the username and the rule version of the
+    spec, hence changing the rules of a site invalidates its
+    entries. Found usernames are kept for `positive_ttl` seconds,
+    not found usernames for `negative_ttl` seconds.
+
+    Only definitive outcomes should be stored, i.e. no timeouts,
+    errors, throttled or failed responses (see `is_decisive`).
+    Expired entries are deleted from the database when it gets
+    opened, so that it doesn't grow without bound.
+
+    Attributes
+    ----------
+    path : Path, optional
+        The database file. `None` if the cache lives in memory only
+    memory_size : int
+        How many entries are kept in memory
+    positive_ttl : float
+        Seconds a found username is cached
+    negative_ttl : float
+        Seconds a not found username is cached
+    refresh : bool
+        If `True`, lookups always miss but new outcomes are stored
+    hits : int
+        The amount of lookups answered by the cache
+    misses : int
+        The amount of lookups not answered by the cache
+
+    Methods
+    -------
+    obj.get(tracer.SiteSpec, str) -> Optional[Tuple[bool, int, float]]
+        Returns the cached outcome of a check
+    obj.put(tracer.SiteSpec, str, bool, int) -> None
+        Stores the outcome of a check
+    obj.flush() -> None
+        Writes pending entries to disk
+    obj.purge() -> int
+        Deletes expired entries from disk
+    obj.close() -> None
+        Flushes and closes the database
+
+    Staticmethods
+    -------------
+    cls.is_decisive(int) -> bool
+        Checks if a response with the status code says
+        something about the username
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the cache
+    `len(obj)`
+        Returns the amount of entries kept in memory
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_MEMORY_SIZE = 4_096
+    DEFAULT_POSITIVE_TTL = 86_400.0
+    DEFAULT_NEGATIVE_TTL = 3_600.0
+
+    # Pending writes are committed in batches of this size
+    COMMIT_BATCH_SIZE = 64
+
+    __slots__ = (
+        "__path",
+        "__memory",
+        "__memory_size",
+        "__positive_ttl",
+        "__negative_ttl",
+        "__refresh",
+        "__db",
+        "__pending",
+        "__hits",
+        "__misses",
+    )
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        memory_size: Optional[int] = None,
+        positive_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        refresh: bool = False
+    ):
+        """Creates a cache
+
+        Parameters
+        ----------
+        path : Union[str, Path], optional
+            The SQLite database file. It is created if it doesn't
+            exist. If `None`, only the memory tier is used, by
+            default None
+        memory_size : int, optional
+            How many entries are kept in memory, by default
+            `DEFAULT_MEMORY_SIZE`
+        positive_ttl : float, optional
+            Seconds a found username is cached, by default
+            `DEFAULT_POSITIVE_TTL`
+        negative_ttl : float, optional
+            Seconds a not found username is cached, by default
+            `DEFAULT_NEGATIVE_TTL`
+        refresh : bool, optional
+            Ignore cached entries but store new ones, by default
+            False
+        """
+
+        self.__path = Path(path) if path is not None else None
+        self.__memory: OrderedDict[str, Entry] = OrderedDict()
+        self.__memory_size = int(memory_size or self.DEFAULT_MEMORY_SIZE)
+        self.__positive_ttl = float(
+            self.DEFAULT_POSITIVE_TTL if positive_ttl is None else positive_ttl
+        )
+        self.__negative_ttl = float(
+            self.DEFAULT_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        )
+        self.__refresh = bool(refresh)
+        self.__db: Optional[sqlite3.Connection] = None
+        self.__pending: List[Tuple[str, int, int, float]] = list()
+        self.__hits = 0
+        self.__misses = 0
+
+        if self.__path is not None:
+            self.__db = sqlite3.connect(str(self.__path))
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute("PRAGMA synchronous=NORMAL")
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, user_exists INTEGER, "
+                "status_code INTEGER, stored_at REAL)"
+            )
+            self.__db.commit()
+            self.purge()
+
+            if not self.__refresh:
+                self.__load()
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(path={self.path}, "
+                f"hits={self.hits}, misses={self.misses})>")
+
+    def __len__(self) -> int:
+        return len(self.__memory)
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.__path
+
+    @property
+    def memory_size(self) -> int:
+        return self.__memory_size
+
+    @property
+    def positive_ttl(self) -> float:
+        return self.__positive_ttl
+
+    @property
+    def negative_ttl(self) -> float:
+        return self.__negative_ttl
+
+    @property
+    def refresh(self) -> bool:
+        return self.__refresh
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @staticmethod
+    def is_decisive(status_code: int) -> bool:
+        """Checks if a response with the status code says something about the username
+
+        Server errors (5xx) and throttled responses (429) are
+        transient and must not be cached.
+        """
+
+        return status_code < 500 and status_code != 429
+
+    @staticmethod
+    def key(spec: SiteSpec, username: str) -> str:
+        """Returns the key of a check"""
+
+        return f"{spec.domain}\0{username}\0{spec.rule_version}"
+
+    def get(self, spec: SiteSpec, username: str) -> Optional[Entry]:
+        """Returns the cached outcome of a check
+
+        Parameters
+        ----------
+        spec : tracer.SiteSpec
+            The rules of the checked site
+        username : str
+            The checked username
+
+        Returns
+        -------
+        Optional[Tuple[bool, int, float]]
+            Whether the username exists, the status code of the
+            response and the unix time at which the outcome got
+            stored. `None` if nothing valid is cached
+        """
+
+        if self.__refresh:
+            self.__misses += 1
+
+            return None
+
+        key = self.key(spec, username)
+        entry = self.__memory.get(key)
+
+        if entry is not None:
+            self.__memory.move_to_end(key)
+
+        if entry is None or self.__expired(entry):
+            self.__misses += 1
+
+            return None
+
+        self.__hits += 1
+
+        return entry
+
+    def put(
+        self,
+        spec: SiteSpec,
+        username: str,
+        user_exists: bool,
+        status_code: int
+    ) -> None:
+        """Stores the outcome of a check
+
+        Parameters
+        ----------
+        spec : tracer.SiteSpec
+            The rules of the checked site
+        username : str
+            The checked username
+        user_exists : bool
+            Whether the username exists
+        status_code : int
+            The status code of the response
+        """
+
+        key = self.key(spec, username)
+        entry = (bool(user_exists), status_code, time.time())
+
+        self.__remember(key, entry)
+
+        if self.__db is not None:
+            self.__pending.append((key, int(entry[0]), entry[1], entry[2]))
+
+            if len(self.__pending) >= self.COMMIT_BATCH_SIZE:
+                self.flush()
+
+    def flush(self) -> None:
+        """Writes pending entries to disk in one transaction"""
+
+        if self.__db is None or not self.__pending:
+            return None
+
+        with self.__db:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                self.__pending
+            )
+
+        self.__pending.clear()
+
+    def purge(self) -> int:
+        """Deletes expired entries from disk
+
+        Returns
+        -------
+        int
+            The amount of deleted entries
+        """
+
+        if self.__db is None:
+            return 0
+
+        now = time.time()
+
+        with self.__db:
+            deleted = self.__db.execute(
+                "DELETE FROM results WHERE stored_at < "
+                "CASE WHEN user_exists THEN ? ELSE ? END",
+                (now - self.__positive_ttl, now - self.__negative_ttl)
+            ).rowcount
+
+        return deleted
+
+    def close(self) -> None:
+        """Flushes pending entries and closes the database"""
+
+        if self.__db is None:
+            return None
+
+        self.flush()
+        self.__db.close()
+        self.__db = None
+
+    def __load(self) -> None:
+        """Loads the newest entries of the database into memory"""
+
+        rows = self.__db.execute(
+            "SELECT key, user_exists, status_code, stored_at FROM results "
+            "ORDER BY stored_at DESC LIMIT ?", (self.__memory_size,)
+        ).fetchall()
+
+        # Oldest first, so that they get evicted first
+        for key, user_exists, status_code, stored_at in reversed(rows):
+            self.__memory[key] = (bool(user_exists), status_code, stored_at)
+
+    def __remember(self, key: str, entry: Entry) -> None:
+        """Puts an entry into the memory tier and evicts the oldest one"""
+
+        self.__memory[key] = entry
+        self.__memory.move_to_end(key)
+
+        if len(self.__memory) > self.__memory_size:
+            self.__memory.popitem(last=False)
+
+    def __expired(self, entry: Entry) -> bool:
+        ttl = self.__positive_ttl if entry[0] else self.__negative_ttl
+
+        return time.time() - entry[2] > ttl
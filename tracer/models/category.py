@@ -32,6 +32,8 @@ from copy import deepcopy
 
 
 class AbstractCategory(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def website(self):
@@ -43,8 +45,8 @@ class Category(AbstractCategory):
 
     Attributes
     ----------
-    website : tracer.Website
-        The website to which the category belongs to
+    website : tracer.SiteSpec
+        The spec of the website to which the category belongs to
     as_number : int
         The int representation of the category
     as_str : str
@@ -96,6 +98,8 @@ class Category(AbstractCategory):
     LINKS = 15
     OTHER = 16
 
+    __slots__ = ("__website", "__number")
+
     @classmethod
     def to_number(cls, category: str) -> int:
         """Returns the int representation of the given category
@@ -160,8 +164,8 @@ class Category(AbstractCategory):
 
         Parameters
         ----------
-        website : tracer.Website
-            The website that belongs to this category
+        website : tracer.SiteSpec
+            The spec of the website that belongs to this category
         category_number : int
             The number of the category to represent with
             this object
@@ -191,18 +195,15 @@ class Category(AbstractCategory):
             return False
 
     def __copy__(self) -> Category:
-        category = self.__class__.__new__(self.__class__)
-        category.__dict__.update(self.__dict__)
-
-        return category
+        return self.__class__(self.__website, self.__number)
 
     def __deepcopy__(self, memo: Dict[int, Any]) -> Category:
         category = self.__class__.__new__(self.__class__)
 
         memo[id(self)] = category
 
-        for k, v in self.__dict__.items():
-            setattr(category, k, deepcopy(v, memo))
+        category.__website = deepcopy(self.__website, memo)
+        category.__number = self.__number
 
         return category
 
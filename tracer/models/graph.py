@@ -0,0 +1,278 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("ResultGraph",)
+
+from typing import Any, Dict, List, Tuple, Union
+from pathlib import Path
+from html import escape
+import json
+import math
+
+from .result import Result
+
+
+# Colors of the graph, taken from the Dracula theme
+BACKGROUND = "#282a36"
+FOREGROUND = "#f8f8f2"
+NODE_COLORS = {"username": "#ff79c6", "category": "#bd93f9", "site": "#ff5555"}
+
+
+class ResultGraph(object):
+    """Graph of username -> category -> site for the found accounts
+
+    The graph is built incrementally, pass every result to `add`
+    as soon as it is available. Only results of the username of
+    the graph on which the username exists are part of it.
+
+    It is written as a small self-contained HTML page, the
+    layout is computed in Python and drawn as SVG, hence the page
+    neither needs JavaScript nor a network connection. The graph
+    can also be written as JSON or be converted into a pyvis
+    network if pyvis is installed.
+
+    Attributes
+    ----------
+    username : str
+        The username in the center of the graph
+    sites : Dict[str, List[Tuple[str, str]]]
+        The names and urls of the sites per category
+
+    Methods
+    -------
+    obj.add(tracer.Result) -> bool
+        Adds the site of a result, returns if it got added
+    obj.as_dict() -> Dict[str, Any]
+        Returns nodes and edges of the graph
+    obj.to_html() -> str
+        Returns the graph as a HTML page
+    obj.write_html(Union[str, Path]) -> None
+        Writes the HTML page into a file
+    obj.write_json(Union[str, Path]) -> None
+        Writes `as_dict` as JSON into a file
+    obj.to_pyvis() -> pyvis.network.Network
+        Converts the graph into a pyvis network
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the graph
+    `len(obj)`
+        Returns the amount of sites in the graph
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    # Radii of the rings of categories and sites
+    CATEGORY_RADIUS = 170
+    SITE_RADIUS = 360
+    # Sites of crowded rings alternate between two radii
+    SITE_STAGGER = 70
+    NODE_RADIUS = 16
+
+    __slots__ = ("__username", "__sites", "__seen")
+
+    def __init__(self, username: str):
+        self.__username = username
+        # (domain, name, url) per category
+        self.__sites: Dict[str, List[Tuple[str, str, str]]] = dict()
+        self.__seen: set = set()
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(username={self.username!r}, "
+                f"sites={len(self)})>")
+
+    def __len__(self) -> int:
+        return len(self.__seen)
+
+    @property
+    def username(self) -> str:
+        return self.__username
+
+    @property
+    def sites(self) -> Dict[str, List[Tuple[str, str]]]:
+        return {
+            category: [(name, url) for _, name, url in sites]
+            for category, sites in self.__sites.items()
+        }
+
+    def add(self, result: Result) -> bool:
+        """Adds the site of the result if the username exists on it
+
+        Returns
+        -------
+        bool
+            If the site got added
+        """
+
+        if not result.user_exists or result.username != self.__username:
+            return False
+
+        site = result.website
+
+        if site.domain in self.__seen:
+            return False
+
+        self.__seen.add(site.domain)
+        self.__sites.setdefault(site.category.as_str.title(), []).append(
+            (site.domain, site.name, result.url)
+        )
+
+        return True
+
+    def as_dict(self) -> Dict[str, Any]:
+        nodes: List[Dict[str, Any]] = [
+            {"id": f"user:{self.__username}", "label": self.__username, "type": "username"}
+        ]
+        edges: List[Tuple[str, str]] = list()
+
+        for category, sites in self.__sites.items():
+            nodes.append({"id": f"category:{category}", "label": category, "type": "category"})
+            edges.append((f"user:{self.__username}", f"category:{category}"))
+
+            # Keyed by the domain, names like `example` aren't unique
+            for domain, name, url in sites:
+                nodes.append({"id": f"site:{domain}", "label": name, "type": "site", "url": url})
+                edges.append((f"category:{category}", f"site:{domain}"))
+
+        return {"username": self.__username, "nodes": nodes, "edges": edges}
+
+    def __layout(self) -> Dict[str, Tuple[float, float]]:
+        """Places the username in the center and the sites around their category
+
+        Every category gets a sector of the circle whose size
+        depends on its amount of sites.
+        """
+
+        positions = {f"user:{self.__username}": (0.0, 0.0)}
+        weights = {category: max(1, len(sites)) for category, sites in self.__sites.items()}
+        total = sum(weights.values())
+        crowded = len(self) > 2 * math.pi * self.SITE_RADIUS / (3 * self.NODE_RADIUS)
+        start = -math.pi / 2
+
+        for category, sites in self.__sites.items():
+            span = 2 * math.pi * weights[category] / total
+            middle = start + span / 2
+
+            positions[f"category:{category}"] = (
+                self.CATEGORY_RADIUS * math.cos(middle),
+                self.CATEGORY_RADIUS * math.sin(middle),
+            )
+
+            for i, (domain, _, _) in enumerate(sites):
+                angle = start + span * (i + 0.5) / len(sites)
+                radius = self.SITE_RADIUS + (self.SITE_STAGGER if crowded and i % 2 else 0)
+
+                positions[f"site:{domain}"] = (radius * math.cos(angle), radius * math.sin(angle))
+
+            start += span
+
+        return positions
+
+    def to_html(self) -> str:
+        graph = self.as_dict()
+        positions = self.__layout()
+        size = 2 * (self.SITE_RADIUS + self.SITE_STAGGER + 4 * self.NODE_RADIUS)
+        shapes: List[str] = list()
+
+        for source, target in graph["edges"]:
+            (x1, y1), (x2, y2) = positions[source], positions[target]
+            shapes.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>')
+
+        for node in graph["nodes"]:
+            x, y = positions[node["id"]]
+            label = escape(node["label"])
+            shape = (f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{self.NODE_RADIUS}" '
+                     f'fill="{NODE_COLORS[node["type"]]}"><title>{escape(node.get("url", label))}'
+                     f'</title></circle><text x="{x:.1f}" y="{y + 2.2 * self.NODE_RADIUS:.1f}">'
+                     f'{label}</text>')
+
+            if "url" in node:
+                shape = f'<a href="{escape(node["url"])}" target="_blank">{shape}</a>'
+
+            shapes.append(shape)
+
+        return (
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>Tracer: {escape(self.__username)}</title><style>"
+            f"html,body{{margin:0;height:100%;background:{BACKGROUND}}}"
+            "svg{width:100%;height:100%}"
+            f"line{{stroke:{FOREGROUND};stroke-opacity:.3}}"
+            f"text{{fill:{FOREGROUND};font:12px sans-serif;text-anchor:middle}}"
+            "</style></head><body>"
+            f'<svg viewBox="{-size / 2} {-size / 2} {size} {size}">'
+            + "".join(shapes)
+            + "</svg></body></html>\n"
+        )
+
+    def write_html(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_html())
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+    def to_pyvis(self) -> Any:
+        """Converts the graph into a `pyvis.network.Network`
+
+        pyvis is imported only now, as it is an optional backend.
+
+        Raises
+        ------
+        ImportError
+            pyvis is not installed
+        """
+
+        from pyvis.network import Network
+
+        graph = self.as_dict()
+        net = Network(
+            height="100%",
+            width="100%",
+            bgcolor=BACKGROUND,
+            font_color=FOREGROUND,
+        )
+
+        for node in graph["nodes"]:
+            net.add_node(
+                n_id=node["id"],
+                label=node["label"],
+                color=NODE_COLORS[node["type"]],
+                shape="circle",
+                title=node.get("url", node["label"]),
+                labelHighlightBold=True,
+            )
+
+        for source, target in graph["edges"]:
+            net.add_edge(source, target)
+
+        net.toggle_physics(True)
+        net.set_edge_smooth("dynamic")
+
+        return net
@@ -0,0 +1,287 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("LatencyTracker",)
+
+from typing import Deque, Dict, Optional, Sequence, Union
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+import json
+import math
+import os
+
+from aiohttp import ClientTimeout
+
+
+class AbstractLatencyTracker(ABC):
+    @abstractmethod
+    def record(self, domain, delay):
+        pass
+
+    @abstractmethod
+    def timeout(self, domain, ceiling):
+        pass
+
+
+class LatencyTracker(AbstractLatencyTracker):
+    """Derives per-site timeouts from observed latencies
+
+    The tracker keeps the latest delays of every domain. Once
+    enough samples are known, the timeout of a domain is the
+    `percentile` of its delays multiplied by `headroom`, capped
+    by the ceiling given by the user. The timeout is split into
+    a total, a connect and a sock_read deadline.
+
+    Attributes
+    ----------
+    path : Path, optional
+        The file the history is persisted in
+    percentile : float
+        Which percentile of the delays is used, e.g. 99
+    headroom : float
+        Factor applied on the percentile
+    history_size : int
+        How many delays are kept per domain
+    min_samples : int
+        How many delays are needed before the timeout of a
+        domain adapts
+
+    Methods
+    -------
+    obj.record(str, float) -> None
+        Adds a delay to the history of a domain
+    obj.estimate(str) -> Optional[float]
+        Returns the adaptive deadline of a domain in seconds
+    obj.timeout(str, Optional[float]) -> aiohttp.ClientTimeout
+        Returns the timeout for the next request to a domain
+    obj.load() -> None
+        Loads the history from `path`
+    obj.save() -> None
+        Writes the history to `path`
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the tracker
+    `len(obj)`
+        Returns the amount of domains with a history
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_PERCENTILE = 99.0
+    DEFAULT_HEADROOM = 1.5
+    DEFAULT_HISTORY_SIZE = 50
+    DEFAULT_MIN_SAMPLES = 5
+
+    # Lower bound of an adaptive deadline in seconds
+    MIN_TIMEOUT = 1.0
+
+    __slots__ = (
+        "__path",
+        "__percentile",
+        "__headroom",
+        "__history_size",
+        "__min_samples",
+        "__history",
+    )
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        percentile: Optional[float] = None,
+        headroom: Optional[float] = None,
+        history_size: Optional[int] = None,
+        min_samples: Optional[int] = None
+    ):
+        """Creates a tracker
+
+        Parameters
+        ----------
+        path : Union[str, Path], optional
+            JSON file used by `load` and `save`. If `None`, the
+            history isn't persisted, by default None
+        percentile : float, optional
+            Which percentile of the delays is used, by default
+            `DEFAULT_PERCENTILE`
+        headroom : float, optional
+            Factor applied on the percentile, by default
+            `DEFAULT_HEADROOM`
+        history_size : int, optional
+            How many delays are kept per domain, by default
+            `DEFAULT_HISTORY_SIZE`
+        min_samples : int, optional
+            How many delays are needed before the timeout adapts,
+            by default `DEFAULT_MIN_SAMPLES`
+
+        Raises
+        ------
+        ValueError
+            Raised if `percentile` is not within (0, 100]
+        """
+
+        percentile = float(percentile or self.DEFAULT_PERCENTILE)
+
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be within (0, 100]")
+
+        self.__path = Path(path) if path is not None else None
+        self.__percentile = percentile
+        self.__headroom = float(headroom or self.DEFAULT_HEADROOM)
+        self.__history_size = int(history_size or self.DEFAULT_HISTORY_SIZE)
+        self.__min_samples = int(min_samples or self.DEFAULT_MIN_SAMPLES)
+        self.__history: Dict[str, Deque[float]] = dict()
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(percentile={self.percentile}, "
+                f"domains={len(self)})>")
+
+    def __len__(self) -> int:
+        return len(self.__history)
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.__path
+
+    @property
+    def percentile(self) -> float:
+        return self.__percentile
+
+    @property
+    def headroom(self) -> float:
+        return self.__headroom
+
+    @property
+    def history_size(self) -> int:
+        return self.__history_size
+
+    @property
+    def min_samples(self) -> int:
+        return self.__min_samples
+
+    @staticmethod
+    def nearest_rank(samples: Sequence[float], percentile: float) -> float:
+        """Returns the percentile of the samples by using the nearest-rank method"""
+
+        ordered = sorted(samples)
+        rank = math.ceil(percentile / 100 * len(ordered))
+
+        return ordered[max(0, rank - 1)]
+
+    def record(self, domain: str, delay: float) -> None:
+        """Adds a delay in seconds to the history of the domain"""
+
+        history = self.__history.get(domain)
+
+        if history is None:
+            history = self.__history[domain] = deque(maxlen=self.__history_size)
+
+        history.append(float(delay))
+
+    def estimate(self, domain: str) -> Optional[float]:
+        """Returns the adaptive deadline of the domain in seconds
+
+        Returns
+        -------
+        Optional[float]
+            `None` if not enough delays are known
+        """
+
+        history = self.__history.get(domain)
+
+        if history is None or len(history) < self.__min_samples:
+            return None
+
+        deadline = self.nearest_rank(history, self.__percentile) * self.__headroom
+
+        return max(self.MIN_TIMEOUT, deadline)
+
+    def timeout(self, domain: str, ceiling: Optional[float] = None) -> ClientTimeout:
+        """Returns the timeout for the next request to the domain
+
+        Parameters
+        ----------
+        domain : str
+            The domain of the website
+        ceiling : float, optional
+            The timeout given by the user. The adaptive deadline
+            never exceeds it. If not enough delays are known, it
+            is used as it is, by default None
+
+        Returns
+        -------
+        aiohttp.ClientTimeout
+            Timeout with a total, a connect and a sock_read deadline
+        """
+
+        total = self.estimate(domain)
+
+        if total is None:
+            return ClientTimeout(ceiling)
+
+        if ceiling is not None:
+            total = min(total, ceiling)
+
+        # Establishing the connection and waiting for the first
+        # bytes may each take at most half of the deadline
+        return ClientTimeout(total=total, connect=total / 2, sock_read=total / 2)
+
+    def load(self) -> None:
+        """Loads the history from `path`
+
+        A missing or malformed file is ignored.
+        """
+
+        if self.__path is None or not self.__path.exists():
+            return None
+
+        try:
+            with open(self.__path) as file:
+                data = json.load(file)
+
+            for domain, delays in data.items():
+                for delay in delays:
+                    self.record(domain, delay)
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    def save(self) -> None:
+        """Writes the history to `path`"""
+
+        if self.__path is None:
+            return None
+
+        data = {domain: list(delays) for domain, delays in self.__history.items()}
+        temp = self.__path.with_name(self.__path.name + ".tmp")
+
+        with open(temp, "w") as file:
+            json.dump(data, file)
+
+        # Replaces the file at once, so readers never see a partial history
+        os.replace(temp, self.__path)
@@ -0,0 +1,620 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("Matcher", "MatchStream")
+
+from typing import List, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+import re
+
+
+# Quantifiers which make the preceding literal optional
+OPTIONAL_QUANTIFIERS = "*?{"
+
+# Characters which end a run of literal text
+METACHARACTERS = ".^$*+?{}[]|()"
+
+# Patterns targeting the title of a page can be decided as
+# soon as the title got closed
+TITLE_START = b"<title"
+TITLE_END = b"</title"
+
+
+class AbstractMatcher(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def search(self, data):
+        pass
+
+    @abstractmethod
+    def stream(self):
+        pass
+
+
+class Matcher(AbstractMatcher):
+    """A precompiled regex pattern that is applied on raw bytes
+
+    The pattern is compiled once into a bytes pattern, so that
+    response bodies don't have to be decoded (which includes
+    charset detection if the server doesn't send a charset).
+
+    Before running the regex, two literal prefilters are applied
+    with a plain substring search:
+
+    - the prefix each match starts with (e.g. `<title`). The regex
+      starts at its first occurrence
+    - the longest literal each match contains (e.g. `Not Found`)
+
+    If one of them isn't part of the data, the regex isn't run
+    at all.
+
+    A matcher restored from its `state` (e.g. from a snapshot of
+    the pool) compiles its regex right away but skips the analysis
+    of the pattern.
+
+    Attributes
+    ----------
+    pattern : str
+        The original regex pattern
+    flags : int
+        The flags used to compile the pattern
+    regex : re.Pattern
+        The compiled pattern
+    prefix : bytes, optional
+        The literal prefix each match starts with. `None` if the
+        pattern doesn't start with a literal
+    anchor : bytes, optional
+        The longest literal each match contains. `None` if there
+        is none besides the prefix
+    terminator : bytes, optional
+        If this is part of the data without the pattern having
+        matched, it is not going to match anymore. `None` if the
+        whole data is needed
+    state : Tuple[str, int, Optional[bytes], Optional[bytes], Optional[bytes]]
+        The pattern, flags and prefilters of the matcher
+
+    Methods
+    -------
+    obj.search(Union[str, bytes]) -> bool
+        Checks if the pattern matches the data
+    obj.stream() -> tracer.MatchStream
+        Creates an incremental matcher for data that arrives
+        in chunks
+
+    Classmethods
+    ------------
+    cls.literal_runs(str) -> List[Tuple[int, str]]
+        Returns the literal text each match of a pattern
+        contains
+    cls.literal_prefix(str) -> str
+        Returns the literal text each match of a pattern
+        starts with
+    cls.from_state(tuple) -> tracer.Matcher
+        Restores a matcher without analysing the pattern
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the matcher
+    `x == obj`
+        Compares the patterns and the flags of both objects
+
+    Note
+    ----
+    Patterns are compiled as bytes patterns and hence `\\s`, `\\w`
+    etc. only match ASCII characters. Patterns containing non-ASCII
+    characters are applied on the data decoded as UTF-8 instead.
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = (
+        "__pattern",
+        "__flags",
+        "__regex",
+        "__prefix",
+        "__anchor",
+        "__terminator",
+        "__binary",
+    )
+
+    TEXT_FLAGS = re.S | re.I | re.M
+    URL_FLAGS = re.I
+
+    @classmethod
+    def literal_runs(cls, pattern: str) -> List[Tuple[int, str]]:
+        """Returns the literal text each match of the pattern contains
+
+        Only literals outside of groups and character sets are taken
+        into account. Patterns with an alternation don't have any
+        required literals.
+
+        Parameters
+        ----------
+        pattern : str
+            A regex pattern
+
+        Returns
+        -------
+        List[Tuple[int, str]]
+            The runs of literal text together with the index in the
+            pattern at which they start
+
+        Example
+        -------
+            >>> Matcher.literal_runs("<p.*?404 Not Found</p>")
+            [(0, '<p'), (5, '404 Not Found</p>')]
+        """
+
+        # An alternation can match any of its branches
+        if re.search(r"(?<!\\)(?:\\\\)*\|", pattern):
+            return []
+
+        runs = []
+        run, start = [], 0
+        i = 0
+
+        def close(index: int) -> None:
+            nonlocal run, start
+
+            if run:
+                runs.append((start, "".join(run)))
+
+            run, start = [], index
+
+        while i < len(pattern):
+            char = pattern[i]
+
+            if char == "\\" and (i + 1 < len(pattern)) and not pattern[i + 1].isalnum():
+                literal, step = pattern[i + 1], 2
+            elif char == "[":
+                i = cls.__skip_set(pattern, i)
+                close(i)
+                continue
+            elif char == "(":
+                i = cls.__skip_group(pattern, i)
+                close(i)
+                continue
+            elif char == "\\" or char in METACHARACTERS:
+                i += 2 if char == "\\" else 1
+                close(i)
+                continue
+            else:
+                literal, step = char, 1
+
+            quantifier = pattern[i + step:i + step + 1]
+
+            if quantifier and quantifier in OPTIONAL_QUANTIFIERS:
+                i += step
+                close(i)
+                continue
+
+            if not run:
+                start = i
+
+            run.append(literal)
+            i += step
+
+            if quantifier == "+":
+                close(i)
+
+        close(i)
+
+        return runs
+
+    @classmethod
+    def literal_prefix(cls, pattern: str) -> str:
+        """Returns the literal text each match of the pattern starts with
+
+        Parameters
+        ----------
+        pattern : str
+            A regex pattern
+
+        Returns
+        -------
+        str
+            The literal prefix, an empty str if the pattern
+            doesn't start with a literal
+
+        Example
+        -------
+            >>> Matcher.literal_prefix("<title.*?>Not Found</title>")  # '<title'
+
+            >>> Matcher.literal_prefix("ab?c")  # 'a'
+        """
+
+        runs = cls.literal_runs(pattern)
+
+        return runs[0][1] if runs and runs[0][0] == 0 else ""
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Tuple[str, int, Optional[bytes], Optional[bytes], Optional[bytes]]
+    ) -> Matcher:
+        """Restores a matcher from its `state`
+
+        The pattern isn't analysed again, hence the state has to
+        stem from a matcher that got created successfully. The regex
+        is compiled right away, so that the first check using it
+        doesn't have to.
+
+        Parameters
+        ----------
+        state : Tuple[str, int, Optional[bytes], Optional[bytes], Optional[bytes]]
+            The `state` of a matcher
+
+        Returns
+        -------
+        tracer.Matcher
+            The restored matcher
+        """
+
+        matcher = cls.__new__(cls)
+        pattern, flags, prefix, anchor, terminator = state
+
+        matcher.__pattern = pattern
+        matcher.__flags = flags
+        matcher.__binary = pattern.isascii()
+        matcher.__regex = re.compile(pattern.encode() if matcher.__binary else pattern, flags)
+        matcher.__prefix = prefix
+        matcher.__anchor = anchor
+        matcher.__terminator = terminator
+
+        return matcher
+
+    @staticmethod
+    def __skip_set(pattern: str, i: int) -> int:
+        """Returns the index after the character set starting at `i`"""
+
+        i += 1
+
+        if pattern[i:i + 1] == "^":
+            i += 1
+
+        # A closing bracket at the start is part of the set
+        if pattern[i:i + 1] == "]":
+            i += 1
+
+        while i < len(pattern) and pattern[i] != "]":
+            i += 2 if pattern[i] == "\\" else 1
+
+        return i + 1
+
+    @classmethod
+    def __skip_group(cls, pattern: str, i: int) -> int:
+        """Returns the index after the group starting at `i`"""
+
+        depth = 0
+
+        while i < len(pattern):
+            char = pattern[i]
+
+            if char == "\\":
+                i += 2
+                continue
+
+            if char == "[":
+                i = cls.__skip_set(pattern, i)
+                continue
+
+            depth += (char == "(") - (char == ")")
+            i += 1
+
+            if depth == 0:
+                break
+
+        return i
+
+    def __init__(self, pattern: str, flags: int = TEXT_FLAGS):
+        """Compiles the pattern
+
+        Parameters
+        ----------
+        pattern : str
+            The regex pattern
+        flags : int, optional
+            The flags used to compile the pattern, by default
+            `Matcher.TEXT_FLAGS`
+
+        Raises
+        ------
+        re.error
+            The pattern is invalid
+        """
+
+        self.__pattern = pattern
+        self.__flags = flags
+        self.__binary = pattern.isascii()
+        self.__prefix = None
+        self.__anchor = None
+        self.__terminator = None
+
+        if not self.__binary:
+            self.__regex = re.compile(pattern, flags)
+
+            return None
+
+        self.__regex = re.compile(pattern.encode(), flags)
+
+        runs = [
+            (start, run.lower() if self.ignore_case else run)
+            for start, run in self.literal_runs(pattern)
+        ]
+
+        if runs and runs[0][0] == 0 and len(runs[0][1]) > 1:
+            self.__prefix = runs[0][1].encode()
+
+        if runs:
+            anchor = max(runs, key=lambda run: len(run[1]))[1].encode()
+
+            if len(anchor) > 2 and anchor != self.__prefix:
+                self.__anchor = anchor
+
+        if self.ignore_case and (self.__prefix or b"").startswith(TITLE_START):
+            self.__terminator = TITLE_END
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(pattern={self.pattern!r}, "
+                f"prefix={self.prefix!r}, anchor={self.anchor!r}, "
+                f"terminator={self.terminator!r})>")
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, self.__class__)
+            and self.pattern == other.pattern
+            and self.flags == other.flags
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.pattern, self.flags))
+
+    @property
+    def pattern(self) -> str:
+        return self.__pattern
+
+    @property
+    def flags(self) -> int:
+        return self.__flags
+
+    @property
+    def regex(self) -> re.Pattern:
+        return self.__regex
+
+    @property
+    def prefix(self) -> Optional[bytes]:
+        return self.__prefix
+
+    @property
+    def anchor(self) -> Optional[bytes]:
+        return self.__anchor
+
+    @property
+    def terminator(self) -> Optional[bytes]:
+        return self.__terminator
+
+    @property
+    def state(self) -> Tuple[str, int, Optional[bytes], Optional[bytes], Optional[bytes]]:
+        return (self.__pattern, int(self.__flags), self.__prefix, self.__anchor, self.__terminator)
+
+    @property
+    def ignore_case(self) -> bool:
+        return bool(self.__flags & re.I)
+
+    @property
+    def needs_lowered(self) -> bool:
+        """If the prefilters have to run on a lowered copy of the data"""
+
+        return self.ignore_case and bool(self.__prefix or self.__anchor or self.__terminator)
+
+    def search(self, data: Union[str, bytes, bytearray]) -> bool:
+        """Checks if the pattern matches the data
+
+        Parameters
+        ----------
+        data : Union[str, bytes, bytearray]
+            The data on which the pattern is applied. A str is
+            encoded as UTF-8
+
+        Returns
+        -------
+        bool
+            If the pattern matches
+        """
+
+        if isinstance(data, str):
+            data = data.encode()
+
+        if not self.__binary:
+            return self._run(data, 0)
+
+        haystack = data.lower() if self.needs_lowered else data
+        start = 0
+
+        if self.__anchor is not None and haystack.find(self.__anchor) == -1:
+            return False
+
+        if self.__prefix is not None:
+            start = haystack.find(self.__prefix)
+
+            if start == -1:
+                return False
+
+        return self._run(data, start)
+
+    def _run(self, data: Union[bytes, bytearray], start: int) -> bool:
+        """Runs the regex without any prefilter"""
+
+        if not self.__binary:
+            return self.__regex.search(bytes(data).decode(errors="replace")) is not None
+
+        return self.__regex.search(data, start) is not None
+
+    def stream(self) -> MatchStream:
+        """Creates an incremental matcher
+
+        Returns
+        -------
+        tracer.MatchStream
+            The incremental matcher
+        """
+
+        return MatchStream(self)
+
+
+class MatchStream(object):
+    """Applies a `tracer.Matcher` on data that arrives in chunks
+
+    While chunks arrive it is checked if the pattern can be decided
+    already, hence the rest of the data doesn't have to be
+    received anymore. This is the case if
+
+    - the pattern matches
+    - the terminator of the matcher (e.g. `</title`) got received
+      without a match
+
+    The prefilters of the matcher are only applied on new data.
+    Once they passed, the regex is rerun each time the received
+    data doubled, so that the work spent on a large body stays
+    linear instead of growing with the amount of chunks.
+
+    Attributes
+    ----------
+    matcher : tracer.Matcher
+        The matcher that gets applied
+    received : int
+        The amount of bytes received so far
+
+    Methods
+    -------
+    obj.feed(bytes) -> Optional[bool]
+        Adds a chunk and returns the decision if one can be made,
+        `None` otherwise
+    obj.finish() -> bool
+        Returns the final decision after all data was fed
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = (
+        "__matcher",
+        "__buffer",
+        "__lowered",
+        "__start",
+        "__anchored",
+        "__searched",
+    )
+
+    def __init__(self, matcher: Matcher):
+        self.__matcher = matcher
+        self.__buffer = bytearray()
+        self.__lowered = self.__buffer
+        self.__start = None if matcher.prefix else 0
+        self.__anchored = matcher.anchor is None
+        self.__searched = 0
+
+        if matcher.needs_lowered:
+            self.__lowered = bytearray()
+
+    @property
+    def matcher(self) -> Matcher:
+        return self.__matcher
+
+    @property
+    def received(self) -> int:
+        return len(self.__buffer)
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        """Adds a chunk of data
+
+        Parameters
+        ----------
+        chunk : bytes
+            The next chunk of data
+
+        Returns
+        -------
+        Optional[bool]
+            `True` if the pattern matches, `False` if it is not
+            going to match and `None` if it cannot be decided yet
+        """
+
+        matcher = self.__matcher
+        offset = len(self.__buffer)
+
+        self.__buffer += chunk
+
+        if self.__lowered is not self.__buffer:
+            self.__lowered += chunk.lower()
+
+        if self.__start is None:
+            index = self.__find(matcher.prefix, offset)
+
+            if index != -1:
+                self.__start = index
+
+        if not self.__anchored:
+            self.__anchored = self.__find(matcher.anchor, offset) != -1
+
+        if matcher.terminator and self.__find(matcher.terminator, offset) != -1:
+            return self.finish()
+
+        if len(self.__buffer) >= 2 * self.__searched and self.__search():
+            return True
+
+        return None
+
+    def finish(self) -> bool:
+        """Returns the final decision
+
+        Returns
+        -------
+        bool
+            If the pattern matches the data fed so far
+        """
+
+        return len(self.__buffer) > self.__searched and self.__search()
+
+    def __find(self, literal: bytes, offset: int) -> int:
+        """Looks for the literal in the data added after `offset`"""
+
+        return self.__lowered.find(literal, max(0, offset - len(literal) + 1))
+
+    def __search(self) -> bool:
+        """Runs the regex on the data received so far"""
+
+        if (self.__start is None) or not self.__anchored:
+            return False
+
+        self.__searched = len(self.__buffer)
+
+        return self.__matcher._run(self.__buffer, self.__start)
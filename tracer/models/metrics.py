@@ -0,0 +1,351 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("Counter", "Gauge", "Histogram", "MetricsRegistry")
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+import math
+
+
+# Upper bounds in seconds used by histograms without own buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+
+
+def _escape_help(value: str) -> str:
+    # Quotes are only escaped within label values
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f"{name}=\"{_escape(value)}\"" for name, value in zip(names, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """Base of all metrics
+
+    The values of a metric are kept per combination of label
+    values. Updating a value is a dict lookup and an addition,
+    hence metrics are cheap enough for the hot path.
+    """
+
+    TYPE = "untyped"
+
+    __slots__ = ("__name", "__help", "__labelnames")
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.__name = name
+        self.__help = help
+        self.__labelnames = tuple(labelnames)
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__qualname__}(name={self.name!r})>"
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def help(self) -> str:
+        return self.__help
+
+    @property
+    def labelnames(self) -> Tuple[str, ...]:
+        return self.__labelnames
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.__labelnames):
+            raise ValueError(f"{self.__name} expects the labels {self.__labelnames}")
+
+        return tuple(labels)
+
+    def render(self) -> List[str]:
+        """Returns the lines of the metric in the Prometheus text format"""
+
+        lines = [
+            f"# HELP {self.__name} {_escape_help(self.__help)}",
+            f"# TYPE {self.__name} {self.TYPE}",
+        ]
+        lines.extend(self._samples())
+
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        pass
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. the amount of checks
+
+    Example
+    -------
+        >>> checks = Counter("checks_total", "Checks", ("outcome",))
+        >>> checks.inc("hit")
+        >>> checks.inc("miss", amount=2)
+    """
+
+    TYPE = "counter"
+
+    __slots__ = ("__values",)
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+
+        self.__values: Dict[Tuple[str, ...], float] = dict()
+
+        # Unlabelled metrics are exposed right away
+        if not labelnames:
+            self.__values[()] = 0
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increases the value of the given label values"""
+
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+
+        key = self._key(labels)
+        self.__values[key] = self.__values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self.__values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self.__values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. the queue depth
+
+    Instead of being set, an unlabelled gauge may read its
+    value from a function when the metrics are rendered. This
+    costs nothing on the hot path.
+    """
+
+    TYPE = "gauge"
+
+    __slots__ = ("__values", "__function")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, help, labelnames)
+
+        if function is not None and labelnames:
+            raise ValueError("A gauge with a function can't have labels")
+
+        self.__values: Dict[Tuple[str, ...], float] = dict()
+        self.__function = function
+
+        if not labelnames:
+            self.__values[()] = 0
+
+    def set(self, value: float, *labels: str) -> None:
+        self.__values[self._key(labels)] = value
+
+    def value(self, *labels: str) -> float:
+        if self.__function is not None:
+            return float(self.__function())
+
+        return self.__values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        if self.__function is not None:
+            yield f"{self.name} {_number(self.value())}"
+
+            return None
+
+        for labels, value in self.__values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram(Metric):
+    """Counts observations, e.g. latencies, in buckets
+
+    Every observation increases exactly one bucket, the
+    cumulative counts expected by Prometheus are computed when
+    the metric is rendered.
+    """
+
+    TYPE = "histogram"
+
+    __slots__ = ("__buckets", "__values")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+
+        self.__buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        # label values -> [count per bucket..., count of +Inf, sum]
+        self.__values: Dict[Tuple[str, ...], List[float]] = dict()
+
+        if not labelnames:
+            self.__values[()] = [0] * (len(self.__buckets) + 2)
+
+    @property
+    def buckets(self) -> Tuple[float, ...]:
+        return self.__buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        counts = self.__values.get(key)
+
+        if counts is None:
+            counts = self.__values[key] = [0] * (len(self.__buckets) + 2)
+
+        counts[bisect_left(self.__buckets, value)] += 1
+        counts[-1] += value
+
+    def count(self, *labels: str) -> int:
+        counts = self.__values.get(self._key(labels))
+
+        return int(sum(counts[:-1])) if counts else 0
+
+    def _samples(self) -> Iterable[str]:
+        for labels, counts in self.__values.items():
+            total = 0
+
+            for bound, count in zip(self.__buckets + (math.inf,), counts):
+                total += count
+                le = _labels(self.labelnames, labels, f"le=\"{_number(bound)}\"")
+
+                yield f"{self.name}_bucket{le} {total}"
+
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(counts[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {total}"
+
+
+class MetricsRegistry(object):
+    """Collects metrics and renders them for Prometheus
+
+    The output follows the Prometheus text exposition format
+    (version 0.0.4), which is understood by Prometheus and by
+    OpenMetrics scrapers.
+
+    Methods
+    -------
+    obj.register(Metric) -> Metric
+        Adds a metric and returns it
+    obj.counter(str, str, Sequence[str]) -> tracer.Counter
+        Creates and registers a counter
+    obj.gauge(str, str, Sequence[str], Optional[Callable]) -> tracer.Gauge
+        Creates and registers a gauge
+    obj.histogram(str, str, Sequence[str], Sequence[float]) -> tracer.Histogram
+        Creates and registers a histogram
+    obj.render() -> str
+        Returns all metrics in the text format
+
+    Supported Operations
+    --------------------
+    `len(obj)`
+        Returns the amount of registered metrics
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    __slots__ = ("__metrics",)
+
+    def __init__(self):
+        self.__metrics: Dict[str, Metric] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__metrics)
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds the metric
+
+        Raises
+        ------
+        ValueError
+            A metric with the same name is already registered
+        """
+
+        if metric.name in self.__metrics:
+            raise ValueError(f"{metric.name} is already registered")
+
+        self.__metrics[metric.name] = metric
+
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, function))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = list()
+
+        for metric in self.__metrics.values():
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
@@ -152,7 +152,7 @@ class TracerParser(AbstractTracerParser):
 
         parser = ArgumentParser(
             prog="tracer",
-            usage="%(prog)s [options] username",
+            usage="%(prog)s [options] username [username ...]",
             description=("Check on which website the specified "
                          "username is in use"),
             epilog="A tool created by @chr3st5an",
@@ -162,7 +162,15 @@ class TracerParser(AbstractTracerParser):
             "username",
             metavar="username",
             type=str,
-            help="The username to check"
+            nargs="*",
+            help=("The username to check. If several usernames are given, "
+                  "they are checked in one batch")
+        )
+        parser.add_argument(
+            "-f",
+            "--file",
+            type=str,
+            help="read additional usernames from a file, one per line",
         )
         parser.add_argument(
             "-t",
@@ -170,6 +178,18 @@ class TracerParser(AbstractTracerParser):
             type=int,
             help="set a timeout for each request",
         )
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            help="set how many requests may be in flight at the same time",
+        )
+        parser.add_argument(
+            "--per-host-limit",
+            type=int,
+            help=("set how many requests may be in flight at the same "
+                  "time for a single host"),
+        )
         parser.add_argument(
             "-e",
             "--exclude",
@@ -228,6 +248,32 @@ class TracerParser(AbstractTracerParser):
             action="store_true",
             help="show all results"
         )
+        parser.add_argument(
+            "--no-cache",
+            default=False,
+            action="store_true",
+            help="neither read nor store cached results",
+        )
+        parser.add_argument(
+            "--refresh",
+            default=False,
+            action="store_true",
+            help="ignore cached results but store the new ones",
+        )
+        parser.add_argument(
+            "--jsonl",
+            type=str,
+            metavar="FILE",
+            help=("write every result as a JSON line to FILE while the "
+                  "checks run. Use - for stdout"),
+        )
+        parser.add_argument(
+            "--csv",
+            type=str,
+            metavar="FILE",
+            help=("write every result as a CSV row to FILE while the "
+                  "checks run. Use - for stdout"),
+        )
         parser.add_argument(
             "--ip-check",
             default=False,
@@ -0,0 +1,259 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("CachingResolver",)
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from pathlib import Path
+import asyncio
+import socket
+import json
+import time
+import os
+
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+
+
+class CachingResolver(AbstractResolver):
+    """A resolver that remembers DNS lookups for a while
+
+    Lookups are delegated to aiohttp's default resolver and the
+    results are kept for `ttl` seconds. The cache can be saved to
+    and loaded from a JSON file, so that later runs don't have to
+    resolve the hosts again. Use it as the `resolver` of a
+    connector, e.g. `scheduler.create_connector(resolver=resolver)`.
+
+    Attributes
+    ----------
+    path : Path, optional
+        The file the cache is persisted in
+    ttl : float
+        Seconds a lookup is cached
+    hits : int
+        The amount of lookups answered by the cache
+    misses : int
+        The amount of lookups sent to the DNS resolver
+
+    Methods
+    -------
+    await obj.resolve(str, int, int) -> List[Dict]
+        Resolves a host
+    await obj.prefetch(Iterable[str], Optional[int]) -> int
+        Resolves hosts concurrently and returns how many succeeded
+    await obj.close() -> None
+        Closes the underlying resolver
+    obj.load() -> None
+        Loads the cache from `path`
+    obj.save() -> None
+        Writes the valid entries to `path`
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the resolver
+    `len(obj)`
+        Returns the amount of cached lookups
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_TTL = 3_600.0
+    DEFAULT_CONCURRENCY = 64
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = None,
+        resolver: Optional[AbstractResolver] = None
+    ):
+        """Creates a resolver
+
+        Parameters
+        ----------
+        path : Union[str, Path], optional
+            JSON file used by `load` and `save`. If `None`, the
+            cache isn't persisted, by default None
+        ttl : float, optional
+            Seconds a lookup is cached, by default `DEFAULT_TTL`
+        resolver : aiohttp.abc.AbstractResolver, optional
+            Resolver used on a cache miss, by default aiohttp's
+            default resolver (created on the first lookup)
+        """
+
+        self.__path = Path(path) if path is not None else None
+        self.__ttl = float(self.DEFAULT_TTL if ttl is None else ttl)
+        self.__resolver = resolver
+        # "host family" -> (expires at, addresses)
+        self.__cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = dict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(ttl={self.ttl}, "
+                f"hits={self.hits}, misses={self.misses})>")
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.__path
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    async def resolve(
+        self,
+        host: str,
+        port: int = 0,
+        family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        """Resolves the host
+
+        The port is not part of the cache key, cached addresses
+        are returned with the requested port.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The addresses in the format of aiohttp's resolvers
+        """
+
+        key = f"{host} {int(family)}"
+        entry = self.__cache.get(key)
+
+        if entry is not None and entry[0] > time.time():
+            self.__hits += 1
+
+            return [dict(address, port=port) for address in entry[1]]
+
+        self.__misses += 1
+
+        if self.__resolver is None:
+            self.__resolver = DefaultResolver()
+
+        addresses = [dict(a) for a in await self.__resolver.resolve(host, port, family)]
+        self.__cache[key] = (time.time() + self.__ttl, addresses)
+
+        return [dict(address) for address in addresses]
+
+    async def prefetch(
+        self,
+        hosts: Iterable[str],
+        concurrency: Optional[int] = None,
+        family: int = socket.AF_UNSPEC
+    ) -> int:
+        """Resolves the hosts concurrently
+
+        Failed lookups are ignored, the requests to these hosts
+        will fail later anyway.
+
+        Parameters
+        ----------
+        hosts : Iterable[str]
+            The hosts to resolve
+        concurrency : int, optional
+            How many lookups run at the same time, by default
+            `DEFAULT_CONCURRENCY`
+        family : int, optional
+            The address family, by default `socket.AF_UNSPEC` as
+            used by aiohttp's connector
+
+        Returns
+        -------
+        int
+            The amount of hosts that got resolved
+        """
+
+        semaphore = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+
+        async def lookup(host: str) -> bool:
+            async with semaphore:
+                try:
+                    await self.resolve(host, 0, family)
+                except OSError:
+                    return False
+
+                return True
+
+        results = await asyncio.gather(*[lookup(host) for host in set(hosts)])
+
+        return sum(results)
+
+    async def close(self) -> None:
+        if self.__resolver is not None:
+            await self.__resolver.close()
+
+    def load(self) -> None:
+        """Loads the cache from `path`
+
+        Expired entries and a missing or malformed file are ignored.
+        """
+
+        if self.__path is None or not self.__path.exists():
+            return None
+
+        now = time.time()
+
+        try:
+            with open(self.__path) as file:
+                data = json.load(file)
+
+            for key, (expires, addresses) in data.items():
+                if expires > now:
+                    self.__cache[key] = (float(expires), list(addresses))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self) -> None:
+        """Writes the valid entries to `path`"""
+
+        if self.__path is None:
+            return None
+
+        now = time.time()
+        data = {
+            key: entry for key, entry in self.__cache.items() if entry[0] > now
+        }
+        temp = self.__path.with_name(self.__path.name + ".tmp")
+
+        with open(temp, "w") as file:
+            json.dump(data, file)
+
+        # Replaces the file at once, so readers never see a partial cache
+        os.replace(temp, self.__path)
@@ -24,9 +24,11 @@ SOFTWARE.
 
 __all__ = ("Result",)
 
-from typing import Optional
+from typing import Any, Dict, Optional
 from colorama import Fore
 
+from .timing import PhaseTimings
+
 
 class Result(object):
     """Represents the result of a HTTP request
@@ -43,6 +45,8 @@ class Result(object):
     ----------
     website : tracer.Website
         The website that is associated with the result.
+    username : str, optional
+        The username that got checked.
     status_code : int
         The returned status code of the HTTP request
     successfully : bool
@@ -64,12 +68,31 @@ class Result(object):
     error : Exception, optional
         Any other excpetion that might have occurred while
         performing the request. None if none occurred.
+    bytes_received : int
+        The amount of bytes read from the body of the response.
+    bytes_saved : int
+        The amount of bytes that didn't have to be downloaded
+        thanks to a HEAD or Range request.
+    cached : bool
+        If the result was taken from a `tracer.ResultCache`
+        instead of sending a request.
+    skipped : bool
+        If no request was sent because the circuit breaker of
+        the site is open.
+    attempts : int
+        How many times the request was sent. 0 if no request
+        was sent at all.
+    timings : tracer.PhaseTimings, optional
+        High-resolution timings of the phases of the last
+        attempt. None if no request was sent.
 
     Methods
     -------
     obj.verbose(Optional[bool]) -> str
         Returns a string containing the key information of the
         result.
+    obj.as_dict() -> Dict[str, Any]
+        Returns the result in a JSON serializable form.
 
     Supported Operations
     --------------------
@@ -92,6 +115,12 @@ class Result(object):
         "__url",
         "__timeout",
         "__error",
+        "__bytes_received",
+        "__bytes_saved",
+        "__cached",
+        "__skipped",
+        "__attempts",
+        "__timings",
     )
 
     def __init__(
@@ -103,7 +132,13 @@ class Result(object):
         host: str,
         url: str,
         timeout: bool = False,
-        error: Optional[Exception] = None
+        error: Optional[Exception] = None,
+        bytes_received: int = 0,
+        bytes_saved: int = 0,
+        cached: bool = False,
+        skipped: bool = False,
+        attempts: Optional[int] = None,
+        timings: Optional[PhaseTimings] = None
     ):
         """Represents the result of a request
 
@@ -127,6 +162,22 @@ class Result(object):
             If the request timed out, by default False
         error : Exception, optional
             Any exception that might have occurred, by default None
+        bytes_received : int, optional
+            The amount of bytes read from the body, by default 0
+        bytes_saved : int, optional
+            The amount of bytes that didn't have to be downloaded,
+            by default 0
+        cached : bool, optional
+            If the result was taken from a cache, by default False
+        skipped : bool, optional
+            If the check got skipped by a circuit breaker, by
+            default False
+        attempts : int, optional
+            How many times the request was sent, by default 0 for
+            cached and skipped results and 1 otherwise
+        timings : tracer.PhaseTimings, optional
+            The timings of the phases of the request, by default
+            None
         """
 
         self.__website = website
@@ -137,6 +188,15 @@ class Result(object):
         self.__url = url
         self.__timeout = timeout
         self.__error = error
+        self.__bytes_received = bytes_received
+        self.__bytes_saved = bytes_saved
+        self.__cached = cached
+        self.__skipped = skipped
+        self.__attempts = attempts
+        self.__timings = timings
+
+        if attempts is None:
+            self.__attempts = 0 if (cached or skipped) else 1
 
     def __str__(self) -> str:
         return (f"<{self.__class__.__qualname__}("
@@ -150,6 +210,10 @@ class Result(object):
     def website(self):
         return self.__website
 
+    @property
+    def username(self) -> Optional[str]:
+        return getattr(self.__website, "username", None)
+
     @property
     def status_code(self) -> int:
         return self.__status_code
@@ -190,6 +254,30 @@ class Result(object):
     def error(self) -> Optional[Exception]:
         return self.__error
 
+    @property
+    def bytes_received(self) -> int:
+        return self.__bytes_received
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.__bytes_saved
+
+    @property
+    def cached(self) -> bool:
+        return self.__cached
+
+    @property
+    def skipped(self) -> bool:
+        return self.__skipped
+
+    @property
+    def attempts(self) -> int:
+        return self.__attempts
+
+    @property
+    def timings(self) -> Optional[PhaseTimings]:
+        return self.__timings
+
     def verbose(self, colored: bool = True) -> str:
         """Creates a verbose string
 
@@ -210,4 +298,44 @@ class Result(object):
 
         message = f"{self.ms}s <=> {self.host} <=> {self.status_code}"
 
+        if self.cached:
+            message += " <=> cached"
+
+        if self.skipped:
+            message += " <=> skipped: breaker open"
+
+        if self.attempts > 1:
+            message += f" <=> {self.attempts} attempts"
+
+        if self.timings is not None:
+            message += f" <=> {self.timings}"
+
         return f"{Fore.CYAN}{message}{Fore.RESET}" if colored else message
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the result in a JSON serializable form
+
+        Delays and timings are given in seconds.
+        """
+
+        category = getattr(self.__website, "category", None)
+
+        return {
+            "site": getattr(self.__website, "name", None),
+            "category": category.as_str if category is not None else None,
+            "username": self.username,
+            "url": self.url,
+            "host": self.host,
+            "status_code": self.status_code,
+            "user_exists": self.user_exists,
+            "delay": self.delay,
+            "timeout": self.timeout,
+            "error": type(self.error).__name__ if self.error else None,
+            "error_message": str(self.error) if self.error else None,
+            "bytes_received": self.bytes_received,
+            "bytes_saved": self.bytes_saved,
+            "cached": self.cached,
+            "skipped": self.skipped,
+            "attempts": self.attempts,
+            "timings": self.timings.as_dict() if self.timings is not None else None,
+        }
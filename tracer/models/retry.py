@@ -0,0 +1,357 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("RetryBudget", "RetryPolicy")
+
+from typing import Dict, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from abc import ABC, abstractmethod
+import random
+
+from aiohttp import (
+    ClientConnectorCertificateError,
+    ClientConnectorError,
+    ClientOSError,
+    ClientSSLError,
+    ClientPayloadError,
+    ServerDisconnectedError,
+)
+
+
+class AbstractRetryPolicy(ABC):
+    @abstractmethod
+    def classify_exception(self, exception):
+        pass
+
+    @abstractmethod
+    def classify_response(self, status):
+        pass
+
+    @abstractmethod
+    def should_retry(self, kind, attempt):
+        pass
+
+    @abstractmethod
+    def delay(self, kind, attempt, retry_after):
+        pass
+
+
+class RetryBudget(object):
+    """Limits the amount of retries of a run
+
+    At most `minimum` retries plus `ratio` retries per sent
+    request are allowed. During an outage most requests fail,
+    hence the budget runs out quickly and retries can't
+    multiply the load.
+
+    Attributes
+    ----------
+    ratio : float
+        Retries allowed per sent request
+    minimum : int
+        Retries that are always allowed
+    requests : int
+        The amount of requests sent
+    retries : int
+        The amount of retries granted
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_RATIO = 0.1
+    DEFAULT_MINIMUM = 10
+
+    __slots__ = ("__ratio", "__minimum", "__requests", "__retries")
+
+    def __init__(self, ratio: Optional[float] = None, minimum: Optional[int] = None):
+        """Creates a budget
+
+        Parameters
+        ----------
+        ratio : float, optional
+            Retries allowed per sent request, by default
+            `DEFAULT_RATIO`
+        minimum : int, optional
+            Retries that are always allowed, by default
+            `DEFAULT_MINIMUM`
+        """
+
+        self.__ratio = float(self.DEFAULT_RATIO if ratio is None else ratio)
+        self.__minimum = int(self.DEFAULT_MINIMUM if minimum is None else minimum)
+        self.__requests = 0
+        self.__retries = 0
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(retries={self.retries}, "
+                f"remaining={self.remaining})>")
+
+    @property
+    def ratio(self) -> float:
+        return self.__ratio
+
+    @property
+    def minimum(self) -> int:
+        return self.__minimum
+
+    @property
+    def requests(self) -> int:
+        return self.__requests
+
+    @property
+    def retries(self) -> int:
+        return self.__retries
+
+    @property
+    def remaining(self) -> int:
+        """The amount of retries that may still be granted"""
+
+        allowed = self.__minimum + int(self.__ratio * self.__requests)
+
+        return max(0, allowed - self.__retries)
+
+    def record_request(self) -> None:
+        """Counts a sent request"""
+
+        self.__requests += 1
+
+    def withdraw(self) -> bool:
+        """Takes one retry from the budget
+
+        Returns
+        -------
+        bool
+            `False` if the budget is exhausted
+        """
+
+        if self.remaining < 1:
+            return False
+
+        self.__retries += 1
+
+        return True
+
+
+class RetryPolicy(AbstractRetryPolicy):
+    """Decides if and when a failed request is repeated
+
+    Failures are classified as
+
+    - `CONNECT`: DNS lookup or connection failed
+    - `RESET`: the connection broke while the response was read
+    - `THROTTLED`: the server answered with 429 or 503
+
+    Every class has its own exponential backoff. The delay is
+    drawn uniformly between zero and the backoff ("full jitter"),
+    so that retries of many checks don't happen at once. A
+    `Retry-After` header of a throttled response is honored.
+    Timeouts are never retried, as the timeout already is the
+    upper bound of the time a check may take.
+
+    Attributes
+    ----------
+    max_attempts : int
+        How many times a request is sent at most
+    budget : tracer.RetryBudget
+        The budget shared by all checks using the policy
+    max_retry_after : float
+        Upper bound for a delay requested by `Retry-After`
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    CONNECT = "connect"
+    RESET = "reset"
+    THROTTLED = "throttled"
+
+    # (base, cap) of the backoff in seconds per class of failure
+    DEFAULT_BACKOFF: Dict[str, Tuple[float, float]] = {
+        CONNECT: (0.5, 4.0),
+        RESET: (0.25, 2.0),
+        THROTTLED: (1.0, 10.0),
+    }
+    DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_MAX_RETRY_AFTER = 30.0
+
+    THROTTLE_CODES = (429, 503)
+
+    __slots__ = ("__max_attempts", "__budget", "__backoff", "__max_retry_after")
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        budget: Optional[RetryBudget] = None,
+        backoff: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_retry_after: Optional[float] = None
+    ):
+        """Creates a policy
+
+        Parameters
+        ----------
+        max_attempts : int, optional
+            How many times a request is sent at most, by default
+            `DEFAULT_MAX_ATTEMPTS`
+        budget : tracer.RetryBudget, optional
+            Limits the retries of all checks using the policy. If
+            `None`, a budget with the default limits is created
+        backoff : Dict[str, Tuple[float, float]], optional
+            Overrides the (base, cap) backoff of the given classes
+        max_retry_after : float, optional
+            Upper bound for a delay requested by `Retry-After`,
+            by default `DEFAULT_MAX_RETRY_AFTER`
+
+        Raises
+        ------
+        ValueError
+            Raised if `max_attempts` is smaller than 1
+        """
+
+        max_attempts = int(max_attempts or self.DEFAULT_MAX_ATTEMPTS)
+
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.__max_attempts = max_attempts
+        self.__budget = budget if budget is not None else RetryBudget()
+        self.__backoff = {**self.DEFAULT_BACKOFF, **(backoff or {})}
+        self.__max_retry_after = float(max_retry_after or self.DEFAULT_MAX_RETRY_AFTER)
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(max_attempts={self.max_attempts}, "
+                f"budget={self.budget})>")
+
+    @property
+    def max_attempts(self) -> int:
+        return self.__max_attempts
+
+    @property
+    def budget(self) -> RetryBudget:
+        return self.__budget
+
+    @property
+    def max_retry_after(self) -> float:
+        return self.__max_retry_after
+
+    def classify_exception(self, exception: BaseException) -> Optional[str]:
+        """Returns the class of a failed request, `None` if not retryable"""
+
+        # Invalid certificates and failed TLS handshakes fail again
+        if isinstance(exception, (ClientConnectorCertificateError, ClientSSLError)):
+            return None
+
+        # Includes failed DNS lookups (ClientConnectorDNSError in newer aiohttp)
+        if isinstance(exception, ClientConnectorError):
+            return self.CONNECT
+
+        if isinstance(exception, (ServerDisconnectedError, ClientPayloadError)):
+            return self.RESET
+
+        if isinstance(exception, (ClientOSError, ConnectionResetError)):
+            return self.RESET
+
+        return None
+
+    def classify_response(self, status: int) -> Optional[str]:
+        """Returns the class of a response, `None` if not retryable"""
+
+        return self.THROTTLED if status in self.THROTTLE_CODES else None
+
+    def should_retry(self, kind: Optional[str], attempt: int) -> bool:
+        """Checks if a request should be sent again
+
+        Parameters
+        ----------
+        kind : str, optional
+            The class of the failure
+        attempt : int
+            How many times the request got sent so far
+
+        Returns
+        -------
+        bool
+            `True` if the request should be repeated. A retry is
+            taken from the budget in this case
+        """
+
+        if kind is None or attempt >= self.__max_attempts:
+            return False
+
+        return self.__budget.withdraw()
+
+    def delay(self, kind: str, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Returns how many seconds to wait before the next attempt
+
+        Parameters
+        ----------
+        kind : str
+            The class of the failure
+        attempt : int
+            How many times the request got sent so far
+        retry_after : str, optional
+            Value of the `Retry-After` header, either seconds or
+            a HTTP date, by default None
+
+        Returns
+        -------
+        float
+            The delay in seconds
+        """
+
+        base, cap = self.__backoff[kind]
+        delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+        requested = self.parse_retry_after(retry_after)
+
+        if requested is not None:
+            delay = max(delay, min(requested, self.__max_retry_after))
+
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Converts a `Retry-After` header into seconds, `None` if invalid"""
+
+        if not value:
+            return None
+
+        value = value.strip()
+
+        if value.isdigit():
+            return float(value)
+
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,218 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("RequestScheduler",)
+
+from typing import Any, AsyncGenerator, Dict, Optional
+from contextlib import asynccontextmanager
+from abc import ABC, abstractmethod
+import asyncio
+
+from aiohttp import TCPConnector
+
+
+class AbstractRequestScheduler(ABC):
+    @abstractmethod
+    def create_connector(self, **kwargs):
+        pass
+
+    @abstractmethod
+    def slot(self, host):
+        pass
+
+
+class RequestScheduler(AbstractRequestScheduler):
+    """Limits how many requests are in flight at the same time
+
+    A scheduler bounds the amount of concurrent requests globally
+    and per host. The same limits are applied to the connector
+    created by `obj.create_connector`, so that the connection pool
+    of the session matches the scheduling.
+
+    Attributes
+    ----------
+    concurrency : int
+        The maximum amount of requests that are in flight at
+        the same time
+    per_host_limit : int
+        The maximum amount of requests that are in flight at
+        the same time for a single host
+    keepalive_timeout : float
+        How many seconds an idle connection is kept open
+    in_flight : int
+        The amount of requests that are currently in flight
+
+    Methods
+    -------
+    obj.create_connector(**Any) -> aiohttp.TCPConnector
+        Creates a connector whose limits match the ones of
+        the scheduler
+    obj.slot(str) -> AsyncContextManager
+        Waits until a request to the given host may be sent
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the scheduler
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    DEFAULT_CONCURRENCY = 32
+    DEFAULT_PER_HOST_LIMIT = 4
+    DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None
+    ):
+        """Creates a scheduler
+
+        Parameters
+        ----------
+        concurrency : int, optional
+            The maximum amount of requests that are in flight at
+            the same time, by default `DEFAULT_CONCURRENCY`
+        per_host_limit : int, optional
+            The maximum amount of requests that are in flight at
+            the same time for a single host, by default
+            `DEFAULT_PER_HOST_LIMIT`
+        keepalive_timeout : float, optional
+            How many seconds an idle connection is kept open,
+            by default `DEFAULT_KEEPALIVE_TIMEOUT`
+
+        Raises
+        ------
+        ValueError
+            A limit is smaller than 1
+        """
+
+        if concurrency is None:
+            concurrency = self.DEFAULT_CONCURRENCY
+
+        if per_host_limit is None:
+            per_host_limit = self.DEFAULT_PER_HOST_LIMIT
+
+        concurrency = int(concurrency)
+        per_host_limit = int(per_host_limit)
+
+        if concurrency < 1 or per_host_limit < 1:
+            raise ValueError("Limits must be greater than 0")
+
+        if keepalive_timeout is None:
+            keepalive_timeout = self.DEFAULT_KEEPALIVE_TIMEOUT
+
+        self.__concurrency = concurrency
+        self.__per_host_limit = min(per_host_limit, concurrency)
+        self.__keepalive_timeout = float(keepalive_timeout)
+        self.__in_flight = 0
+
+        # Semaphores are created lazily as they have to be
+        # created inside of a running event loop
+        self.__global: Optional[asyncio.Semaphore] = None
+        self.__hosts: Dict[str, asyncio.Semaphore] = dict()
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(concurrency={self.concurrency}, "
+                f"per_host_limit={self.per_host_limit}, "
+                f"keepalive_timeout={self.keepalive_timeout})>")
+
+    @property
+    def concurrency(self) -> int:
+        return self.__concurrency
+
+    @property
+    def per_host_limit(self) -> int:
+        return self.__per_host_limit
+
+    @property
+    def keepalive_timeout(self) -> float:
+        return self.__keepalive_timeout
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    def create_connector(self, **kwargs: Any) -> TCPConnector:
+        """Creates a connector matching the limits of the scheduler
+
+        Parameters
+        ----------
+        **kwargs : Any
+            Additional keyword arguments that are passed to
+            `aiohttp.TCPConnector`
+
+        Returns
+        -------
+        aiohttp.TCPConnector
+            The connector which should be used by the session
+            that sends the scheduled requests
+        """
+
+        kwargs.setdefault("limit", self.concurrency)
+        kwargs.setdefault("limit_per_host", self.per_host_limit)
+        kwargs.setdefault("keepalive_timeout", self.keepalive_timeout)
+        kwargs.setdefault("ttl_dns_cache", 300)
+
+        return TCPConnector(**kwargs)
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncGenerator[None, None]:
+        """Waits until a request to the given host may be sent
+
+        The slot for the host is taken before the global one,
+        hence a request waiting for a busy host doesn't occupy
+        a global slot.
+
+        Parameters
+        ----------
+        host : str
+            The host to which the request is going to be sent
+
+        Example
+        -------
+            >>> async with scheduler.slot("example.com"):
+            ...     await website.send_request(session)
+        """
+
+        if self.__global is None:
+            self.__global = asyncio.Semaphore(self.concurrency)
+
+        if host not in self.__hosts:
+            self.__hosts[host] = asyncio.Semaphore(self.per_host_limit)
+
+        async with self.__hosts[host]:
+            async with self.__global:
+                self.__in_flight += 1
+
+                try:
+                    yield None
+                finally:
+                    self.__in_flight -= 1
@@ -0,0 +1,331 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("ResultSink", "JsonlSink", "CsvSink")
+
+from typing import Any, Dict, List, Optional, TextIO, Union
+from abc import ABC, abstractmethod
+from pathlib import Path
+import asyncio
+import json
+import csv
+import sys
+import io
+
+from .timing import PhaseTimings
+from .result import Result
+
+
+class AbstractResultSink(ABC):
+    @abstractmethod
+    async def open(self):
+        pass
+
+    @abstractmethod
+    async def write(self, result):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+
+class ResultSink(AbstractResultSink):
+    """Writes results to a file while the checks are running
+
+    Records are buffered and written without blocking the event
+    loop once `flush_size` records are buffered and, while the
+    sink is open, every `flush_interval` seconds. An interrupted
+    run therefore keeps all results except the latest ones.
+    Subclasses define the format of the records.
+
+    Use the sink as an async context manager:
+
+        >>> async with JsonlSink("results.jsonl") as sink:
+        ...     async for result in pool.start_requests(session):
+        ...         await sink.write(result)
+
+    Attributes
+    ----------
+    path : str
+        The file the results are written to. `-` stands for
+        stdout
+    flush_size : int
+        How many records are buffered at most
+    flush_interval : float
+        How many seconds a record is buffered at most
+    written : int
+        The amount of records written so far
+
+    Methods
+    -------
+    await obj.open() -> None
+        Opens the file, writes the header if the file is new
+    await obj.write(tracer.Result) -> None
+        Adds a result to the buffer
+    await obj.flush() -> None
+        Writes the buffered records
+    await obj.close() -> None
+        Flushes and closes the file
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    STDOUT = "-"
+
+    DEFAULT_FLUSH_SIZE = 64
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    __slots__ = (
+        "__path",
+        "__flush_size",
+        "__flush_interval",
+        "__stream",
+        "__file",
+        "__buffer",
+        "__lock",
+        "__flusher",
+        "__written",
+    )
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        stream: Optional[TextIO] = None
+    ):
+        """Creates a sink
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The file to write to. It is appended to if it already
+            exists. `-` writes to stdout
+        flush_size : int, optional
+            How many records are buffered at most, by default
+            `DEFAULT_FLUSH_SIZE`
+        flush_interval : float, optional
+            How many seconds a record is buffered at most, by
+            default `DEFAULT_FLUSH_INTERVAL`
+        stream : TextIO, optional
+            The stream used for `-`, by default the current
+            `sys.stdout`
+        """
+
+        self.__path = str(path)
+        self.__flush_size = int(flush_size or self.DEFAULT_FLUSH_SIZE)
+        self.__flush_interval = float(
+            self.DEFAULT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        # Captured now, so that later redirections of sys.stdout
+        # don't end up in the output of the sink
+        self.__stream = stream if stream is not None else sys.stdout
+        self.__file: Any = None
+        self.__buffer: List[str] = list()
+        self.__lock: Optional[asyncio.Lock] = None
+        self.__flusher: Optional[asyncio.Task] = None
+        self.__written = 0
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__qualname__}(path={self.path!r}, written={self.written})>"
+
+    async def __aenter__(self) -> ResultSink:
+        await self.open()
+
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def flush_size(self) -> int:
+        return self.__flush_size
+
+    @property
+    def flush_interval(self) -> float:
+        return self.__flush_interval
+
+    @property
+    def written(self) -> int:
+        return self.__written
+
+    @staticmethod
+    def record(result: Result) -> Dict[str, Any]:
+        """Returns the fields of a result that are written"""
+
+        return result.as_dict()
+
+    def header(self) -> Optional[str]:
+        """Returns the text written at the start of a new file"""
+
+        return None
+
+    @abstractmethod
+    def format(self, result: Result) -> str:
+        """Returns the result as one line of the file"""
+
+    async def open(self) -> None:
+        if self.__file is not None:
+            return None
+
+        # Only needed if results are written at all
+        import aiofiles
+        import aiofiles.threadpool
+
+        if self.__path == self.STDOUT:
+            self.__file = aiofiles.threadpool.wrap(self.__stream)
+            new = True
+        else:
+            new = not Path(self.__path).exists() or Path(self.__path).stat().st_size == 0
+            self.__file = await aiofiles.open(self.__path, "a", encoding="utf-8", newline="")
+
+        header = self.header()
+
+        if new and header:
+            self.__buffer.append(header)
+
+        # Created here, as the lock belongs to the running loop
+        self.__lock = asyncio.Lock()
+
+        if self.__flush_interval > 0:
+            self.__flusher = asyncio.ensure_future(self.__flush_periodically())
+
+    async def write(self, result: Result) -> None:
+        """Adds the result to the buffer, flushes if needed"""
+
+        if self.__file is None:
+            await self.open()
+
+        self.__buffer.append(self.format(result))
+        self.__written += 1
+
+        if len(self.__buffer) >= self.__flush_size or self.__flush_interval <= 0:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.__buffer or self.__file is None:
+            return None
+
+        data = "".join(self.__buffer)
+        self.__buffer.clear()
+
+        # Keeps the order if the timer and a full buffer flush at once
+        async with self.__lock:
+            await self.__file.write(data)
+            await self.__file.flush()
+
+    async def __flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        if self.__file is None:
+            return None
+
+        if self.__flusher is not None:
+            self.__flusher.cancel()
+
+            try:
+                await self.__flusher
+            except asyncio.CancelledError:
+                pass
+
+            self.__flusher = None
+
+        await self.flush()
+
+        # stdout stays open for the rest of the program
+        if self.__path != self.STDOUT:
+            await self.__file.close()
+
+        self.__file = None
+
+
+class JsonlSink(ResultSink):
+    """Writes every result as a JSON object on its own line
+
+    The fields are the ones of `tracer.Result.as_dict`.
+    """
+
+    __slots__ = ()
+
+    def format(self, result: Result) -> str:
+        return json.dumps(self.record(result), separators=(",", ":")) + "\n"
+
+
+class CsvSink(ResultSink):
+    """Writes every result as a row of a CSV file
+
+    The fields are the ones of `tracer.Result.as_dict`, the
+    timings are split into one column per phase.
+    """
+
+    COLUMNS = (
+        "site",
+        "category",
+        "username",
+        "url",
+        "host",
+        "status_code",
+        "user_exists",
+        "delay",
+        "timeout",
+        "error",
+        "error_message",
+        "bytes_received",
+        "bytes_saved",
+        "cached",
+        "skipped",
+        "attempts",
+    ) + PhaseTimings.PHASES
+
+    __slots__ = ()
+
+    @staticmethod
+    def __row(values: List[Any]) -> str:
+        line = io.StringIO()
+        csv.writer(line).writerow(values)
+
+        return line.getvalue()
+
+    def header(self) -> Optional[str]:
+        return self.__row(list(self.COLUMNS))
+
+    def format(self, result: Result) -> str:
+        record = self.record(result)
+        record.update(record.pop("timings") or {})
+
+        return self.__row([
+            "" if record.get(column) is None else record[column] for column in self.COLUMNS
+        ])
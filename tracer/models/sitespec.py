@@ -0,0 +1,482 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("SiteSpec",)
+
+from typing import Any, Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+from urllib.parse import quote
+from hashlib import sha1
+
+from .category import Category
+from .matcher import Matcher
+
+
+# Strategies for requesting a page. `head` and `range` can only be
+# used by websites which don't need the body of the response
+REQUEST_METHODS = ("get", "head", "range")
+
+
+class AbstractSiteSpec(ABC):
+    __slots__ = ()
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data):
+        pass
+
+    @abstractmethod
+    def url(self, username):
+        pass
+
+    @abstractmethod
+    def true_url(self, username):
+        pass
+
+
+class SiteSpec(AbstractSiteSpec):
+    """The static detection rules of a website
+
+    A spec holds everything about a website that doesn't change
+    between checks. Specs are read-only and hence can be shared by
+    any amount of checks, searches and pools at the same time. The
+    state of a single check (username and result) lives in a
+    `tracer.Website` created by `tracer.Website.from_spec`.
+
+    Attributes
+    ----------
+    name : str
+        The name of the website, e.g. 'example'
+    domain : str
+        The domain name of the website, e.g. 'example.com'
+    url_template : str
+        The url that represents an users page on this website,
+        e.g. 'https:\/\/example.com/user/{}'
+    true_url_template : str
+        The url that gets used to make the HTTP request to this
+        website
+    category : tracer.Category
+        The category to which the website belongs to
+    err_ignore_code : bool
+        Indicates if the returned status code of the request
+        should be ignored
+    text_matcher : tracer.Matcher, optional
+        Compiled regex pattern that gets applied on the returned
+        body. If it matches, the username is considered as
+        'Not Found'
+    url_matcher : tracer.Matcher, optional
+        Compiled regex pattern that gets applied on the returned
+        url. If it matches, the username is considered as
+        'Not Found'
+    err_on_dot : bool
+        Indicates if the website responses with an error
+        if the username contains a dot
+    max_body_bytes : int, optional
+        The maximum amount of bytes that are read from the
+        body of a response. `None` if unlimited
+    request_method : str
+        How the page is requested. Either `get`, `head` or
+        `range` (GET with `Range: bytes=0-0`)
+    rule_version : str
+        Digest of the rules, used to invalidate cached results
+
+    Methods
+    -------
+    obj.url(str) -> str
+        Returns the url of the users page
+    obj.true_url(str) -> str
+        Returns the url used for the request
+    obj.as_record() -> tuple
+        Returns the spec as a tuple of builtin values
+
+    Classmethods
+    ------------
+    cls.from_dict(dict) -> tracer.SiteSpec
+        Creates a spec by using the values of the dict
+    cls.from_record(tuple) -> tracer.SiteSpec
+        Restores a spec returned by `obj.as_record`
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the spec
+    `x == obj`
+        Compares the rules of both specs
+    `hash(obj)`
+        Returns the hash of the rules
+    `copy.copy(obj)`, `copy.deepcopy(obj)`
+        Return the spec itself as it is read-only
+
+    Note
+    ----
+    The URL(s) passed to an object of this class should
+    be structured as following `https://www.example.com/path/{}`,
+    where `{}` represents the field into which the username
+    is placed. The username gets percent-encoded.
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = (
+        "__domain",
+        "__name",
+        "__url",
+        "__true_url",
+        "__category",
+        "__err_ignore_code",
+        "__text_matcher",
+        "__url_matcher",
+        "__err_on_dot",
+        "__max_body_bytes",
+        "__request_method",
+        "__rule_version",
+    )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> SiteSpec:
+        """Creates a spec by using the given data
+
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            A dict whose values are used to create the
+            spec. The dict must include the following
+            keys: `domain`, `url` & `category`
+
+        Returns
+        -------
+        tracer.SiteSpec
+            The spec that got created
+        """
+
+        return cls(
+            domain=data["domain"],
+            true_url=data["url"],
+            category=data["category"],
+            display_url=data.get("display_url"),
+            err_ignore_code=data.get("err_ignore_code", False),
+            err_text_pattern=data.get("err_text_pattern"),
+            err_url_pattern=data.get("err_url_pattern"),
+            err_on_dot=data.get("err_on_dot", False),
+            max_body_bytes=data.get("max_body_bytes"),
+            request_method=data.get("request_method", "get")
+        )
+
+    @classmethod
+    def from_record(cls, record: Tuple[Any, ...]) -> SiteSpec:
+        """Restores a spec from a record
+
+        Nothing gets validated, as the record stems from a spec that
+        got created successfully. The regex patterns are compiled
+        right away, so that the first checks don't have to.
+
+        Parameters
+        ----------
+        record : Tuple[Any, ...]
+            A record returned by `obj.as_record`
+
+        Returns
+        -------
+        tracer.SiteSpec
+            The restored spec
+        """
+
+        spec = cls.__new__(cls)
+
+        (
+            spec.__domain,
+            spec.__true_url,
+            spec.__url,
+            category,
+            spec.__err_ignore_code,
+            text_state,
+            url_state,
+            spec.__err_on_dot,
+            spec.__max_body_bytes,
+            spec.__request_method,
+            spec.__rule_version,
+        ) = record
+
+        spec.__name = spec.__domain.split('.')[0]
+        spec.__category = Category(spec, category)
+        spec.__text_matcher = Matcher.from_state(text_state) if text_state else None
+        spec.__url_matcher = Matcher.from_state(url_state) if url_state else None
+
+        return spec
+
+    def __init__(
+        self,
+        domain: str,
+        true_url: str,
+        category: int,
+        display_url: Optional[str] = None,
+        err_ignore_code: bool = False,
+        err_text_pattern: Optional[str] = None,
+        err_url_pattern: Optional[str] = None,
+        err_on_dot: bool = False,
+        max_body_bytes: Optional[int] = None,
+        request_method: str = "get"
+    ):
+        """Creates a spec
+
+        Parameters
+        ----------
+        domain : str
+            The domain name of the website, e.g. 'example.com'
+        true_url : str
+            The url that gets used to make the HTTP request to this
+            website
+        category : int
+            The category to which the website belongs to
+        display_url : str, optional
+            The url that represents an users page on this website,
+            e.g. 'https:\/\/example.com/user/'. If None, then
+            `true_url` is used, by default None
+        err_ignore_code : bool
+            Indicates if the returned status code of the request
+            should be ignored, by default False
+        err_text_pattern : str
+            Regex pattern that gets applied on the returned text.
+            If it matches, the username is considered as
+            'Not Found', by default None
+        err_url_pattern : str
+            Regex pattern that gets applied on the returned url.
+            If it matches, the username is considered as
+            'Not Found', by default None
+        err_on_dot : bool
+            Indicates if the website responses with an error
+            if the username contains a dot. If `True`, no
+            actual request is send to the website, by default
+            False
+        max_body_bytes : int, optional
+            The maximum amount of bytes that are read from the
+            body of a response. If `None`, the body is read until
+            `err_text_pattern` can be decided, by default None
+        request_method : str, optional
+            How the page is requested. `head` sends a HEAD request
+            and `range` a GET request that asks only for the first
+            byte of the body. Both fall back to a plain GET request
+            if the server rejects them. They can't be used together
+            with `err_text_pattern`, by default `get`
+
+        Raises
+        ------
+        ValueError
+            Invalid request method
+        """
+
+        request_method = request_method.lower()
+
+        if request_method not in REQUEST_METHODS:
+            raise ValueError(f"Unknown request method {request_method!r}")
+
+        if request_method != "get" and err_text_pattern:
+            raise ValueError(
+                f"{domain}: err_text_pattern requires the request method 'get'"
+            )
+
+        self.__domain = domain
+        self.__name = domain.split('.')[0]
+        self.__url = self.__split(display_url or true_url)
+        self.__true_url = self.__split(true_url)
+        self.__category = Category(self, category)
+        self.__err_ignore_code = bool(err_ignore_code)
+        self.__err_on_dot = bool(err_on_dot)
+        self.__max_body_bytes = max_body_bytes
+        self.__request_method = request_method
+        self.__text_matcher = None
+        self.__url_matcher = None
+
+        if err_text_pattern:
+            self.__text_matcher = Matcher(err_text_pattern, Matcher.TEXT_FLAGS)
+
+        if err_url_pattern:
+            self.__url_matcher = Matcher(err_url_pattern, Matcher.URL_FLAGS)
+
+        self.__rule_version = sha1(repr(self.rules).encode()).hexdigest()[:16]
+
+    def __str__(self) -> str:
+        return (f"<{self.__class__.__qualname__}(name={self.name!r}, "
+                f"domain={self.domain!r}, url={self.url_template!r}, "
+                f"category={self.category})>")
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, self.__class__) and self.rules == other.rules
+
+    def __hash__(self) -> int:
+        return hash(self.rules)
+
+    def __copy__(self) -> SiteSpec:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> SiteSpec:
+        return self
+
+    @staticmethod
+    def __split(template: str) -> Tuple[str, ...]:
+        """Splits an url template at the username field(s)"""
+
+        return tuple(part.replace("{{", "{").replace("}}", "}") for part in template.split("{}"))
+
+    @property
+    def name(self) -> str:
+        """Return the host name
+
+        `example.com` => `example`
+        """
+
+        return self.__name
+
+    @property
+    def domain(self) -> str:
+        return self.__domain
+
+    @property
+    def url_template(self) -> str:
+        return "{}".join(self.__url)
+
+    @property
+    def true_url_template(self) -> str:
+        return "{}".join(self.__true_url)
+
+    @property
+    def category(self) -> Category:
+        return self.__category
+
+    @property
+    def err_ignore_code(self) -> bool:
+        return self.__err_ignore_code
+
+    @property
+    def err_text_pattern(self) -> Optional[str]:
+        return self.__text_matcher.pattern if self.__text_matcher else None
+
+    @property
+    def err_url_pattern(self) -> Optional[str]:
+        return self.__url_matcher.pattern if self.__url_matcher else None
+
+    @property
+    def text_matcher(self) -> Optional[Matcher]:
+        return self.__text_matcher
+
+    @property
+    def url_matcher(self) -> Optional[Matcher]:
+        return self.__url_matcher
+
+    @property
+    def err_on_dot(self) -> bool:
+        return self.__err_on_dot
+
+    @property
+    def max_body_bytes(self) -> Optional[int]:
+        return self.__max_body_bytes
+
+    @property
+    def request_method(self) -> str:
+        return self.__request_method
+
+    @property
+    def rules(self) -> Tuple[Any, ...]:
+        """All values that influence the outcome of a check"""
+
+        return (
+            self.__domain,
+            self.__true_url,
+            self.__url,
+            int(self.__category),
+            self.__err_ignore_code,
+            self.err_text_pattern,
+            self.err_url_pattern,
+            self.__err_on_dot,
+            self.__max_body_bytes,
+            self.__request_method,
+        )
+
+    @property
+    def rule_version(self) -> str:
+        """Short digest of the rules, changes whenever a rule changes"""
+
+        return self.__rule_version
+
+    def as_record(self) -> Tuple[Any, ...]:
+        """Returns the spec as a tuple of builtin values
+
+        The record can be serialized with `marshal` and restored
+        by `tracer.SiteSpec.from_record`.
+
+        Returns
+        -------
+        Tuple[Any, ...]
+            The record of the spec
+        """
+
+        return (
+            self.__domain,
+            self.__true_url,
+            self.__url,
+            int(self.__category),
+            self.__err_ignore_code,
+            self.__text_matcher.state if self.__text_matcher else None,
+            self.__url_matcher.state if self.__url_matcher else None,
+            self.__err_on_dot,
+            self.__max_body_bytes,
+            self.__request_method,
+            self.__rule_version,
+        )
+
+    def url(self, username: str) -> str:
+        """Returns the url of the users page
+
+        Parameters
+        ----------
+        username : str
+            The username to insert into the url
+
+        Returns
+        -------
+        str
+            The url with the percent-encoded username
+        """
+
+        return quote(username, safe="").join(self.__url)
+
+    def true_url(self, username: str) -> str:
+        """Returns the url used for the request
+
+        Parameters
+        ----------
+        username : str
+            The username to insert into the url
+
+        Returns
+        -------
+        str
+            The url with the percent-encoded username
+        """
+
+        return quote(username, safe="").join(self.__true_url)
@@ -0,0 +1,417 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+__all__ = ("PoolSchemaError", "PoolSnapshot")
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from pathlib import Path
+import tempfile
+import marshal
+import struct
+import json
+import mmap
+import os
+import re
+
+from .category import Category
+from .sitespec import SiteSpec
+from . import sitespec, matcher
+
+
+# Length of the marshaled header, follows the magic number
+HEADER_LENGTH = struct.Struct("<I")
+
+# Keys an entry of the pool may have and the types of their values
+SCHEMA = {
+    "domain": str,
+    "url": str,
+    "category": int,
+    "display_url": str,
+    "err_ignore_code": bool,
+    "err_text_pattern": str,
+    "err_url_pattern": str,
+    "err_on_dot": bool,
+    "max_body_bytes": int,
+    "request_method": str,
+}
+REQUIRED_KEYS = ("domain", "url", "category")
+
+# Digest of the code that writes and restores the records
+_fingerprint: Optional[str] = None
+
+
+def _code_fingerprint() -> str:
+    global _fingerprint
+
+    if _fingerprint is None:
+        digest = sha256()
+
+        for path in (sitespec.__file__, matcher.__file__, __file__):
+            with open(path, "rb") as file:
+                digest.update(file.read())
+
+        _fingerprint = digest.hexdigest()
+
+    return _fingerprint
+
+
+class PoolSchemaError(ValueError):
+    """Raised if the pool doesn't follow the schema"""
+
+
+class AbstractPoolSnapshot(ABC):
+    @abstractmethod
+    def load(self):
+        pass
+
+    @abstractmethod
+    def compile(self):
+        pass
+
+
+class PoolSnapshot(AbstractPoolSnapshot):
+    """A compiled binary snapshot of the site pool
+
+    Compiling the pool validates every entry against the schema,
+    creates the specs (which compiles and analyses their regex
+    patterns) and writes the specs as `marshal`ed records next to
+    the JSON file. Loading the snapshot memory-maps the file and
+    restores the specs without parsing JSON, validating or analysing
+    anything. The regex patterns are compiled while loading, hence
+    before any check runs.
+
+    The snapshot stores the modification time, size and SHA-256
+    digest of the JSON file it got compiled from. It is used as
+    long as the modification time and size are unchanged. If they
+    changed, the digest decides, hence touching the file doesn't
+    invalidate the snapshot but editing it does. In the first case
+    the stored modification time is updated, so that the next loads
+    don't hash the file again. The snapshot is also rebuilt when the
+    code of the specs, their matchers or the snapshot changed.
+
+    Attributes
+    ----------
+    source : Path
+        The JSON file of the pool
+    path : Path
+        The snapshot file
+
+    Methods
+    -------
+    obj.load() -> Optional[Tuple[tracer.SiteSpec, ...]]
+        Returns the specs of the snapshot if it is up to date
+    obj.compile() -> Tuple[tracer.SiteSpec, ...]
+        Validates the pool and writes the snapshot
+    obj.specs() -> Tuple[tracer.SiteSpec, ...]
+        Returns the specs of the pool, from the snapshot if
+        possible
+
+    Classmethods
+    ------------
+    cls.validate(Any) -> None
+        Checks that the data follows the schema of the pool
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the str representation of the snapshot
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    MAGIC = b"TRPS"
+    VERSION = 1
+
+    __slots__ = ("__source", "__path")
+
+    def __init__(
+        self,
+        source: Union[str, Path],
+        path: Optional[Union[str, Path]] = None
+    ):
+        """Creates a snapshot
+
+        Parameters
+        ----------
+        source : Union[str, Path]
+            The JSON file of the pool
+        path : Union[str, Path], optional
+            The snapshot file. If `None`, the source with the
+            suffix `.snapshot` is used, by default None
+        """
+
+        self.__source = Path(source)
+        self.__path = Path(path) if path else self.__source.with_suffix(".snapshot")
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__qualname__}(source={str(self.source)!r}, path={str(self.path)!r})>"
+
+    @property
+    def source(self) -> Path:
+        return self.__source
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @classmethod
+    def validate(cls, data: Any) -> None:
+        """Checks that the data follows the schema of the pool
+
+        The pool has to be a list of objects. Every object needs
+        the keys `domain`, `url` and `category`, must not contain
+        unknown keys and the values need to have the right types.
+        Domains have to be unique and categories have to exist.
+
+        Parameters
+        ----------
+        data : Any
+            The parsed content of the JSON file
+
+        Raises
+        ------
+        tracer.PoolSchemaError
+            The data doesn't follow the schema
+        """
+
+        if not isinstance(data, list):
+            raise PoolSchemaError("The pool has to be a list of sites")
+
+        domains = set()
+
+        for index, entry in enumerate(data):
+            if not isinstance(entry, dict):
+                raise PoolSchemaError(f"Site #{index} has to be an object")
+
+            site = f"Site #{index} ({entry.get('domain', '?')})"
+
+            for key in REQUIRED_KEYS:
+                if key not in entry:
+                    raise PoolSchemaError(f"{site} is missing the key {key!r}")
+
+            for key, value in entry.items():
+                if key not in SCHEMA:
+                    raise PoolSchemaError(f"{site} has the unknown key {key!r}")
+
+                expected = SCHEMA[key]
+
+                # bool is a subclass of int
+                if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+                    raise PoolSchemaError(
+                        f"{site}: {key!r} has to be of type {expected.__name__}"
+                    )
+
+            if entry["domain"] in domains:
+                raise PoolSchemaError(f"{site} is a duplicate")
+
+            if Category.to_str(entry["category"]) == "UNKNOWN":
+                raise PoolSchemaError(f"{site} has the unknown category {entry['category']}")
+
+            if entry.get("max_body_bytes", 1) < 1:
+                raise PoolSchemaError(f"{site}: 'max_body_bytes' has to be positive")
+
+            domains.add(entry["domain"])
+
+    def load(self) -> Optional[Tuple[SiteSpec, ...]]:
+        """Returns the specs of the snapshot
+
+        Returns
+        -------
+        Optional[Tuple[tracer.SiteSpec, ...]]
+            The specs, `None` if the snapshot is missing, corrupt,
+            of another version or out of date
+        """
+
+        try:
+            with open(self.__path, "rb") as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.__restore(data, os.stat(self.__source))
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+
+    def compile(self) -> Tuple[SiteSpec, ...]:
+        """Validates the pool, compiles its rules and writes the snapshot
+
+        Returns
+        -------
+        Tuple[tracer.SiteSpec, ...]
+            The specs of the pool
+
+        Raises
+        ------
+        tracer.PoolSchemaError
+            The pool is invalid
+        OSError
+            The pool couldn't be read or the snapshot couldn't
+            be written
+        """
+
+        specs, header = self.__parse()
+        self.__write(header, self.__dump(specs))
+
+        return specs
+
+    def specs(self) -> Tuple[SiteSpec, ...]:
+        """Returns the specs of the pool
+
+        The snapshot is used if it is up to date. Otherwise the
+        pool is compiled. If the snapshot can't be written, e.g.
+        because the data folder is read-only, the specs are returned
+        anyway.
+
+        Returns
+        -------
+        Tuple[tracer.SiteSpec, ...]
+            The specs of the pool
+
+        Raises
+        ------
+        tracer.PoolSchemaError
+            The pool is invalid
+        OSError
+            The pool couldn't be read
+        """
+
+        specs = self.load()
+
+        if specs is not None:
+            return specs
+
+        specs, header = self.__parse()
+
+        try:
+            self.__write(header, self.__dump(specs))
+        except OSError:
+            pass
+
+        return specs
+
+    @staticmethod
+    def __digest(data: bytes) -> str:
+        return sha256(data).hexdigest()
+
+    @staticmethod
+    def __dump(specs: Tuple[SiteSpec, ...]) -> bytes:
+        return marshal.dumps([spec.as_record() for spec in specs])
+
+    def __header(self, stat: os.stat_result, digest: str) -> Tuple[Any, ...]:
+        return (
+            self.VERSION, marshal.version, _code_fingerprint(),
+            stat.st_mtime_ns, stat.st_size, digest
+        )
+
+    def __restore(self, data: mmap.mmap, stat: os.stat_result) -> Optional[Tuple[SiteSpec, ...]]:
+        """Restores the specs of the mapped snapshot
+
+        Returns
+        -------
+        Optional[Tuple[tracer.SiteSpec, ...]]
+            The specs, `None` if the snapshot is of another version
+            or out of date
+        """
+
+        if data[:len(self.MAGIC)] != self.MAGIC:
+            return None
+
+        offset = len(self.MAGIC) + HEADER_LENGTH.size
+        length, = HEADER_LENGTH.unpack_from(data, len(self.MAGIC))
+        version, marshal_version, fingerprint, mtime, size, digest = marshal.loads(
+            data[offset:offset + length]
+        )
+
+        if (version, marshal_version, fingerprint) != (
+                self.VERSION, marshal.version, _code_fingerprint()):
+            return None
+
+        if (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+            if size != stat.st_size or self.__digest(self.__source.read_bytes()) != digest:
+                return None
+
+            # Only touched, the next loads can skip the digest
+            try:
+                self.__write(self.__header(stat, digest), data[offset + length:])
+            except OSError:
+                pass
+
+        # Unmarshals the records without copying the mapped file
+        with memoryview(data) as view:
+            records = marshal.loads(view[offset + length:])
+
+        return tuple(SiteSpec.from_record(record) for record in records)
+
+    def __parse(self) -> Tuple[Tuple[SiteSpec, ...], Tuple[Any, ...]]:
+        """Reads, validates and compiles the pool
+
+        Returns
+        -------
+        Tuple[Tuple[tracer.SiteSpec, ...], Tuple[Any, ...]]
+            The specs and the header of the snapshot
+        """
+
+        stat = os.stat(self.__source)
+        raw = self.__source.read_bytes()
+
+        try:
+            data: List[Dict[str, Any]] = json.loads(raw)
+        except ValueError as error:
+            raise PoolSchemaError(f"The pool isn't valid JSON: {error}") from None
+
+        self.validate(data)
+        specs = []
+
+        for index, entry in enumerate(data):
+            try:
+                specs.append(SiteSpec.from_dict(entry))
+            except (ValueError, re.error) as error:
+                raise PoolSchemaError(f"Site #{index} ({entry['domain']}): {error}") from None
+
+        return tuple(specs), self.__header(stat, self.__digest(raw))
+
+    def __write(self, header: Tuple[Any, ...], records: bytes) -> None:
+        """Writes the snapshot to `path`"""
+
+        # Unique, so that concurrent writers don't clobber each other
+        fd, name = tempfile.mkstemp(
+            prefix=f"{self.__path.name}.", suffix=".tmp", dir=self.__path.parent
+        )
+        temp = Path(name)
+        data = marshal.dumps(header)
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(self.MAGIC)
+                file.write(HEADER_LENGTH.pack(len(data)))
+                file.write(data)
+                file.write(records)
+        except Exception:
+            temp.unlink(missing_ok=True)
+            raise
+
+        # Replaces the file at once, so readers never see a partial snapshot
+        os.replace(temp, self.__path)
@@ -0,0 +1,215 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = ("PhaseTimings", "create_trace_config")
+
+from typing import Any, Dict, Iterable, Optional
+from types import SimpleNamespace
+from time import perf_counter
+
+from aiohttp import ClientSession, TraceConfig
+
+from .latency import LatencyTracker
+
+
+class PhaseTimings(object):
+    """High-resolution timings of the phases of a check
+
+    All values are in seconds. A phase is `None` if it didn't
+    happen or couldn't be measured, e.g. `dns` and `connect` are
+    `None` if a kept-alive connection got reused or if the session
+    wasn't created with `create_trace_config()`.
+
+    Phases
+    ------
+    dns
+        Resolving the host
+    connect
+        Establishing the connection, including the TLS handshake
+        as aiohttp doesn't report it separately
+    ttfb
+        Sending the request until the headers of the response
+        arrived, including redirects and the time spent waiting
+        for a free connection
+    body
+        Reading the body, without the time spent in `match`
+    match
+        Applying the patterns of the site on the response
+
+    Methods
+    -------
+    obj.as_dict() -> Dict[str, Optional[float]]
+        Returns the phases as a dict
+
+    Classmethods
+    ------------
+    cls.aggregate(Iterable[tracer.PhaseTimings]) -> Dict[str, Dict[str, float]]
+        Returns count, mean, p50, p99 and max of every phase
+
+    Supported Operations
+    --------------------
+    `str(obj)`
+        Returns the phases in milliseconds
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    PHASES = ("dns", "connect", "ttfb", "body", "match")
+
+    __slots__ = PHASES + ("_marks",)
+
+    def __init__(self):
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.body: Optional[float] = None
+        self.match: Optional[float] = None
+        # Starts of the phases that are in progress
+        self._marks: Dict[str, float] = dict()
+
+    def __str__(self) -> str:
+        return ", ".join(
+            f"{phase} {value * 1000:.1f}ms" for phase, value in self.as_dict().items()
+            if value is not None
+        )
+
+    @classmethod
+    def aggregate(cls, timings: Iterable[Optional[PhaseTimings]]) -> Dict[str, Dict[str, float]]:
+        """Summarizes the timings of many checks
+
+        Parameters
+        ----------
+        timings : Iterable[Optional[tracer.PhaseTimings]]
+            The timings, `None` entries are ignored
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            count, mean, p50, p99 and max in seconds per phase.
+            Phases without any measurement are left out
+        """
+
+        samples: Dict[str, list] = {phase: list() for phase in cls.PHASES}
+
+        for timing in timings:
+            if timing is None:
+                continue
+
+            for phase in cls.PHASES:
+                value = getattr(timing, phase)
+
+                if value is not None:
+                    samples[phase].append(value)
+
+        return {
+            phase: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": LatencyTracker.nearest_rank(values, 50),
+                "p99": LatencyTracker.nearest_rank(values, 99),
+                "max": max(values),
+            }
+            for phase, values in samples.items() if values
+        }
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {phase: getattr(self, phase) for phase in self.PHASES}
+
+    def start(self, name: str) -> None:
+        self._marks[name] = perf_counter()
+
+    def stop(self, name: str) -> None:
+        """Adds the time since `start(name)` to the phase"""
+
+        began = self._marks.pop(name, None)
+
+        if began is not None:
+            self.add(name, perf_counter() - began)
+
+    def add(self, name: str, seconds: float) -> None:
+        setattr(self, name, (getattr(self, name) or 0.0) + seconds)
+
+
+def _timings(context: SimpleNamespace) -> Optional[PhaseTimings]:
+    """The timings passed as `trace_request_ctx` of the request"""
+
+    timings = context.trace_request_ctx
+
+    return timings if isinstance(timings, PhaseTimings) else None
+
+
+async def _on_dns_start(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+    timings = _timings(context)
+
+    if timings is not None:
+        timings.start("dns")
+
+
+async def _on_dns_end(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+    timings = _timings(context)
+
+    if timings is not None:
+        timings.stop("dns")
+
+
+async def _on_connect_start(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+    timings = _timings(context)
+
+    if timings is not None:
+        timings.start("connect")
+        # The host is resolved while the connection is created
+        timings._marks["dns_before_connect"] = timings.dns or 0.0
+
+
+async def _on_connect_end(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+    timings = _timings(context)
+
+    if timings is None or "connect" not in timings._marks:
+        return None
+
+    resolving = (timings.dns or 0.0) - timings._marks.pop("dns_before_connect", 0.0)
+    elapsed = perf_counter() - timings._marks.pop("connect")
+
+    timings.add("connect", max(0.0, elapsed - resolving))
+
+
+def create_trace_config() -> TraceConfig:
+    """Creates the trace config which measures `dns` and `connect`
+
+    Pass it to the session, e.g. `ClientSession(trace_configs=[create_trace_config()])`.
+    Only requests whose `trace_request_ctx` is a `tracer.PhaseTimings`
+    are measured.
+    """
+
+    config = TraceConfig()
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+
+    return config
@@ -0,0 +1,370 @@
+"""
+MIT License
+
+Copyright (c) 2022 chr3st5an
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "AbstractTransport",
+    "TransportResponse",
+    "AiohttpTransport",
+    "StubTransport",
+    "as_transport",
+)
+
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Union
+)
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+import asyncio
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout
+
+from .timing import PhaseTimings
+
+
+class TransportResponse(ABC):
+    """The part of a HTTP response that is needed for a check
+
+    The body is not read until `iter_chunked` is used. `release`
+    has to be called once the response is no longer needed.
+    """
+
+    @property
+    @abstractmethod
+    def status(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def url(self) -> str:
+        """The final url after redirects"""
+
+    @property
+    @abstractmethod
+    def host(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def method(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def headers(self) -> Mapping[str, str]:
+        pass
+
+    @abstractmethod
+    def iter_chunked(self, size: int) -> AsyncGenerator[bytes, None]:
+        pass
+
+    @abstractmethod
+    async def release(self) -> None:
+        pass
+
+
+class AbstractTransport(ABC):
+    """Sends the HTTP requests of the checks
+
+    Transports which can observe the phases of a request record
+    them into the `timings` passed to `request`.
+    """
+
+    @abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[ClientTimeout] = None,
+        timings: Optional[PhaseTimings] = None
+    ) -> TransportResponse:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+class AiohttpResponse(TransportResponse):
+    """Adapts an `aiohttp.ClientResponse`"""
+
+    __slots__ = ("__response",)
+
+    def __init__(self, response: ClientResponse):
+        self.__response = response
+
+    @property
+    def status(self) -> int:
+        return self.__response.status
+
+    @property
+    def url(self) -> str:
+        return str(self.__response.url)
+
+    @property
+    def host(self) -> str:
+        return self.__response.host
+
+    @property
+    def method(self) -> str:
+        return self.__response.method
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self.__response.headers
+
+    def iter_chunked(self, size: int) -> AsyncGenerator[bytes, None]:
+        return self.__response.content.iter_chunked(size)
+
+    async def release(self) -> None:
+        await self.__response.release()
+
+
+class AiohttpTransport(AbstractTransport):
+    """Sends requests through an `aiohttp.ClientSession`
+
+    This is the default transport. Redirects are followed. DNS
+    and connect timings are only recorded if the session was
+    created with `tracer.create_trace_config()`.
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = ("__session",)
+
+    def __init__(self, session: ClientSession):
+        self.__session = session
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__qualname__}(session={self.session})>"
+
+    @property
+    def session(self) -> ClientSession:
+        return self.__session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[ClientTimeout] = None,
+        timings: Optional[PhaseTimings] = None
+    ) -> TransportResponse:
+        send = getattr(self.__session, method.lower())
+        kwargs: Dict[str, Any] = {"timeout": timeout}
+
+        if headers:
+            kwargs["headers"] = headers
+
+        if timings is not None:
+            # Filled by the hooks of `create_trace_config`
+            kwargs["trace_request_ctx"] = timings
+
+        if method.upper() == "HEAD":
+            # aiohttp doesn't follow redirects of HEAD requests by default
+            kwargs["allow_redirects"] = True
+
+        return AiohttpResponse(await send(url, **kwargs))
+
+    async def close(self) -> None:
+        await self.__session.close()
+
+
+class StubResponse(TransportResponse):
+    """A response created by `StubTransport`"""
+
+    __slots__ = ("__status", "__url", "__method", "__headers", "__body")
+
+    def __init__(
+        self,
+        status: int,
+        url: str,
+        method: str,
+        headers: Mapping[str, str],
+        body: bytes
+    ):
+        self.__status = status
+        self.__url = url
+        self.__method = method
+        self.__headers = headers
+        self.__body = body
+
+    @property
+    def status(self) -> int:
+        return self.__status
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.__url).hostname or ""
+
+    @property
+    def method(self) -> str:
+        return self.__method
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self.__headers
+
+    async def iter_chunked(self, size: int) -> AsyncGenerator[bytes, None]:
+        body = b"" if self.__method == "HEAD" else self.__body
+
+        for i in range(0, len(body), size):
+            yield body[i:i + size]
+
+    async def release(self) -> None:
+        pass
+
+
+# Either a fixed value or a function of the requested url
+Scripted = Union[Any, Callable[[str], Any]]
+
+
+class StubTransport(AbstractTransport):
+    """Answers requests from memory without any socket
+
+    Status, body, headers, final url and latency of a response
+    are scripted, either as fixed values or as functions of the
+    requested url. This allows to measure the CPU time of the
+    checks separately from the network.
+
+    Example
+    -------
+        >>> transport = StubTransport(
+        ...     body=lambda url: b"<title>Not Found</title>" if "404" in url else b"ok",
+        ...     latency=0.05
+        ... )
+        >>> async for result in pool.start_requests(transport):
+        ...     ...
+
+    Attributes
+    ----------
+    requests : int
+        The amount of requests answered so far
+
+    Author
+    ------
+    chr3st5an
+    """
+
+    __slots__ = ("__status", "__body", "__headers", "__latency", "__final_url", "__requests")
+
+    def __init__(
+        self,
+        status: Scripted = 200,
+        body: Scripted = b"",
+        headers: Scripted = None,
+        latency: Scripted = 0.0,
+        final_url: Optional[Callable[[str], str]] = None
+    ):
+        """Creates a stub transport
+
+        Parameters
+        ----------
+        status : Union[int, Callable[[str], int]], optional
+            Status code of the responses, by default 200
+        body : Union[bytes, Callable[[str], bytes]], optional
+            Body of the responses, by default empty
+        headers : Union[Mapping, Callable[[str], Mapping]], optional
+            Headers of the responses, by default none
+        latency : Union[float, Callable[[str], float]], optional
+            Seconds until a response is returned, by default 0. If
+            it exceeds the total timeout of a request, a TimeoutError
+            is raised after the timeout
+        final_url : Callable[[str], str], optional
+            Maps the requested url to the url after redirects, by
+            default the requested url
+        """
+
+        self.__status = status
+        self.__body = body
+        self.__headers = headers
+        self.__latency = latency
+        self.__final_url = final_url
+        self.__requests = 0
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__qualname__}(requests={self.requests})>"
+
+    @property
+    def requests(self) -> int:
+        return self.__requests
+
+    @staticmethod
+    def __script(value: Scripted, url: str) -> Any:
+        return value(url) if callable(value) else value
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[ClientTimeout] = None,
+        timings: Optional[PhaseTimings] = None
+    ) -> TransportResponse:
+        self.__requests += 1
+
+        latency = float(self.__script(self.__latency, url) or 0)
+        total = timeout.total if timeout is not None else None
+
+        if total is not None and latency > total:
+            await asyncio.sleep(total)
+
+            raise asyncio.TimeoutError()
+
+        # Always yields to the event loop, like a real request
+        await asyncio.sleep(latency)
+
+        return StubResponse(
+            status=self.__script(self.__status, url),
+            url=self.__final_url(url) if self.__final_url else url,
+            method=method.upper(),
+            headers=self.__script(self.__headers, url) or {},
+            body=self.__script(self.__body, url)
+        )
+
+    async def close(self) -> None:
+        pass
+
+
+def as_transport(session: Union[ClientSession, AbstractTransport]) -> AbstractTransport:
+    """Returns the transport itself or wraps the session in a `AiohttpTransport`"""
+
+    if isinstance(session, AbstractTransport):
+        return session
+
+    return AiohttpTransport(session)
@@ -26,21 +26,38 @@ from __future__ import annotations
 
 __all__ = ("Website",)
 
-from typing import Any, Callable, Coroutine, Dict, Optional, Union
+from typing import Any, AsyncGenerator, Callable, Coroutine, Dict, Optional, Tuple, Union
+from contextlib import asynccontextmanager
 from abc import ABC, abstractmethod
 from asyncio import TimeoutError
-from time import monotonic
-from copy import deepcopy
+from time import monotonic, perf_counter
 import asyncio
-import re
 
-from aiohttp import ClientSession, ClientResponse, ClientTimeout
+from aiohttp import ClientSession, ClientTimeout
 
+from .breaker import CircuitBreaker
+from .latency import LatencyTracker
+from .scheduler import RequestScheduler
+from .cache import ResultCache
+from .retry import RetryPolicy
+from .transport import AbstractTransport, TransportResponse, as_transport
+from .timing import PhaseTimings
+from .sitespec import SiteSpec
 from .category import Category
+from .matcher import Matcher
 from .result import Result
 
 
+# Amount of bytes read from a response body at once
+CHUNK_SIZE = 8_192
+
+# Status codes of servers rejecting a HEAD or Range request
+FALLBACK_CODES = (405, 416, 501)
+
+
 class AbstractWebsite(ABC):
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def from_dict(cls, data):
@@ -62,8 +79,15 @@ class AbstractWebsite(ABC):
 class Website(AbstractWebsite):
     """Represents a website
 
+    A website combines the static rules of a site, its
+    `tracer.SiteSpec`, with the state of a single check: the
+    username and the result. Specs are shared, hence creating a
+    website for a check only allocates this small object.
+
     Attributes
     ----------
+    spec : tracer.SiteSpec
+        The rules of the website
     name : str
         The name of the website, e.g. 'example'
     domain : str
@@ -77,7 +101,7 @@ class Website(AbstractWebsite):
     true_url : str
         The url that gets used to make the HTTP request to this
         website
-    category : int
+    category : tracer.Category
         The category to which the website belongs to
     result : tracer.Result
         The result of the request, `None` if no request was
@@ -93,10 +117,20 @@ class Website(AbstractWebsite):
         Regex pattern that gets applied on the returned url.
         If it matches, the username is considered as
         'Not Found'
+    text_matcher : tracer.Matcher, optional
+        The compiled `err_text_pattern`
+    url_matcher : tracer.Matcher, optional
+        The compiled `err_url_pattern`
     err_on_dot : bool
         Indicates if the website responses with an error
         if the username contains a dot. If `True`, no
         actual request is send to the website
+    max_body_bytes : int, optional
+        The maximum amount of bytes that are read from the
+        body of a response. `None` if unlimited
+    request_method : str
+        How the page is requested. Either `get`, `head` or
+        `range` (GET with `Range: bytes=0-0`)
 
     Methods
     -------
@@ -105,8 +139,8 @@ class Website(AbstractWebsite):
         checked
     obj.set_result(tracer.Result)
         Sets a result for the website
-    obj.send_request(ClientSession, Optional[float], Optional[Callable])
-        Sends a HTTP GET request to the website and checks if
+    obj.send_request(Union[ClientSession, AbstractTransport], Optional[float], Optional[Callable], **Any)
+        Sends a HTTP request to the website and checks if
         the username exists. Then creates a `tracer.Result` object
         and assigns it to itself by using `obj.set_result`
 
@@ -115,6 +149,9 @@ class Website(AbstractWebsite):
     cls.from_dict(dict) -> tracer.Website
         Creates a `tracer.Website` object by using the values
         of the dict
+    cls.from_spec(tracer.SiteSpec, Optional[str]) -> tracer.Website
+        Creates a `tracer.Website` object which shares the
+        given spec
 
     Supported Operations
     --------------------
@@ -126,7 +163,7 @@ class Website(AbstractWebsite):
     `copy.copy(obj)`
         Returns a copy of the website
     `copy.deepcopy(obj)`
-        Returns a deepcopy of the website
+        Returns a copy of the website which shares the spec
 
     Note
     ----
@@ -140,13 +177,15 @@ class Website(AbstractWebsite):
     chr3st5an
     """
 
+    __slots__ = ("__spec", "__username", "__result")
+
     @classmethod
-    def from_dict(cls, data: Dict[str, str]) -> Website:
+    def from_dict(cls, data: Dict[str, Any]) -> Website:
         """Creates a Website by using the given data
 
         Parameters
         ----------
-        data : Dict[str, str]
+        data : Dict[str, Any]
             A dict whose values are used to create the
             Website. The dict must include the following
             keys: `domain`, `url` & `category`
@@ -157,72 +196,47 @@ class Website(AbstractWebsite):
             The Website that got created
         """
 
-        return cls(
-            domain=data["domain"],
-            true_url=data["url"],
-            category=data["category"],
-            display_url=data.get("display_url"),
-            err_ignore_code=data.get("err_ignore_code", False),
-            err_text_pattern=data.get("err_text_pattern"),
-            err_url_pattern=data.get("err_url_pattern"),
-            err_on_dot=data.get("err_on_dot", False)
-        )
+        return cls.from_spec(SiteSpec.from_dict(data))
 
-    def __init__(
-        self,
-        domain: str,
-        true_url: str,
-        category: int,
-        display_url: Optional[str] = None,
-        err_ignore_code: bool = False,
-        err_text_pattern: Optional[str] = None,
-        err_url_pattern: Optional[str] = None,
-        err_on_dot: bool = False
-    ):
-        """Creates an instance
+    @classmethod
+    def from_spec(cls, spec: SiteSpec, username: Optional[str] = None) -> Website:
+        """Creates a Website which shares the given spec
 
         Parameters
         ----------
-        domain : str
-            The domain name of the website, e.g. 'example.com'
-        true_url : str
-            The url that gets used to make the HTTP request to this
-            website
-        category : int
-            The category to which the website belongs to
-        display_url : str, optional
-            The url that represents an users page on this website,
-            e.g. 'https:\/\/example.com/user/'. If None, then
-            `true_url` is used, by default None
-        err_ignore_code : bool
-            Indicates if the returned status code of the request
-            should be ignored, by default False
-        err_text_pattern : str
-            Regex pattern that gets applied on the returned text.
-            If it matches, the username is considered as
-            'Not Found', by default None
-        err_url_pattern : str
-            Regex pattern that gets applied on the returned url.
-            If it matches, the username is considered as
-            'Not Found', by default None
-        err_on_dot : bool
-            Indicates if the website responses with an error
-            if the username contains a dot. If `True`, no
-            actual request is send to the website, by default
-            False
+        spec : tracer.SiteSpec
+            The rules of the website
+        username : str, optional
+            The username to check, by default None
+
+        Returns
+        -------
+        tracer.Website
+            The Website that got created
+        """
+
+        website = cls.__new__(cls)
+        website.__spec = spec
+        website.__username = username
+        website.__result = None
+
+        return website
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Creates an instance
+
+        Takes the same parameters as `tracer.SiteSpec`. Prefer
+        `Website.from_spec` if the spec already exists.
+
+        Raises
+        ------
+        ValueError
+            Invalid request method
         """
 
-        self.__url = display_url if display_url else true_url
-        self.__true_url = true_url
+        self.__spec = SiteSpec(*args, **kwargs)
         self.__username = None
         self.__result = None
-        self.__category = Category(self, category)
-        self.__domain = domain
-
-        self.err_ignore_code = err_ignore_code
-        self.err_text_pattern = err_text_pattern
-        self.err_url_pattern = err_url_pattern
-        self.err_on_dot = err_on_dot
 
     def __str__(self) -> str:
         return (f"<{self.__class__.__qualname__}(name={self.name!r}, "
@@ -230,24 +244,30 @@ class Website(AbstractWebsite):
                 f"category={self.category}, result={self.result})>")
 
     def __eq__(self, other: Any) -> bool:
-        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+        return (
+            isinstance(other, self.__class__)
+            and self.spec == other.spec
+            and self.username == other.username
+            and self.result is other.result
+        )
 
     def __copy__(self) -> Website:
-        website = self.__class__.__new__(self.__class__)
-        website.__dict__.update(self.__dict__)
+        website = self.__class__.from_spec(self.spec, self.username)
+        website.set_result(self.result)
 
         return website
 
     def __deepcopy__(self, memo: Dict[int, Any]) -> Website:
-        website = self.__class__.__new__(self.__class__)
+        website = self.__copy__()
 
         memo[id(self)] = website
 
-        for k, v in self.__dict__.items():
-            setattr(website, k, deepcopy(v, memo))
-
         return website
 
+    @property
+    def spec(self) -> SiteSpec:
+        return self.__spec
+
     @property
     def name(self) -> str:
         """Return the host name
@@ -255,11 +275,11 @@ class Website(AbstractWebsite):
         `example.com` => `example`
         """
 
-        return self.__domain.split('.')[0]
+        return self.__spec.name
 
     @property
     def domain(self) -> str:
-        return self.__domain
+        return self.__spec.domain
 
     @property
     def username(self) -> Optional[str]:
@@ -267,7 +287,7 @@ class Website(AbstractWebsite):
 
     @property
     def category(self) -> Category:
-        return self.__category
+        return self.__spec.category
 
     @property
     def result(self) -> Optional[Result]:
@@ -275,11 +295,49 @@ class Website(AbstractWebsite):
 
     @property
     def url(self) -> str:
-        return self.__url.format(self.username) if self.username else self.__url
+        if self.username:
+            return self.__spec.url(self.username)
+
+        return self.__spec.url_template
 
     @property
     def true_url(self) -> str:
-        return self.__true_url.format(self.username) if self.username else self.__true_url
+        if self.username:
+            return self.__spec.true_url(self.username)
+
+        return self.__spec.true_url_template
+
+    @property
+    def err_ignore_code(self) -> bool:
+        return self.__spec.err_ignore_code
+
+    @property
+    def err_text_pattern(self) -> Optional[str]:
+        return self.__spec.err_text_pattern
+
+    @property
+    def err_url_pattern(self) -> Optional[str]:
+        return self.__spec.err_url_pattern
+
+    @property
+    def text_matcher(self) -> Optional[Matcher]:
+        return self.__spec.text_matcher
+
+    @property
+    def url_matcher(self) -> Optional[Matcher]:
+        return self.__spec.url_matcher
+
+    @property
+    def err_on_dot(self) -> bool:
+        return self.__spec.err_on_dot
+
+    @property
+    def max_body_bytes(self) -> Optional[int]:
+        return self.__spec.max_body_bytes
+
+    @property
+    def request_method(self) -> str:
+        return self.__spec.request_method
 
     def set_username(self, username: str) -> None:
         """Sets a username
@@ -305,16 +363,46 @@ class Website(AbstractWebsite):
 
     async def send_request(
         self,
-        session: ClientSession,
+        session: Union[ClientSession, AbstractTransport],
         timeout: Optional[float] = None,
-        cb: Optional[Callable[[Result], Union[Coroutine, Any]]] = None
+        cb: Optional[Callable[[Result], Union[Coroutine, Any]]] = None,
+        *,
+        cache: Optional[ResultCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        latency: Optional[LatencyTracker] = None,
+        retry: Optional[RetryPolicy] = None,
+        scheduler: Optional[RequestScheduler] = None
     ) -> None:
-        """Sends a GET requests and evaluates the response
+        """Requests the page and evaluates the response
+
+        If a cache is given and holds a valid outcome for the
+        username, no request is sent and the result is marked
+        as `cached`. Definitive outcomes of requests are stored
+        in the cache.
+
+        If a breaker is given and the breaker of the domain is
+        open, no request is sent and the result is marked as
+        `skipped`. Timeouts and errors are reported to the
+        breaker.
+
+        If a latency tracker is given, the timeout is derived
+        from the latencies observed for the domain and `timeout`
+        only acts as a ceiling.
+
+        If a retry policy is given, failed connections, broken
+        responses and throttled (429, 503) responses are repeated
+        as long as the policy allows it. The result records the
+        amount of attempts.
+
+        If a scheduler is given, each attempt waits for a slot of
+        the domain. The slot is released while backing off, hence
+        a retried request doesn't hold back other requests.
 
         Parameters
         ----------
-        session : ClientSession
-            ClientSession to use for the GET request
+        session : Union[ClientSession, tracer.AbstractTransport]
+            Sends the request. A ClientSession is wrapped into a
+            `tracer.AiohttpTransport`
         timeout : Optional[float], optional
             How many seconds the request has before a
             TimeoutError occurs, by default None
@@ -323,6 +411,21 @@ class Website(AbstractWebsite):
             the result is available. It should only
             take in one parameter which is the result,
             by default None
+        cache : tracer.ResultCache, optional
+            Cache to consult before sending a request, by
+            default None
+        breaker : tracer.CircuitBreaker, optional
+            Breaker that decides if the request is sent, by
+            default None
+        latency : tracer.LatencyTracker, optional
+            Tracker that provides the timeout of the request and
+            records its delay, by default None
+        retry : tracer.RetryPolicy, optional
+            Policy that decides if a failed request is repeated,
+            by default None
+        scheduler : tracer.RequestScheduler, optional
+            Scheduler that limits the concurrent requests per
+            attempt, by default None
 
         Raises
         ------
@@ -343,7 +446,8 @@ class Website(AbstractWebsite):
                     successfully=False,
                     delay=0,
                     host=self.domain,
-                    url=self.url
+                    url=self.url,
+                    attempts=0
                 )
             )
 
@@ -351,82 +455,356 @@ class Website(AbstractWebsite):
 
             return None
 
-        timeout = ClientTimeout(timeout)
-        start = monotonic()
+        if cache is not None:
+            entry = cache.get(self.spec, self.username)
+
+            if entry is not None:
+                self.set_result(
+                    result=Result(
+                        website=self,
+                        status_code=entry[1],
+                        successfully=entry[0],
+                        delay=0,
+                        host=self.domain,
+                        url=self.url,
+                        cached=True
+                    )
+                )
 
-        try:
-            async with session.get(self.true_url, timeout=timeout) as response:
-                result = Result(
+                await self.__callback(cb)
+
+                return None
+
+        if breaker is not None and not breaker.allow(self.domain):
+            self.set_result(
+                result=Result(
                     website=self,
-                    status_code=response.status,
-                    successfully=await self.__user_exists(response),
-                    delay=monotonic() - start,
-                    host=response.host,
-                    url=self.url
+                    status_code=0,
+                    successfully=False,
+                    delay=0,
+                    host=self.domain,
+                    url=self.url,
+                    skipped=True
                 )
-
-                response.close()
-                await response.wait_for_close()
-        except TimeoutError:
-            result = Result(
-                website=self,
-                status_code=400,
-                successfully=False,
-                delay=monotonic() - start,
-                host=self.domain,
-                url=self.url,
-                timeout=True
-            )
-        except Exception as e:
-            result = Result(
-                website=self,
-                status_code=600,
-                successfully=False,
-                delay=monotonic() - start,
-                host=self.domain,
-                url=self.url,
-                error=e
             )
-        finally:
-            self.set_result(result)
+
+            await self.__callback(cb)
+
+            return None
+
+        if latency is not None:
+            timeout = latency.timeout(self.domain, timeout)
+        else:
+            timeout = ClientTimeout(timeout)
+
+        transport = as_transport(session)
+        start = monotonic()
+        attempts = 0
+        backoff = 0.0
+
+        while True:
+            # Backs off outside of the slot
+            if backoff:
+                await asyncio.sleep(backoff)
+
+            attempts += 1
+
+            async with self.__slot(scheduler):
+                sent = monotonic()
+                timings = PhaseTimings()
+
+                if retry is not None:
+                    retry.budget.record_request()
+
+                try:
+                    response = await self.__fetch(transport, timeout, timings)
+                    kind = retry.classify_response(response.status) if retry else None
+
+                    if retry is not None and retry.should_retry(kind, attempts):
+                        await response.release()
+                        backoff = retry.delay(kind, attempts, response.headers.get("Retry-After"))
+
+                        continue
+
+                    try:
+                        user_exists, received = await self.__user_exists(response, timings)
+
+                        result = Result(
+                            website=self,
+                            status_code=response.status,
+                            successfully=user_exists,
+                            delay=monotonic() - start,
+                            host=response.host,
+                            url=self.url,
+                            bytes_received=received,
+                            bytes_saved=self.__bytes_saved(response),
+                            attempts=attempts,
+                            timings=timings
+                        )
+                    finally:
+                        # Keeps the connection alive if the body was read completely
+                        await response.release()
+
+                    # Throttled responses and server errors say nothing about the username
+                    if cache is not None and cache.is_decisive(response.status):
+                        cache.put(self.spec, self.username, user_exists, response.status)
+                except TimeoutError:
+                    result = Result(
+                        website=self,
+                        status_code=400,
+                        successfully=False,
+                        delay=monotonic() - start,
+                        host=self.domain,
+                        url=self.url,
+                        timeout=True,
+                        attempts=attempts,
+                        timings=timings
+                    )
+                except Exception as e:
+                    kind = retry.classify_exception(e) if retry else None
+
+                    if retry is not None and retry.should_retry(kind, attempts):
+                        backoff = retry.delay(kind, attempts)
+
+                        continue
+
+                    result = Result(
+                        website=self,
+                        status_code=600,
+                        successfully=False,
+                        delay=monotonic() - start,
+                        host=self.domain,
+                        url=self.url,
+                        error=e,
+                        attempts=attempts,
+                        timings=timings
+                    )
+
+            break
+
+        self.set_result(result)
+
+        if latency is not None and not result.error:
+            # Only the last attempt counts, backoffs aren't latency
+            delay = monotonic() - sent
+
+            # A timeout is recorded with its deadline, so that a too
+            # tight deadline grows with the next requests
+            if result.timeout and timeout.total:
+                delay = timeout.total
+
+            latency.record(self.domain, delay)
+
+        if breaker is not None:
+            if result.timeout or result.error:
+                breaker.record_failure(self.domain)
+            else:
+                breaker.record_success(self.domain)
 
         await self.__callback(cb)
 
         return None
 
-    async def __user_exists(self, response: ClientResponse) -> bool:
+    @asynccontextmanager
+    async def __slot(
+        self,
+        scheduler: Optional[RequestScheduler]
+    ) -> AsyncGenerator[None, None]:
+        """Holds a slot of the scheduler for the domain, if any"""
+
+        if scheduler is None:
+            yield
+        else:
+            async with scheduler.slot(self.domain):
+                yield
+
+    async def __fetch(
+        self,
+        transport: AbstractTransport,
+        timeout: ClientTimeout,
+        timings: PhaseTimings
+    ) -> TransportResponse:
+        """Requests the page and records the time to the first byte
+
+        `ttfb` is the time until the headers of the response
+        arrived, minus the `dns` and `connect` phases recorded by
+        the transport.
+
+        Parameters
+        ----------
+        transport : tracer.AbstractTransport
+            Transport to use for the request
+        timeout : ClientTimeout
+            The timeout of the request
+        timings : tracer.PhaseTimings
+            Receives the timings of the request
+
+        Returns
+        -------
+        tracer.TransportResponse
+            The response whose body wasn't read yet
+        """
+
+        start = perf_counter()
+        response = await self.__send(transport, timeout, timings)
+        elapsed = perf_counter() - start
+
+        timings.ttfb = max(0.0, elapsed - (timings.dns or 0.0) - (timings.connect or 0.0))
+
+        return response
+
+    async def __send(
+        self,
+        transport: AbstractTransport,
+        timeout: ClientTimeout,
+        timings: PhaseTimings
+    ) -> TransportResponse:
+        """Requests the page by using the request method of the website
+
+        A HEAD or Range request which gets rejected by the server is
+        repeated as a plain GET request.
+        """
+
+        if self.request_method == "head":
+            response = await transport.request(
+                "HEAD", self.true_url, timeout=timeout, timings=timings
+            )
+        elif self.request_method == "range":
+            response = await transport.request(
+                "GET", self.true_url, headers={"Range": "bytes=0-0"}, timeout=timeout,
+                timings=timings
+            )
+        else:
+            return await transport.request("GET", self.true_url, timeout=timeout, timings=timings)
+
+        if response.status not in FALLBACK_CODES:
+            return response
+
+        await response.release()
+
+        return await transport.request("GET", self.true_url, timeout=timeout, timings=timings)
+
+    def __bytes_saved(self, response: TransportResponse) -> int:
+        """Returns how many bytes were not downloaded thanks to the request method"""
+
+        if self.request_method == "head" and response.method == "HEAD":
+            return int(response.headers.get("Content-Length", 0) or 0)
+
+        if self.request_method == "range" and response.status == 206:
+            # Content-Range: bytes 0-0/<size>
+            size = response.headers.get("Content-Range", "").rpartition("/")[2]
+
+            return max(0, int(size) - 1) if size.isdigit() else 0
+
+        return 0
+
+    async def __user_exists(
+        self,
+        response: TransportResponse,
+        timings: PhaseTimings
+    ) -> Tuple[bool, int]:
         """Check based on the returned response if the username is in use.
 
-        First check if the response status is 200, then
-        apply the given regex pattern on the returned text.
+        First check if the response status is 200 (or 206 for a
+        Range request), then apply the given regex patterns on
+        the final url and on the returned body.
 
         Parameters
         ----------
-        response : aiohttp.ClientResponse
-            A ClientResponse generated by `aiohttp`.
+        response : tracer.TransportResponse
+            The response returned by the transport
+        timings : tracer.PhaseTimings
+            Receives the `body` and `match` phases
 
         Returns
         -------
-        bool
-            Indicator if the username exists
+        Tuple[bool, int]
+            Indicator if the username exists and the amount
+            of bytes read from the body
         """
 
-        if not (response.status == 200 or self.err_ignore_code):
-            return False
+        status_ok = (response.status == 200) or (
+            response.status == 206 and self.request_method == "range"
+        )
+
+        if not (status_ok or self.err_ignore_code):
+            return False, 0
 
         await asyncio.sleep(0)
 
-        if self.err_url_pattern:
-            if re.search(self.err_url_pattern, str(response.url), flags=re.I):
-                return False
+        if self.url_matcher:
+            start = perf_counter()
+            matches = self.url_matcher.search(response.url)
+            timings.add("match", perf_counter() - start)
+
+            if matches:
+                return False, 0
+
+        if self.text_matcher:
+            matches, received = await self.__body_matches(response, timings)
+
+            return not matches, received
+
+        return True, 0
+
+    async def __body_matches(
+        self,
+        response: TransportResponse,
+        timings: PhaseTimings
+    ) -> Tuple[bool, int]:
+        """Check if `err_text_pattern` matches the body of the response
+
+        The body is read in chunks and fed as raw bytes into the
+        `text_matcher`, so that reading stops as soon as a decision
+        can be made. This is the case if
+
+        - the pattern matches
+        - the pattern targets the `<title>` of the page and the title
+          is completely read without a match
+        - `max_body_bytes` got read
+
+        Parameters
+        ----------
+        response : tracer.TransportResponse
+            The response returned by the transport
+        timings : tracer.PhaseTimings
+            Receives the `body` and `match` phases
+
+        Returns
+        -------
+        Tuple[bool, int]
+            Indicator if the pattern matches and the amount of
+            bytes read from the body
+        """
+
+        stream = self.text_matcher.stream()
+        limit = self.max_body_bytes
+        start = perf_counter()
+        matching = 0.0
+
+        try:
+            async for chunk in response.iter_chunked(CHUNK_SIZE):
+                if limit is not None:
+                    chunk = chunk[:limit - stream.received]
+
+                fed = perf_counter()
+                decision = stream.feed(chunk)
+                matching += perf_counter() - fed
 
-        if self.err_text_pattern:
-            text = await response.text()
+                if decision is not None:
+                    return decision, stream.received
 
-            if re.search(self.err_text_pattern, text, flags=re.S + re.I + re.M):
-                return False
+                if limit is not None and stream.received >= limit:
+                    break
 
-        return True
+            fed = perf_counter()
+            matches = stream.finish()
+            matching += perf_counter() - fed
+
+            return matches, stream.received
+        finally:
+            timings.add("match", matching)
+            timings.add("body", perf_counter() - start - matching)
 
     async def __callback(
         self,
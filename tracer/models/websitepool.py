@@ -33,14 +33,23 @@ from typing import (
     Callable,
     Dict,
     Generator,
+    Iterable,
+    Iterator,
     Tuple,
-    Optional
+    Optional,
+    Union
 )
+from urllib.parse import urlsplit
+from time import monotonic
 import asyncio
 import copy
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout
 
+from .scheduler import RequestScheduler
+from .transport import AbstractTransport, as_transport
+from .resolver import CachingResolver
+from .sitespec import SiteSpec
 from .website import Website
 from .result import Result
 
@@ -75,6 +84,8 @@ class WebsitePool(AbstractWebsitePool):
         The name of the pool
     results : Tuple[tracer.Result]
         A collection of available results
+    hosts : Tuple[str]
+        The hostnames to which requests are sent
 
     Methods
     -------
@@ -86,8 +97,17 @@ class WebsitePool(AbstractWebsitePool):
         Adds a website to the pool
     obj.remove(Callable[[tracer.Website], bool])
         Removes websites from the pool
-    obj.start_requests(aiohttp.ClientSession, Optional[float])
+    obj.start_requests(aiohttp.ClientSession, Optional[float], Optional[tracer.RequestScheduler])
         Calls `send_request` of every site inside of the pool
+    obj.check_many(aiohttp.ClientSession, Iterable[str], Optional[float], Optional[tracer.RequestScheduler])
+        Checks several usernames on every site inside of the pool
+    obj.warm_up(aiohttp.ClientSession, Optional[tracer.CachingResolver], bool)
+        Resolves the hosts of the pool and optionally opens connections
+
+    Classmethods
+    ------------
+    cls.from_specs(Iterable[tracer.SiteSpec], Optional[str]) -> tracer.WebsitePool
+        Creates a pool of websites which share the given specs
 
     Supported Operations
     --------------------
@@ -111,6 +131,38 @@ class WebsitePool(AbstractWebsitePool):
     chr3st5an
     """
 
+    @classmethod
+    def from_specs(
+        cls,
+        specs: Iterable[SiteSpec],
+        username: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> WebsitePool:
+        """Creates a pool of websites which share the given specs
+
+        This is the cheap way of creating a pool for a search, as
+        only a small `tracer.Website` object is created per spec.
+
+        Parameters
+        ----------
+        specs : Iterable[tracer.SiteSpec]
+            The specs of the websites
+        username : str, optional
+            The username to set for every website, by default None
+        name : str, optional
+            The name of the pool, by default None
+
+        Returns
+        -------
+        tracer.WebsitePool
+            The pool that got created
+        """
+
+        pool = cls(name=name)
+        pool.__sites = [Website.from_spec(spec, username) for spec in specs]
+
+        return pool
+
     def __init__(
         self,
         *sites: Website,
@@ -178,6 +230,16 @@ class WebsitePool(AbstractWebsitePool):
     def results(self) -> Tuple[Result]:
         return tuple([site.result for site in self if site.result])
 
+    @property
+    def hosts(self) -> Tuple[str]:
+        """The hostnames to which requests are sent
+
+        If no username is set, sites whose hostname contains the
+        username are left out.
+        """
+
+        return tuple(self.__origins())
+
     @property
     def is_empty(self) -> bool:
         return not self
@@ -228,7 +290,8 @@ class WebsitePool(AbstractWebsitePool):
             The pool from which to take the sites
         _deepcopy : bool
             Whether to generate copies of the sites and
-            add these or add the original sites, by
+            add these or add the original sites. Copies
+            share the spec of the original site, by
             default True
         """
 
@@ -288,23 +351,43 @@ class WebsitePool(AbstractWebsitePool):
 
     async def start_requests(
         self,
-        session: ClientSession,
-        timeout: Optional[float] = None
+        session: Union[ClientSession, AbstractTransport],
+        timeout: Optional[float] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        queue_size: Optional[int] = None,
+        **options: Any
     ) -> AsyncGenerator[Result, None]:
         """Prepares and handles all requests
 
         Calls `send_request` of every tracer.Website object in the pool and
         returns an AsyncGenerator yielding the results of these
-        requests when available.
+        requests in the order in which they complete. The amount of
+        requests that are in flight at the same time is limited by
+        the scheduler.
+
+        Finished results are passed through a bounded queue. If the
+        consumer falls behind, no new requests are started until
+        there is space in the queue. Closing the generator cancels
+        every request that didn't finish yet.
 
         Parameters
         ----------
-        session : aiohttp.ClientSession
-            A session object which gets used to make the
+        session : Union[aiohttp.ClientSession, tracer.AbstractTransport]
+            A session or transport which gets used to make the
             requests.
         timeout : Union[int, float], optional
             Represents the time each request has before a
             TimeoutError occurs.
+        scheduler : tracer.RequestScheduler, optional
+            Limits the amount of concurrent requests. If `None`,
+            a scheduler with the default limits is used. The
+            session should use a connector created by
+            `scheduler.create_connector`.
+        queue_size : int, optional
+            How many results may wait for the consumer, by default
+            the concurrency of the scheduler
+        **options : Any
+            Passed to `send_request` of every check, e.g. `cache`
 
         Returns
         -------
@@ -315,15 +398,235 @@ class WebsitePool(AbstractWebsitePool):
         ------
         tracer.Result
             The representation of the result of a request
+
+        Raises
+        ------
+        Exception
+            Any exception raised by `send_request`. The remaining
+            requests are cancelled
         """
 
-        results = asyncio.Queue()
-        requests = asyncio.gather(*[
-            site.send_request(session, timeout, cb=results.put) for site in self
-        ])
+        async for result in self.__stream(
+            session, iter(self.sites), len(self), timeout, scheduler, queue_size,
+            options
+        ):
+            yield result
+
+    async def check_many(
+        self,
+        session: Union[ClientSession, AbstractTransport],
+        usernames: Iterable[str],
+        timeout: Optional[float] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        queue_size: Optional[int] = None,
+        **options: Any
+    ) -> AsyncGenerator[Result, None]:
+        """Checks several usernames on every site of the pool
+
+        Every (username, site) pair is checked under the same
+        scheduler, hence all checks share one concurrency budget
+        and the connection pool of the session. Checks are created
+        lazily, so the memory usage doesn't grow with the amount
+        of usernames. The websites of the pool are not modified.
+
+        Parameters
+        ----------
+        session : Union[aiohttp.ClientSession, tracer.AbstractTransport]
+            A session or transport which gets used to make the
+            requests.
+        usernames : Iterable[str]
+            The usernames to check
+        timeout : Union[int, float], optional
+            Represents the time each request has before a
+            TimeoutError occurs.
+        scheduler : tracer.RequestScheduler, optional
+            Limits the amount of concurrent requests. If `None`,
+            a scheduler with the default limits is used.
+        queue_size : int, optional
+            How many results may wait for the consumer, by default
+            the concurrency of the scheduler
+        **options : Any
+            Passed to `send_request` of every check, e.g. `cache`
+
+        Returns
+        -------
+        AsyncGenerator[Result, None]
+            Yields the results of the checks when available.
+
+        Yields
+        ------
+        tracer.Result
+            The result of a check. `result.username` tells to
+            which username it belongs
+
+        Example
+        -------
+            >>> async for result in pool.check_many(session, ["alice", "bob"]):
+            ...     print(result.username, result.url, result.user_exists)
+        """
+
+        usernames = list(usernames)
+        sites = self.sites
+
+        def checks() -> Generator[Website, None, None]:
+            # Username after username, so that consecutive checks
+            # go to different hosts
+            for username in usernames:
+                for site in sites:
+                    check = copy.copy(site)
+                    check.set_username(username)
+                    check.set_result(None)
+
+                    yield check
+
+        async for result in self.__stream(
+            session, checks(), len(usernames) * len(sites), timeout, scheduler,
+            queue_size, options
+        ):
+            yield result
+
+    async def warm_up(
+        self,
+        session: Union[ClientSession, AbstractTransport],
+        resolver: Optional[CachingResolver] = None,
+        preconnect: bool = False,
+        scheduler: Optional[RequestScheduler] = None,
+        timeout: Optional[float] = 5
+    ) -> Dict[str, float]:
+        """Prepares the network for the checks of the pool
+
+        Resolves every host of the pool concurrently, so that the
+        first checks don't wait for DNS all at once. If `preconnect`
+        is `True`, a HEAD request is sent to the root of every host,
+        using the scheme and port of the sites' URLs, which leaves
+        an open keep-alive connection (with a completed TLS
+        handshake) in the connection pool of the session.
+
+        Parameters
+        ----------
+        session : Union[aiohttp.ClientSession, tracer.AbstractTransport]
+            The session or transport that later sends the checks
+        resolver : tracer.CachingResolver, optional
+            The resolver of the connector of the session. If `None`,
+            no lookups are done
+        preconnect : bool, optional
+            Whether to open connections, by default False
+        scheduler : tracer.RequestScheduler, optional
+            Limits the amount of concurrent connection attempts, by
+            default a scheduler with the default limits
+        timeout : float, optional
+            Timeout of each connection attempt, by default 5
+
+        Returns
+        -------
+        Dict[str, float]
+            `hosts`, `resolved`, `connected` and the duration of
+            the warm-up in `seconds`
+        """
+
+        transport = as_transport(session)
+        start = monotonic()
+        origins = self.__origins()
+        hosts = tuple(origins)
+        report = {"hosts": len(hosts), "resolved": 0, "connected": 0, "seconds": 0.0}
+
+        if resolver is not None:
+            report["resolved"] = await resolver.prefetch(hosts)
+
+        if preconnect:
+            if scheduler is None:
+                scheduler = RequestScheduler()
+
+            timeout = ClientTimeout(timeout)
+
+            async def connect(host: str) -> bool:
+                async with scheduler.slot(host):
+                    try:
+                        response = await transport.request(
+                            "HEAD", origins[host], timeout=timeout
+                        )
+                        await response.release()
+
+                        return True
+                    except Exception:
+                        # The check reports the failure later on
+                        return False
+
+            report["connected"] = sum(
+                await asyncio.gather(*[connect(host) for host in hosts])
+            )
+
+        report["seconds"] = monotonic() - start
+
+        return report
+
+    def __origins(self) -> Dict[str, str]:
+        """Maps the hostnames to which requests are sent to the root
+        of the first site using them, e.g. `https://example.com:8443/`
+        """
+
+        origins = dict()
+
+        for site in self:
+            url = site.true_url if site.username is not None else site.spec.true_url_template
+            parts = urlsplit(url)
+            host = parts.hostname
+
+            if host and "{}" not in host and host not in origins:
+                origins[host] = f"{parts.scheme}://{parts.netloc}/"
+
+        return origins
+
+    async def __stream(
+        self,
+        session: Union[ClientSession, AbstractTransport],
+        checks: Iterator[Website],
+        amount: int,
+        timeout: Optional[float],
+        scheduler: Optional[RequestScheduler],
+        queue_size: Optional[int],
+        options: Dict[str, Any]
+    ) -> AsyncGenerator[Result, None]:
+        """Runs the checks and yields their results as they complete
+
+        A fixed amount of workers take the next check from the
+        iterator as soon as they are done with the previous one.
+        Results are passed through a bounded queue. Closing the
+        generator cancels all workers.
+        """
+
+        if scheduler is None:
+            scheduler = RequestScheduler()
+
+        # Wrapped once instead of once per check
+        session = as_transport(session)
+        results = asyncio.Queue(maxsize=queue_size or scheduler.concurrency)
+
+        async def work() -> None:
+            for site in checks:
+                try:
+                    # The site takes a slot per attempt and releases it while backing off
+                    await site.send_request(session, timeout, scheduler=scheduler, **options)
+                except Exception as e:
+                    return await results.put(e)
+
+                await results.put(site.result)
+
+        workers = [
+            asyncio.ensure_future(work())
+            for _ in range(min(amount, scheduler.concurrency))
+        ]
+
+        try:
+            for _ in range(amount):
+                result = await results.get()
+
+                if isinstance(result, Exception):
+                    raise result
+
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
 
-        while not (results.empty() and requests.done()):
-            try:
-                yield await asyncio.wait_for(results.get(), timeout=0.25)
-            except asyncio.TimeoutError:
-                """Force recheck of the loop condition"""
+            await asyncio.gather(*workers, return_exceptions=True)
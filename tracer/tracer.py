@@ -9,21 +9,19 @@ Arguments can be provided through the CLI or through the config (.conf) file.
 Dependencies: requirements.txt
 """
 
-__all__ = ("Tracer",)
+__all__ = ("Tracer", "RESULTS_DIR")
 
-from typing import Dict, List, Optional, Union
-from threading import Thread
+from typing import Any, Dict, List, Optional, Sequence, Union
 from time import monotonic
 from pathlib import Path
 import http.cookies
-import webbrowser
+import contextlib
 import asyncio
 import json
+import sys
 import os
 
-from pyvis.network import Network
 from aiohttp import ClientSession
-from aiohttp.web import run_app
 from colorama import Fore
 import aiohttp
 
@@ -31,7 +29,15 @@ from models import *
 from loader import *
 
 
-CONFIG = "../settings.conf"
+# The files of Tracer are located relative to the project folder,
+# paths given by the user relative to the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = os.path.join(ROOT, "settings.conf")
+RESULTS_DIR = os.path.join(ROOT, "results", "")
+CACHE_FILE = "cache.sqlite3"
+BREAKER_FILE = "breakers.json"
+LATENCY_FILE = "latency.json"
+DNS_FILE = "dns.json"
 MY_IP = "https://api.myip.com"
 
 
@@ -44,58 +50,130 @@ class Tracer(object):
     """
 
     @classmethod
-    def main(cls) -> None:
+    def main(cls, kwargs: Optional[Dict[str, Any]] = None) -> None:
         """Create a tracer instance and call its run coro
 
         Parse given args and create an event loop
         which executes the `run` coro
-        """
 
-        # Changing dir so that relative paths make sense
-        os.chdir(os.path.dirname(__file__))
+        Parameters
+        ----------
+        kwargs : Dict[str, Any], optional
+            Already parsed args, by default the args are parsed
+            from the conf file and the CLI
+        """
 
         # Parse the configs from the conf file and
         # update these with the arguments given by the CLI
-        kwargs = TracerParser(CONFIG).parse()
+        if kwargs is None:
+            kwargs = TracerParser(CONFIG).parse()
+
+        usernames = kwargs.pop("username", [])
+
+        if kwargs.get("file"):
+            usernames += cls.read_usernames(kwargs.pop("file"))
+
+        run = None
 
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
             if kwargs.get("web"):
+                from aiohttp.web import run_app
                 from gui import app
+                import webbrowser
 
                 loop.call_later(1, webbrowser.open, "http://127.0.0.1:12345")
                 run_app(app, host="127.0.0.1", port=12_345, loop=loop)
+            elif not usernames:
+                print(f"{Fore.RED}[ISSUE] No username given{Fore.RESET}")
             else:
-                loop.run_until_complete(cls(kwargs.pop("username"), **kwargs).run())
+                tracer = cls(usernames, **kwargs)
+
+                # Keeps stdout clean for the results if they are piped
+                if ResultSink.STDOUT in (kwargs.get("jsonl"), kwargs.get("csv")):
+                    output = contextlib.redirect_stdout(sys.stderr)
+                else:
+                    output = contextlib.nullcontext()
+
+                run = loop.create_task(tracer.run())
+
+                with output:
+                    loop.run_until_complete(run)
         except KeyboardInterrupt:
+            if run is not None and not run.done():
+                # Lets the run flush its sinks and save its state
+                run.cancel()
+
+                try:
+                    loop.run_until_complete(run)
+                except (asyncio.CancelledError, KeyboardInterrupt):
+                    pass
+
             print("👋 Bye")
         finally:
             loop.stop()
 
+    @staticmethod
+    def read_usernames(path: Union[str, Path]) -> List[str]:
+        """Read usernames from a file, one username per line
+
+        Empty lines and lines starting with `#` are ignored.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The file containing the usernames
+
+        Returns
+        -------
+        List[str]
+            The usernames in the order of the file
+        """
+
+        with open(path) as file:
+            lines = [line.strip() for line in file]
+
+        return [line for line in lines if line and not line.startswith("#")]
+
     def __init__(
         self,
-        username: str,
+        username: Union[str, Sequence[str]],
         data: Optional[List[Dict[str, str]]] = None,
         user_agent: Optional[str] = None,
         **kwargs,
     ):
-        if data is None:
-            data = load_website_data()
-
         if user_agent is None:
             user_agent = load_user_agent()
 
-        self.username = username
+        if isinstance(username, str):
+            username = [username]
+
+        # Keeps the order but removes duplicates
+        self.usernames = list(dict.fromkeys(username))
+
+        if not self.usernames:
+            raise ValueError("At least one username is required")
+
+        self.username = self.usernames[0]
         self.kwargs = dict(kwargs)
         self.user_agent = user_agent
         self.verbose = kwargs.get("verbose", False)
-        self.pool = WebsitePool(*[Website.from_dict(data_) for data_ in data])
+
+        if data is None:
+            self.pool = WebsitePool.from_specs(load_site_specs())
+        else:
+            self.pool = WebsitePool(*[Website.from_dict(data_) for data_ in data])
+
+        self.results: List[Result] = list()
+        self.graphs = {username: ResultGraph(username) for username in self.usernames}
+        self.stdout = sys.stdout
 
         self.pool.set_username(self.username)
 
         self._out_dir = None
+        self._out_dirs: Dict[str, str] = dict()
         self.__filter_sites()
 
         if kwargs.get("create_file_output"):
@@ -143,47 +221,311 @@ class Tracer(object):
 
         cookie_jar = aiohttp.DummyCookieJar()
         headers = {"User-Agent": self.user_agent}
-
-        async with ClientSession(headers=headers, cookie_jar=cookie_jar) as session:
+        scheduler = RequestScheduler(
+            concurrency=self.kwargs.get("concurrency"),
+            per_host_limit=self.kwargs.get("per_host_limit"),
+            keepalive_timeout=self.kwargs.get("keepalive_timeout")
+        )
+        cache = self.create_cache()
+        breaker = self.create_breaker()
+        latency = self.create_latency_tracker()
+        resolver = self.create_resolver()
+        retry = None
+
+        if self.kwargs.get("retry", True):
+            retry = RetryPolicy(max_attempts=self.kwargs.get("max_attempts"))
+
+        # Passed to `send_request` of every check
+        options = {
+            "cache": cache,
+            "breaker": breaker,
+            "latency": latency,
+            "retry": retry,
+        }
+
+        async with ClientSession(
+            connector=scheduler.create_connector(resolver=resolver),
+            headers=headers,
+            cookie_jar=cookie_jar,
+            trace_configs=[create_trace_config()]
+        ) as session:
             if self.kwargs.get("ip_check"):
                 await self.retrieve_ip(
                     session=session, timeout=self.kwargs.get("ip_timeout")
                 )
 
-            print(f"[{Fore.CYAN}*{Fore.RESET}] Checking {Fore.CYAN}{self.username}"
-                  f"{Fore.RESET} on {len(self.pool)} sites:\n")
+            if self.kwargs.get("warm_up", True):
+                await self.warm_up(session, resolver, scheduler)
+
+            if len(self.usernames) == 1:
+                print(f"[{Fore.CYAN}*{Fore.RESET}] Checking {Fore.CYAN}{self.username}"
+                      f"{Fore.RESET} on {len(self.pool)} sites:\n")
+
+                requests = self.pool.start_requests(
+                    session, self.kwargs.get("timeout"), scheduler, **options
+                )
+            else:
+                print(f"[{Fore.CYAN}*{Fore.RESET}] Checking {Fore.CYAN}"
+                      f"{len(self.usernames)}{Fore.RESET} usernames on "
+                      f"{len(self.pool)} sites:\n")
+
+                requests = self.pool.check_many(
+                    session, self.usernames, self.kwargs.get("timeout"), scheduler,
+                    **options
+                )
 
             start = monotonic()
             counter = 0
-            requests = self.pool.start_requests(session, self.kwargs.get("timeout"))
+            sinks = self.create_sinks()
+
+            try:
+                async for response in requests:
+                    self.results.append(response)
 
-            async for response in requests:
-                message = f"{response.url} {response.verbose() if self.kwargs.get('verbose') else ''}"
+                    for sink in sinks:
+                        await sink.write(response)
 
-                if not response.successfully:
-                    if self.kwargs.get("all"):
-                        if response.timeout:
-                            print(f"{Fore.RED}[Timeout]{Fore.RESET} {message}")
-                        else:
-                            print(f"{Fore.RED}[-]{Fore.RESET} {message}")
+                    message = f"{response.url} {response.verbose() if self.kwargs.get('verbose') else ''}"
 
-                    continue
+                    if not response.successfully:
+                        if self.kwargs.get("all"):
+                            if response.skipped:
+                                print(f"{Fore.YELLOW}[Skipped]{Fore.RESET} {message}")
+                            elif response.timeout:
+                                print(f"{Fore.RED}[Timeout]{Fore.RESET} {message}")
+                            else:
+                                print(f"{Fore.RED}[-]{Fore.RESET} {message}")
 
-                print(f"{Fore.GREEN}[+]{Fore.RESET} {message}")
+                        continue
 
-                if self.kwargs.get("browse"):
-                    Thread(target=webbrowser.open, args=(response.url,)).start()
+                    print(f"{Fore.GREEN}[+]{Fore.RESET} {message}")
 
-                counter += 1
+                    if response.username in self.graphs:
+                        self.graphs[response.username].add(response)
+
+                    if self.kwargs.get("browse"):
+                        self.browse(response.url)
+
+                    counter += 1
+            finally:
+                for sink in sinks:
+                    await sink.close()
+
+                if cache is not None:
+                    cache.close()
+
+                if breaker is not None:
+                    breaker.save()
+
+                if latency is not None:
+                    latency.save()
+
+                resolver.save()
+                await resolver.close()
 
         print(f"\n[{Fore.CYAN}={Fore.RESET}] Found {Fore.CYAN}{counter}"
               f"{Fore.RESET} match(es) in {Fore.CYAN}{monotonic() - start:.2f}"
               f"s{Fore.RESET}")
 
-        self.write_report(self._out_dir)
-        self.draw_graph(self._out_dir)
+        saved = sum(result.bytes_saved for result in self.results)
+        cached = sum(result.cached for result in self.results)
+
+        skipped = sum(result.skipped for result in self.results)
+
+        if cached:
+            print(f"[{Fore.CYAN}={Fore.RESET}] Took {Fore.CYAN}{cached}{Fore.RESET} "
+                  "result(s) from the cache")
+
+        if skipped:
+            print(f"[{Fore.CYAN}={Fore.RESET}] Skipped {Fore.CYAN}{skipped}{Fore.RESET} "
+                  "site(s) which keep failing")
+
+        if saved:
+            print(f"[{Fore.CYAN}={Fore.RESET}] Saved {Fore.CYAN}{saved / 1024:.1f} KiB"
+                  f"{Fore.RESET} by skipping response bodies")
+
+        if self.kwargs.get("verbose"):
+            self.print_timings()
+
+        for username in self.usernames:
+            self.write_report(self._out_dirs.get(username), username)
+            self.write_timings(self._out_dirs.get(username), username)
+            self.draw_graph(self._out_dirs.get(username), username)
+
+    async def warm_up(
+        self,
+        session: ClientSession,
+        resolver: Optional[CachingResolver],
+        scheduler: RequestScheduler
+    ) -> None:
+        """Resolve the hosts of the pool before the checks start
+
+        Connections are opened in advance if `preconnect` is on.
+        Prints how long the warm-up took.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            The session used for the checks
+        resolver : tracer.CachingResolver, optional
+            The resolver of the session
+        scheduler : tracer.RequestScheduler
+            The scheduler used for the checks
+        """
+
+        report = await self.pool.warm_up(
+            session,
+            resolver=resolver,
+            preconnect=self.kwargs.get("preconnect", False),
+            scheduler=scheduler
+        )
+
+        print(f"[{Fore.CYAN}*{Fore.RESET}] Warmed up {Fore.CYAN}{report['resolved']}"
+              f"/{report['hosts']}{Fore.RESET} hosts in {Fore.CYAN}"
+              f"{report['seconds']:.2f}s{Fore.RESET}"
+              + (f", {report['connected']} connection(s) opened" if report["connected"] else ""))
+
+    @staticmethod
+    def browse(url: str) -> None:
+        """Open the url in the default webbrowser without blocking"""
+
+        from threading import Thread
+        import webbrowser
+
+        Thread(target=webbrowser.open, args=(url,)).start()
+
+    def create_sinks(self) -> List[ResultSink]:
+        """Create the sinks which write the results while the checks run
 
-    def write_report(self, out_dir: Union[str, Path]) -> None:
+        Returns
+        -------
+        List[ResultSink]
+            The sinks given by `--jsonl` and `--csv`
+        """
+
+        sinks: List[ResultSink] = list()
+
+        if self.kwargs.get("jsonl"):
+            sinks.append(JsonlSink(self.kwargs["jsonl"], stream=self.stdout))
+
+        if self.kwargs.get("csv"):
+            sinks.append(CsvSink(self.kwargs["csv"], stream=self.stdout))
+
+        return sinks
+
+    def state_path(self, name: str) -> Optional[str]:
+        """Get the path of a file which keeps state between runs
+
+        Parameters
+        ----------
+        name : str
+            The name of the file within the results directory
+
+        Returns
+        -------
+        Optional[str]
+            The path, `None` if the state should be kept in
+            memory only, i.e. the file output is turned off or
+            the results directory can't be created
+        """
+
+        if not self.kwargs.get("create_file_output", True):
+            return None
+
+        try:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+        except OSError:
+            return None
+
+        return os.path.join(RESULTS_DIR, name)
+
+    def create_resolver(self) -> CachingResolver:
+        """Create the DNS resolver and load its saved cache
+
+        Returns
+        -------
+        tracer.CachingResolver
+            The resolver used by the connector of the session
+        """
+
+        path = self.state_path(DNS_FILE)
+
+        resolver = CachingResolver(path=path, ttl=self.kwargs.get("dns_ttl"))
+        resolver.load()
+
+        return resolver
+
+    def create_cache(self) -> Optional[ResultCache]:
+        """Create the result cache based on the given arguments
+
+        Returns
+        -------
+        Optional[tracer.ResultCache]
+            The cache, `None` if caching is turned off. Without
+            a state file, the cache lives in memory only
+        """
+
+        if self.kwargs.get("no_cache") or not self.kwargs.get("cache", True):
+            return None
+
+        path = self.state_path(CACHE_FILE)
+
+        return ResultCache(
+            path=path,
+            positive_ttl=self.kwargs.get("cache_positive_ttl"),
+            negative_ttl=self.kwargs.get("cache_negative_ttl"),
+            refresh=self.kwargs.get("refresh", False)
+        )
+
+    def create_breaker(self) -> Optional[CircuitBreaker]:
+        """Create the circuit breaker and load its saved state
+
+        Returns
+        -------
+        Optional[tracer.CircuitBreaker]
+            The breaker, `None` if it is turned off
+        """
+
+        if not self.kwargs.get("breaker", True):
+            return None
+
+        path = self.state_path(BREAKER_FILE)
+
+        breaker = CircuitBreaker(
+            path=path,
+            threshold=self.kwargs.get("breaker_threshold"),
+            cooldown=self.kwargs.get("breaker_cooldown")
+        )
+        breaker.load()
+
+        return breaker
+
+    def create_latency_tracker(self) -> Optional[LatencyTracker]:
+        """Create the latency tracker and load the saved history
+
+        Returns
+        -------
+        Optional[tracer.LatencyTracker]
+            The tracker, `None` if adaptive timeouts are turned off
+        """
+
+        if not self.kwargs.get("adaptive_timeout", True):
+            return None
+
+        path = self.state_path(LATENCY_FILE)
+
+        latency = LatencyTracker(
+            path=path, percentile=self.kwargs.get("timeout_percentile")
+        )
+        latency.load()
+
+        return latency
+
+    def write_report(
+        self,
+        out_dir: Optional[Union[str, Path]],
+        username: Optional[str] = None
+    ) -> None:
         """Create and write a report file which contains the results
 
         Parameters
@@ -191,75 +533,124 @@ class Tracer(object):
         out_dir : Union[str, Path]
             In which directory to save the report file. If `None`
             is given, then no report file is created
+        username : str, optional
+            Whose results to write, by default the first username
         """
 
-        if self._out_dir is None:
+        if out_dir is None:
             return None
 
+        username = username or self.username
+        results = [result for result in self.results if result.username == username]
+
         name = f"{out_dir}result.txt"
         mode = "w" if os.path.exists(name) else "x"
 
         with open(name, mode) as file:
-            file.write(f"{load_logo()}\nReport for {self.username}:\n\n")
+            file.write(f"{load_logo()}\nReport for {username}:\n\n")
 
-            for result in self.pool.results:
+            for result in results:
                 file.write(result.url + "\n")
 
+            received = sum(result.bytes_received for result in results)
+            saved = sum(result.bytes_saved for result in results)
+
+            file.write(f"\nDownloaded {received} bytes, saved {saved} bytes "
+                       "by skipping response bodies\n")
+
+        return None
+
+    def print_timings(self) -> None:
+        """Print count, p50, p99 and max of every phase of the requests"""
+
+        phases = PhaseTimings.aggregate(result.timings for result in self.results)
+
+        if not phases:
+            return None
+
+        print(f"\n[{Fore.CYAN}={Fore.RESET}] Timings of {Fore.CYAN}"
+              f"{max(stats['count'] for stats in phases.values())}{Fore.RESET} requests:")
+
+        for phase, stats in phases.items():
+            print(f"    {phase:<8} p50 {stats['p50'] * 1000:8.1f}ms   "
+                  f"p99 {stats['p99'] * 1000:8.1f}ms   max {stats['max'] * 1000:8.1f}ms   "
+                  f"n={stats['count']}")
+
+        return None
+
+    def write_timings(
+        self,
+        out_dir: Optional[Union[str, Path]],
+        username: Optional[str] = None
+    ) -> None:
+        """Write the results and the aggregated timings as JSON
+
+        Parameters
+        ----------
+        out_dir : Union[str, Path]
+            In which directory to save the file. If `None` is
+            given, then no file is created
+        username : str, optional
+            Whose results to write, by default the first username
+        """
+
+        if out_dir is None:
+            return None
+
+        username = username or self.username
+        results = [result for result in self.results if result.username == username]
+
+        with open(f"{out_dir}timings.json", "w") as file:
+            json.dump({
+                "phases": PhaseTimings.aggregate(result.timings for result in results),
+                "results": [result.as_dict() for result in results],
+            }, file, indent=2)
+
         return None
 
-    def draw_graph(self, out_dir: Optional[Union[str, Path]]) -> None:
+    def draw_graph(
+        self,
+        out_dir: Optional[Union[str, Path]],
+        username: Optional[str] = None
+    ) -> None:
         """Visualize the results
 
-        Create a HTML file containing a graph and open it
-        in the default webbrowser
+        Write the graph of the sites on which the username got
+        found into `graph.html` and `graph.json`. With
+        `graph_backend=pyvis`, the HTML file is created by pyvis
+        instead of the built-in exporter
 
         Parameters
         ----------
         out_dir : Union[str, Path]
-            In which directory to save the HTML file. If `None`
+            In which directory to save the graph. If `None`
             is given, then no graph is created
+        username : str, optional
+            Whose results to draw, by default the first username
         """
 
-        if self._out_dir is None:
+        if out_dir is None:
             return None
 
-        net = Network(
-            height="100%",
-            width="100%",
-            bgcolor="#282a36",
-            font_color="#f8f8f2",
-        )
+        graph = self.graphs[username or self.username]
+        backend = self.kwargs.get("graph_backend") or ["builtin"]
 
-        net.add_node(self.username, color="#ff79c6", title="Username", shape="circle")
+        # Values of the conf file are parsed into a list
+        if isinstance(backend, list):
+            backend = backend[0] if backend else "builtin"
 
-        for category in Category.all_categories():
-            net.add_node(
-                n_id=category.title(),
-                color="#bd93f9",
-                shape="circle",
-                title=category.title(),
-                labelHighlightBold=True,
-            )
-            net.add_edge(self.username, category.title())
-
-        for site in self.pool:
-            if site.result.user_exists:
-                net.add_node(
-                    n_id=site.name,
-                    color="#ff5555",
-                    shape="circle",
-                    title=site.url,
-                    labelHighlightBold=True,
-                )
-                net.add_edge(site.category.as_str.title(), site.name)
+        graph.write_json(f"{out_dir}graph.json")
 
-        # Settings for the graph
-        net.toggle_physics(True)
-        net.set_edge_smooth("dynamic")
+        if backend == "pyvis":
+            try:
+                graph.to_pyvis().write_html(f"{out_dir}graph.html")
+
+                return None
+            except ImportError:
+                print(f"{Fore.YELLOW}[ISSUE] pyvis is not installed, using the "
+                      f"built-in graph{Fore.RESET}")
 
-        # Save the graph in a html file and open it
-        # in the default browser
-        net.show(f"{out_dir}graph.html")
+        graph.write_html(f"{out_dir}graph.html")
 
         return None
 
@@ -300,7 +691,7 @@ class Tracer(object):
     def _create_output_dir(self) -> None:
         """Create the directory in which the results are saved"""
 
-        results_dir = "../results/"
+        results_dir = RESULTS_DIR
 
         if not os.path.exists(results_dir):
             try:
@@ -308,10 +699,13 @@ class Tracer(object):
             except PermissionError:
                 return None
 
-        if not os.path.exists(f"{results_dir}{self.username}"):
-            os.mkdir(f"{results_dir}{self.username}/")
+        for username in self.usernames:
+            if not os.path.exists(f"{results_dir}{username}"):
+                os.mkdir(f"{results_dir}{username}/")
+
+            self._out_dirs[username] = f"{results_dir}{username}/"
 
-        self._out_dir = f"{results_dir}{self.username}/"
+        self._out_dir = self._out_dirs[self.username]
 
 
 if __name__ == "__main__":